@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+FinancialData 序列化基准测试
+
+对比现有的 to_dict() + json.dumps(indent=2, ensure_ascii=False) 与
+列式快速序列化（serialize_financial_data）在10万根K线上的耗时和输出大小。
+
+用法:
+    python benchmarks/serialization_benchmark.py [--bars 100000] [--runs 5]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from data.models import FinancialData, PriceSeries, StockPrice
+from data import serialization
+from data.serialization import serialize_financial_data
+
+
+def build_prices(bars: int):
+    """生成随机游走价格，返回 (List[StockPrice], PriceSeries)"""
+    rng = np.random.default_rng(42)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, bars))
+    start = datetime(2015, 1, 1)
+    prices = [
+        StockPrice(
+            symbol="TEST",
+            date=start + timedelta(minutes=i),
+            open=float(close[i] * 0.999),
+            high=float(close[i] * 1.005),
+            low=float(close[i] * 0.995),
+            close=float(close[i]),
+            volume=int(1000 + i % 500),
+            adj_close=float(close[i])
+        )
+        for i in range(bars)
+    ]
+    return prices, PriceSeries.from_stock_prices("TEST", prices)
+
+
+def timeit(fn, runs: int):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        output = fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples), len(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FinancialData 序列化基准测试")
+    parser.add_argument("--bars", type=int, default=100_000, help="K线数量")
+    parser.add_argument("--runs", type=int, default=5, help="每种方式的运行次数")
+    args = parser.parse_args()
+
+    prices, series = build_prices(args.bars)
+    row_data = FinancialData(symbol="TEST", prices=prices)
+    column_data = FinancialData(symbol="TEST", prices=series)
+
+    cases = [
+        ("to_dict + json.dumps", lambda: json.dumps(row_data.to_dict(), indent=2, ensure_ascii=False).encode("utf-8")),
+        ("列式 (epoch)", lambda: serialize_financial_data(column_data, "epoch")),
+        ("列式 (iso)", lambda: serialize_financial_data(column_data, "iso")),
+    ]
+
+    print(f"K线数量: {args.bars}  orjson: {'已安装' if serialization.ORJSON_AVAILABLE else '未安装'}")
+    print(f"{'方式':<24}{'耗时(ms)':>12}{'大小(KB)':>12}")
+    baseline = None
+    for name, fn in cases:
+        seconds, size = timeit(fn, args.runs)
+        baseline = baseline or seconds
+        print(f"{name:<24}{seconds * 1000:>12.1f}{size / 1024:>12.0f}   {baseline / seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
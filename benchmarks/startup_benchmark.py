@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+MCP服务器冷启动基准测试
+
+在独立子进程中分别以延迟加载和启动即加载两种模式创建 FinancialMCPServer，
+统计从导入到可以响应 list_tools 的耗时，以及延迟模式下首次工具调用的耗时。
+
+用法:
+    python benchmarks/startup_benchmark.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+CHILD_SCRIPT = """
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {src!r})
+from mcp.types import ListToolsRequest
+from mcp_server.server import FinancialMCPServer
+server = FinancialMCPServer(config_path={config!r})
+tools = asyncio.run(server.tool_registry.list_tools(ListToolsRequest(method="tools/list")))
+t1 = time.perf_counter()
+asyncio.run(server.tool_registry.dispatch("calculate_returns", {{"prices": [1.0, 1.1, 1.2]}}))
+t2 = time.perf_counter()
+print(json.dumps({{"startup": t1 - t0, "first_call": t2 - t1, "tools": len(tools.tools)}}))
+"""
+
+
+def run_once(lazy: bool) -> dict:
+    """在子进程中启动一次服务器并返回计时结果"""
+    with open(PROJECT_ROOT / "config" / "mcp_config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config.setdefault("server", {})["lazy_tools"] = lazy
+    config.setdefault("logging", {})["level"] = "WARNING"
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump(config, f)
+        config_path = f.name
+
+    try:
+        script = CHILD_SCRIPT.format(src=str(PROJECT_ROOT / "src"), config=config_path)
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+    finally:
+        os.unlink(config_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP服务器冷启动基准测试")
+    parser.add_argument("--runs", type=int, default=5, help="每种模式的运行次数")
+    args = parser.parse_args()
+
+    results = {}
+    for mode, lazy in (("eager", False), ("lazy", True)):
+        samples = [run_once(lazy) for _ in range(args.runs)]
+        results[mode] = {
+            "startup_ms": statistics.median(s["startup"] for s in samples) * 1000,
+            "first_call_ms": statistics.median(s["first_call"] for s in samples) * 1000,
+            "tools": samples[0]["tools"],
+        }
+
+    print(f"{'模式':<8}{'启动耗时(ms)':>16}{'首次调用(ms)':>16}{'工具数':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<8}{r['startup_ms']:>16.1f}{r['first_call_ms']:>16.1f}{r['tools']:>8}")
+
+    speedup = results["eager"]["startup_ms"] / results["lazy"]["startup_ms"]
+    print(f"\n延迟加载启动加速: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,24 @@
 数据处理模块
 """
 
-from .models import FinancialData, StockPrice, FinancialMetrics, CompanyInfo, PortfolioData, MarketData
+from .models import FinancialData, StockPrice, PriceSeries, FinancialMetrics, CompanyInfo, PortfolioData, MarketData
+from .serialization import (
+    dumps_compact,
+    serialize_financial_data,
+    serialize_market_data,
+    serialize_portfolio_data,
+)
 
 __all__ = [
     "FinancialData",
     "StockPrice", 
+    "PriceSeries",
     "FinancialMetrics",
     "CompanyInfo",
     "PortfolioData",
-    "MarketData"
+    "MarketData",
+    "dumps_compact",
+    "serialize_financial_data",
+    "serialize_portfolio_data",
+    "serialize_market_data"
 ] 
\ No newline at end of file
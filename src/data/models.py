@@ -1,15 +1,17 @@
 """
 财务数据模型
 
-定义财务数据的结构和类型。
+定义财务数据的结构和类型。数据类使用 dataclass(slots=True)，需要 Python 3.10+。
 """
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class StockPrice:
     """股票价格数据"""
     symbol: str
@@ -22,7 +24,127 @@ class StockPrice:
     adj_close: Optional[float] = None
 
 
-@dataclass
+@dataclass(eq=False, slots=True)
+class PriceSeries:
+    """列式价格序列
+
+    OHLCV 与 adj_close 各自保存为连续的 float64 数组，index 为 datetime64[ns]（UTC）。
+    相比 List[StockPrice]，长历史（如多年分钟线）只占用几个数组的内存。
+    """
+    symbol: str
+    index: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    adj_close: Optional[np.ndarray] = None
+    
+    FIELDS = ("open", "high", "low", "close", "volume", "adj_close")
+    
+    @classmethod
+    def from_dataframe(cls, symbol: str, df) -> "PriceSeries":
+        """从yfinance风格的DataFrame构建（Open/High/Low/Close/Volume/Adj Close列）
+
+        列本身为float64且连续时直接引用DataFrame的底层数组，不复制。
+        """
+        index = df.index
+        if getattr(index, "tz", None) is not None:
+            # 带时区的索引，asi8即为UTC时间戳，可直接按datetime64视图读取
+            index_values = np.asarray(index.as_unit("ns").asi8).view("datetime64[ns]")
+        else:
+            index_values = np.asarray(index.values, dtype="datetime64[ns]")
+            
+        def column(name: str) -> Optional[np.ndarray]:
+            if name not in df:
+                return None
+            return np.ascontiguousarray(df[name].to_numpy(dtype=np.float64))
+            
+        return cls(
+            symbol=symbol,
+            index=index_values,
+            open=column("Open"),
+            high=column("High"),
+            low=column("Low"),
+            close=column("Close"),
+            volume=column("Volume"),
+            adj_close=column("Adj Close")
+        )
+        
+    @classmethod
+    def from_stock_prices(cls, symbol: str, prices: List[StockPrice]) -> "PriceSeries":
+        """从 List[StockPrice] 构建"""
+        return cls(
+            symbol=symbol,
+            index=np.array([p.date for p in prices], dtype="datetime64[ns]"),
+            open=np.array([p.open for p in prices], dtype=np.float64),
+            high=np.array([p.high for p in prices], dtype=np.float64),
+            low=np.array([p.low for p in prices], dtype=np.float64),
+            close=np.array([p.close for p in prices], dtype=np.float64),
+            volume=np.array([p.volume for p in prices], dtype=np.float64),
+            adj_close=np.array(
+                [np.nan if p.adj_close is None else p.adj_close for p in prices], dtype=np.float64
+            )
+        )
+        
+    def __len__(self) -> int:
+        return len(self.index)
+        
+    @property
+    def nbytes(self) -> int:
+        """各列数组占用的字节数"""
+        arrays = [self.index] + [getattr(self, name) for name in self.FIELDS]
+        return sum(array.nbytes for array in arrays if array is not None)
+        
+    def slice(self, start: Optional[Union[datetime, str, np.datetime64]] = None,
+              end: Optional[Union[datetime, str, np.datetime64]] = None) -> "PriceSeries":
+        """按日期区间 [start, end) 截取，返回共享底层数组的视图"""
+        lo = 0 if start is None else int(np.searchsorted(self.index, np.datetime64(start, "ns"), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.index, np.datetime64(end, "ns"), side="left"))
+        return PriceSeries(
+            symbol=self.symbol,
+            index=self.index[lo:hi],
+            **{
+                name: None if getattr(self, name) is None else getattr(self, name)[lo:hi]
+                for name in self.FIELDS
+            }
+        )
+        
+    def returns(self, use_adjusted: bool = False) -> np.ndarray:
+        """简单收益率序列"""
+        prices = self.adj_close if use_adjusted and self.adj_close is not None else self.close
+        return np.diff(prices) / prices[:-1]
+        
+    def to_stock_prices(self) -> List[StockPrice]:
+        """转换为 List[StockPrice]（逐行对象，仅用于小数据量）"""
+        dates = self.index.astype("datetime64[us]").tolist()
+        adj_close = self.adj_close if self.adj_close is not None else [None] * len(self)
+        return [
+            StockPrice(
+                symbol=self.symbol,
+                date=dates[i],
+                open=float(self.open[i]),
+                high=float(self.high[i]),
+                low=float(self.low[i]),
+                close=float(self.close[i]),
+                volume=int(self.volume[i]),
+                adj_close=None if adj_close[i] is None or np.isnan(adj_close[i]) else float(adj_close[i])
+            )
+            for i in range(len(self))
+        ]
+        
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为列式字典格式"""
+        return {
+            "date": np.datetime_as_string(self.index, unit="s").tolist(),
+            **{
+                name: None if getattr(self, name) is None else getattr(self, name).tolist()
+                for name in self.FIELDS
+            }
+        }
+
+
+@dataclass(slots=True)
 class FinancialMetrics:
     """财务指标"""
     symbol: str
@@ -36,7 +158,7 @@ class FinancialMetrics:
     net_income: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CompanyInfo:
     """公司信息"""
     symbol: str
@@ -48,19 +170,22 @@ class CompanyInfo:
     description: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class FinancialData:
     """财务数据容器"""
     symbol: str
-    prices: List[StockPrice]
+    prices: Union[List[StockPrice], PriceSeries]
     metrics: Optional[FinancialMetrics] = None
     company_info: Optional[CompanyInfo] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
+        """转换为字典格式
+
+        prices 为 PriceSeries 时以列式结构输出（每个字段一个列表）。
+        """
         return {
             "symbol": self.symbol,
-            "prices": [
+            "prices": self.prices.to_dict() if isinstance(self.prices, PriceSeries) else [
                 {
                     "date": price.date.isoformat(),
                     "open": price.open,
@@ -92,7 +217,7 @@ class FinancialData:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class PortfolioData:
     """投资组合数据"""
     name: str
@@ -114,7 +239,7 @@ class PortfolioData:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class MarketData:
     """市场数据"""
     index_symbol: str
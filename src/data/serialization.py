@@ -0,0 +1,123 @@
+"""
+财务数据快速序列化
+
+把 FinancialData / PortfolioData / MarketData 直接写成紧凑JSON：价格按列输出，
+日期为一个epoch秒整数数组或一个ISO字符串数组，不再为每根K线构建字典。
+安装了 orjson 时使用 orjson（原生支持NumPy数组），否则退回标准库 json。
+"""
+
+import json
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from .models import FinancialData, MarketData, PortfolioData, PriceSeries, StockPrice
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+DATE_FORMATS = ("epoch", "iso")
+
+
+def dumps_compact(obj: Any) -> bytes:
+    """序列化为紧凑的UTF-8 JSON字节串，NaN输出为null"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(
+        _to_builtin(obj), ensure_ascii=False, separators=(",", ":"), allow_nan=False
+    ).encode("utf-8")
+
+
+def price_columns(prices: Union[List[StockPrice], PriceSeries],
+                  date_format: str = "epoch") -> Dict[str, Any]:
+    """价格序列 -> 列式字典（值为NumPy数组）
+
+    Args:
+        prices: PriceSeries 或 List[StockPrice]
+        date_format: epoch（UTC秒整数）或 iso（ISO 8601字符串）
+    """
+    if date_format not in DATE_FORMATS:
+        raise ValueError(f"不支持的日期格式: {date_format}")
+    if not isinstance(prices, PriceSeries):
+        prices = PriceSeries.from_stock_prices("", prices)
+
+    if date_format == "epoch":
+        dates = prices.index.astype("datetime64[s]").astype(np.int64)
+    else:
+        dates = np.datetime_as_string(prices.index, unit="s").tolist()
+
+    columns = {"date": dates}
+    for name in PriceSeries.FIELDS:
+        values = getattr(prices, name)
+        if values is not None:
+            columns[name] = values
+    return columns
+
+
+def serialize_financial_data(data: FinancialData, date_format: str = "epoch") -> bytes:
+    """FinancialData -> 紧凑JSON字节串"""
+    payload = {
+        "symbol": data.symbol,
+        "prices": price_columns(data.prices, date_format),
+        "metrics": None,
+        "company_info": None
+    }
+    if data.metrics:
+        payload["metrics"] = {
+            "market_cap": data.metrics.market_cap,
+            "pe_ratio": data.metrics.pe_ratio,
+            "pb_ratio": data.metrics.pb_ratio,
+            "dividend_yield": data.metrics.dividend_yield,
+            "eps": data.metrics.eps,
+            "revenue": data.metrics.revenue,
+            "net_income": data.metrics.net_income
+        }
+    if data.company_info:
+        payload["company_info"] = {
+            "name": data.company_info.name,
+            "industry": data.company_info.industry,
+            "sector": data.company_info.sector,
+            "country": data.company_info.country,
+            "website": data.company_info.website,
+            "description": data.company_info.description
+        }
+    return dumps_compact(payload)
+
+
+def serialize_portfolio_data(data: PortfolioData) -> bytes:
+    """PortfolioData -> 紧凑JSON字节串"""
+    return dumps_compact(data.to_dict())
+
+
+def serialize_market_data(data: MarketData) -> bytes:
+    """MarketData -> 紧凑JSON字节串"""
+    return dumps_compact(data.to_dict())
+
+
+def _orjson_default(obj: Any) -> Any:
+    """orjson 只能直接序列化C连续的NumPy数组，切片/转置等视图先复制为连续数组"""
+    if isinstance(obj, np.ndarray) and not obj.flags.c_contiguous:
+        return np.ascontiguousarray(obj)
+    raise TypeError(f"无法序列化的类型: {type(obj).__name__}")
+
+
+def _to_builtin(obj: Any) -> Any:
+    """把NumPy数组/标量递归转换为标准库json可处理的对象（NaN -> None）"""
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "f":
+            return np.where(np.isnan(obj), None, obj).tolist()
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and obj != obj:
+        return None
+    if isinstance(obj, dict):
+        return {str(k): _to_builtin(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_builtin(v) for v in obj]
+    return obj
@@ -0,0 +1,80 @@
+"""
+向量化分析计算
+
+纯NumPy实现的批量金融指标计算，供数据分析类MCP工具调用。
+"""
+
+from .batch import PERIODS_PER_YEAR, align_on_dates, batch_metrics, pad_series
+from .bootstrap import DEFAULT_CONFIDENCE_LEVEL, DEFAULT_RESAMPLES, bootstrap_risk_metrics
+from .indicators import DEFAULT_INDICATORS, compute_indicators, latest_values
+from .numerics import (
+    DEFAULT_DTYPE,
+    drop_missing,
+    ensure_contiguous,
+    nan_mean,
+    nan_std,
+    resolve_dtype,
+    simple_returns,
+    simple_returns_matrix,
+    to_array,
+    valid_count,
+)
+from .portfolio import covariance, efficient_frontier, optimize_portfolio
+from .risk import max_drawdown, risk_attribution, wealth_curves
+from .rolling import DEFAULT_WINDOWS, rolling_metrics
+from .streaming import StreamingStats, StreamingStatsStore
+from .var import (
+    DEFAULT_BLOCK_MEMORY_MB,
+    DEFAULT_CONFIDENCE_LEVELS,
+    VAR_METHODS,
+    historical_var,
+    normalize_weights,
+    parametric_var,
+    plan_blocks,
+    simulate_block,
+    simulation_inputs,
+    var_from_samples,
+)
+
+__all__ = [
+    "PERIODS_PER_YEAR",
+    "align_on_dates",
+    "batch_metrics",
+    "pad_series",
+    "DEFAULT_CONFIDENCE_LEVEL",
+    "DEFAULT_RESAMPLES",
+    "bootstrap_risk_metrics",
+    "DEFAULT_INDICATORS",
+    "compute_indicators",
+    "latest_values",
+    "DEFAULT_DTYPE",
+    "drop_missing",
+    "ensure_contiguous",
+    "nan_mean",
+    "nan_std",
+    "resolve_dtype",
+    "simple_returns",
+    "simple_returns_matrix",
+    "to_array",
+    "valid_count",
+    "covariance",
+    "efficient_frontier",
+    "optimize_portfolio",
+    "max_drawdown",
+    "risk_attribution",
+    "wealth_curves",
+    "DEFAULT_WINDOWS",
+    "rolling_metrics",
+    "StreamingStats",
+    "StreamingStatsStore",
+    "DEFAULT_BLOCK_MEMORY_MB",
+    "DEFAULT_CONFIDENCE_LEVELS",
+    "VAR_METHODS",
+    "historical_var",
+    "normalize_weights",
+    "parametric_var",
+    "plan_blocks",
+    "simulate_block",
+    "simulation_inputs",
+    "var_from_samples"
+]
@@ -0,0 +1,145 @@
+"""
+批量收益率/波动率/夏普比率计算
+
+多条序列按行堆叠为二维数组，长度不一的序列在末尾以NaN补齐，
+所有指标在一次向量化计算中得到，NaN位置通过掩码排除。
+带日期的序列（如不同交易所、停牌日不同的股票）用 align_on_dates 按日期取交集对齐。
+"""
+
+import functools
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .numerics import resolve_dtype, simple_returns_matrix, to_array
+
+# 各计算周期对应的年化因子
+PERIODS_PER_YEAR = {
+    "daily": 252,
+    "weekly": 52,
+    "monthly": 12
+}
+
+
+def pad_series(series: Sequence[Sequence[Optional[float]]], align: str = "start",
+               dtype: Optional[str] = None) -> np.ndarray:
+    """把长度不一的序列堆叠为 (n, max_len) 的浮点矩阵，缺失值（含 null）为NaN
+
+    Args:
+        series: 序列列表
+        align: start 为首部对齐（末尾补NaN），end 为末尾对齐（首部补NaN，
+            适合各序列最后一个值都是最新数据的情况）
+        dtype: float32 或 float64（默认），大批量计算时 float32 内存减半
+    """
+    if len(series) == 0:
+        raise ValueError("序列列表不能为空")
+    if align not in ("start", "end"):
+        raise ValueError(f"不支持的对齐方式: {align}")
+    lengths = np.fromiter((len(s) for s in series), dtype=np.int64, count=len(series))
+    width = int(lengths.max())
+    matrix = np.full((len(series), width), np.nan, dtype=resolve_dtype(dtype))
+    for row, values in enumerate(series):
+        if len(values):
+            offset = 0 if align == "start" else width - len(values)
+            matrix[row, offset:offset + len(values)] = to_array(values, matrix.dtype)
+    return matrix
+
+
+def align_on_dates(indexes: Sequence[np.ndarray], series: Sequence[Sequence[Optional[float]]],
+                   dtype: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """按日期对齐多条序列，只保留所有序列都有有效值的日期
+
+    Args:
+        indexes: 各序列的日期（升序，如 PriceSeries.index）
+        series: 与日期一一对应的值，缺失值（含 null）所在的日期不参与对齐
+        dtype: float32 或 float64（默认）
+
+    Returns:
+        (共同日期, (n, 共同日期数) 的矩阵)，矩阵中没有NaN
+    """
+    if len(series) == 0:
+        raise ValueError("序列列表不能为空")
+    if len(indexes) != len(series):
+        raise ValueError("日期数量与序列数量不一致")
+    arrays = [to_array(values, dtype) for values in series]
+    indexes = [np.asarray(index) for index in indexes]
+    for index, values in zip(indexes, arrays):
+        if len(index) != len(values):
+            raise ValueError("序列长度与日期数量不一致")
+    common = functools.reduce(
+        np.intersect1d, (index[~np.isnan(values)] for index, values in zip(indexes, arrays))
+    )
+    matrix = np.empty((len(arrays), len(common)), dtype=resolve_dtype(dtype))
+    for row, (index, values) in enumerate(zip(indexes, arrays)):
+        matrix[row] = values[np.searchsorted(index, common)]
+    return common, matrix
+
+
+def _first_last_valid(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """每行第一个和最后一个非NaN值"""
+    valid = ~np.isnan(matrix)
+    rows = np.arange(matrix.shape[0])
+    first_idx = valid.argmax(axis=1)
+    last_idx = matrix.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+    has_any = valid.any(axis=1)
+    first = np.where(has_any, matrix[rows, first_idx], np.nan)
+    last = np.where(has_any, matrix[rows, last_idx], np.nan)
+    return first, last
+
+
+def batch_metrics(matrix: np.ndarray, series_type: str = "prices", period: str = "daily",
+                  risk_free_rate: float = 0.02) -> Dict[str, np.ndarray]:
+    """一次计算多条序列的收益率、波动率和夏普比率
+
+    Args:
+        matrix: (n, T) 矩阵，每行一条价格或收益率序列，NaN表示缺失
+        series_type: prices 或 returns
+        period: 数据周期，用于年化
+        risk_free_rate: 年化无风险利率
+
+    Returns:
+        各指标名到长度为n的数组的映射，数据不足的序列对应NaN
+    """
+    if period not in PERIODS_PER_YEAR:
+        raise ValueError(f"不支持的周期: {period}")
+    periods = PERIODS_PER_YEAR[period]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if series_type == "prices":
+            returns = simple_returns_matrix(matrix)
+            first, last = _first_last_valid(matrix)
+            total_return = last / first - 1
+        elif series_type == "returns":
+            returns = matrix
+            total_return = np.expm1(np.nansum(np.log1p(returns), axis=1))
+        else:
+            raise ValueError(f"不支持的序列类型: {series_type}")
+
+        valid = ~np.isnan(returns)
+        count = valid.sum(axis=1)
+        filled = np.where(valid, returns, 0.0)
+        mean = filled.sum(axis=1) / count
+        deviations = np.where(valid, returns - mean[:, None], 0.0)
+        volatility = np.sqrt((deviations ** 2).sum(axis=1) / count)
+        max_return = np.where(valid, returns, -np.inf).max(axis=1)
+        min_return = np.where(valid, returns, np.inf).min(axis=1)
+
+        sharpe = (mean - risk_free_rate / periods) / volatility
+        sharpe = np.where(volatility > 0, sharpe, np.nan)
+
+    insufficient = count < 2
+    metrics = {
+        "data_points": count,
+        "total_return_pct": total_return * 100,
+        "avg_return_pct": mean * 100,
+        "max_return_pct": max_return * 100,
+        "min_return_pct": min_return * 100,
+        "volatility_pct": volatility * 100,
+        "annualized_volatility_pct": volatility * np.sqrt(periods) * 100,
+        "sharpe_ratio": sharpe,
+        "annualized_sharpe_ratio": sharpe * np.sqrt(periods)
+    }
+    for name, values in metrics.items():
+        if name != "data_points":
+            values[insufficient] = np.nan
+    return metrics
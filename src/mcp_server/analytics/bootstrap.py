@@ -0,0 +1,139 @@
+"""
+波动率与夏普比率的块自助法（block bootstrap）置信区间
+
+收益率存在自相关和波动聚集，逐点重抽样会低估不确定性，这里使用循环块自助法：
+每个重抽样序列由若干个长度为 block_size 的连续片段拼接而成（越过末尾时回绕到开头）。
+
+- 块起点抽取为 (resamples, blocks) 矩阵，按行展开为 (resamples, T) 的下标矩阵后
+  一次向量化计算全部统计量，不逐个重抽样循环
+- 重抽样按行分批抽取和计算以限制内存（同一随机数生成器分批抽取与一次抽取的结果相同），
+  批次之间检查时间预算，超时则只使用已完成的重抽样。有时间预算时先算一小批测出单次耗时，
+  之后每批的预计耗时不超过检查间隔和剩余时间，超出预算的部分不超过一个小批次
+"""
+
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_CONFIDENCE_LEVEL = 0.95
+
+# 每批展开的下标矩阵元素个数上限（float64 约 8MB）
+_MAX_BATCH_CELLS = 1024 * 1024
+# 有时间预算时：首批的重抽样次数，以及之后每批的目标耗时（秒）
+_FIRST_BATCH = 16
+_CHECK_INTERVAL = 0.02
+
+
+def default_block_size(length: int) -> int:
+    """默认块长度 T^(1/3)（平稳序列下的经验取值）"""
+    return max(1, int(round(length ** (1 / 3))))
+
+
+def block_starts(length: int, block_size: int, resamples: int,
+                 rng: np.random.Generator) -> np.ndarray:
+    """抽取一批重抽样的块起点，返回 (resamples, ceil(T / block_size)) 矩阵"""
+    blocks = -(-length // block_size)
+    return rng.integers(0, length, size=(resamples, blocks))
+
+
+def expand_indices(starts: np.ndarray, length: int, block_size: int) -> np.ndarray:
+    """块起点矩阵 -> (resamples, T) 下标矩阵，块越过末尾时回绕"""
+    offsets = np.arange(block_size)
+    indices = (starts[:, :, None] + offsets) % length
+    return indices.reshape(starts.shape[0], -1)[:, :length]
+
+
+def bootstrap_risk_metrics(returns: np.ndarray, resamples: int = DEFAULT_RESAMPLES,
+                           block_size: Optional[int] = None,
+                           confidence_level: float = DEFAULT_CONFIDENCE_LEVEL,
+                           risk_free_rate: float = 0.02, periods_per_year: int = 252,
+                           time_budget: Optional[float] = None,
+                           seed: Optional[int] = None) -> Dict[str, object]:
+    """块自助法估计单期波动率和夏普比率的置信区间（百分位法）
+
+    波动率使用总体标准差，夏普比率为 (均值 - 无风险利率 / periods_per_year) / 波动率，
+    与 DataAnalyzerTool.analyze_volatility / analyze_sharpe_ratio 的定义一致。
+
+    Args:
+        returns: 收益率序列
+        resamples: 重抽样次数
+        block_size: 块长度，默认 T^(1/3)
+        confidence_level: 置信水平
+        risk_free_rate: 年化无风险利率
+        periods_per_year: 年化因子
+        time_budget: 计算时间上限（秒），超时后提前结束
+        seed: 随机种子
+
+    Returns:
+        volatility / sharpe_ratio 的 lower、upper、std_error，以及实际完成的重抽样次数等信息
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    length = len(returns)
+    if length < 2:
+        raise ValueError("收益率序列至少需要2个数据点")
+    if not 0 < confidence_level < 1:
+        raise ValueError(f"置信水平必须在 (0, 1) 区间内: {confidence_level}")
+    block_size = int(block_size or default_block_size(length))
+    if block_size < 1 or block_size > length:
+        raise ValueError(f"块长度必须在 1 到 {length} 之间")
+    if resamples < 1:
+        raise ValueError("重抽样次数必须大于0")
+
+    started = time.perf_counter()
+    deadline = started + time_budget if time_budget else None
+    seed_sequence = np.random.SeedSequence(seed)
+    rng = np.random.default_rng(seed_sequence)
+
+    max_batch = max(1, _MAX_BATCH_CELLS // length)
+    batch = max_batch if deadline is None else min(max_batch, _FIRST_BATCH)
+    volatility = np.empty(resamples)
+    mean = np.empty(resamples)
+    completed = 0
+    while completed < resamples:
+        batch_started = time.perf_counter()
+        stop = min(completed + batch, resamples)
+        starts = block_starts(length, block_size, stop - completed, rng)
+        samples = returns[expand_indices(starts, length, block_size)]
+        mean[completed:stop] = samples.mean(axis=1)
+        volatility[completed:stop] = samples.std(axis=1)
+        if deadline is not None:
+            now = time.perf_counter()
+            if now >= deadline:
+                completed = stop
+                break
+            # 按本批的单次耗时估计下一批的大小
+            per_resample = max((now - batch_started) / (stop - completed), 1e-9)
+            batch = int(min(_CHECK_INTERVAL, deadline - now) / per_resample)
+            batch = min(max(batch, 1), max_batch)
+        completed = stop
+
+    volatility = volatility[:completed]
+    mean = mean[:completed]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = (mean - risk_free_rate / periods_per_year) / volatility
+    # 零波动的重抽样（如大量相同收益率）没有定义夏普比率
+    sharpe = sharpe[np.isfinite(sharpe)]
+
+    tail = (1 - confidence_level) / 2
+    result: Dict[str, object] = {
+        "confidence_level": confidence_level,
+        "resamples": completed,
+        "requested_resamples": resamples,
+        "block_size": block_size,
+        "truncated": completed < resamples,
+        "elapsed_seconds": time.perf_counter() - started,
+        "seed": seed_sequence.entropy
+    }
+    for name, values in (("volatility", volatility), ("sharpe_ratio", sharpe)):
+        if len(values) < 2:
+            result[name] = None
+            continue
+        lower, upper = np.quantile(values, [tail, 1 - tail])
+        result[name] = {
+            "lower": float(lower),
+            "upper": float(upper),
+            "std_error": float(values.std(ddof=1))
+        }
+    return result
@@ -0,0 +1,223 @@
+"""
+技术指标
+
+对 (n, T) 收盘价矩阵批量计算 SMA、EMA、RSI、MACD 和布林带，每行一个股票代码，
+NaN 表示缺失（如长度不一的序列在首部补齐的部分）。
+
+- SMA / 布林带基于前缀和，O(T) 且与窗口大小无关
+- EMA 类指标（EMA、RSI 的 Wilder 平滑、MACD）是时间上的递推，
+  逐个时间点推进，每一步对所有股票做一次向量运算
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+DEFAULT_INDICATORS = ("sma", "ema", "rsi", "macd", "bollinger")
+
+# 各指标的默认参数
+DEFAULT_PARAMS: Dict[str, Dict[str, Any]] = {
+    "sma": {"windows": [20, 50, 200]},
+    "ema": {"spans": [12, 26]},
+    "rsi": {"window": 14},
+    "macd": {"fast": 12, "slow": 26, "signal": 9},
+    "bollinger": {"window": 20, "num_std": 2.0}
+}
+
+
+def sma(close: np.ndarray, window: int) -> np.ndarray:
+    """简单移动平均，窗口内含缺失值或数据不足时为NaN"""
+    return _sma(_prefix_sums(close), window)
+
+
+def rolling_std(close: np.ndarray, window: int) -> np.ndarray:
+    """滚动总体标准差（与布林带的常用定义一致）"""
+    return _rolling_std(_prefix_sums(close), window)
+
+
+def _prefix_sums(values: np.ndarray):
+    """计数、一阶和二阶前缀和（首列补0），同一矩阵上的多个窗口共享
+
+    按行减去首个有效值后再累加，减小前缀和相减的精度损失。
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    valid = ~np.isnan(values)
+    first = values[np.arange(values.shape[0]), valid.argmax(axis=1)]
+    shift = np.nan_to_num(first)[:, None]
+    centered = np.where(valid, values - shift, 0.0)
+
+    pad = np.zeros((values.shape[0], 1))
+    count = np.concatenate([pad, np.cumsum(valid, axis=1, dtype=np.float64)], axis=1)
+    s1 = np.concatenate([pad, np.cumsum(centered, axis=1)], axis=1)
+    s2 = np.concatenate([pad, np.cumsum(centered * centered, axis=1)], axis=1)
+    return count, s1, s2, shift
+
+
+def _window_moments(prefix, window: int):
+    """窗口均值和（中心化的）二阶矩，数据不足或含缺失值的位置为NaN"""
+    count, s1, s2, shift = prefix
+    n, length = count.shape[0], count.shape[1] - 1
+    mean = np.full((n, length), np.nan)
+    variance = np.full((n, length), np.nan)
+    if window <= length:
+        complete = (count[:, window:] - count[:, :-window]) == window
+        window_mean = (s1[:, window:] - s1[:, :-window]) / window
+        window_sq = (s2[:, window:] - s2[:, :-window]) / window
+        mean[:, window - 1:] = np.where(complete, window_mean + shift, np.nan)
+        variance[:, window - 1:] = np.where(
+            complete, np.maximum(window_sq - window_mean * window_mean, 0.0), np.nan
+        )
+    return mean, variance
+
+
+def _sma(prefix, window: int) -> np.ndarray:
+    window = int(window)
+    if window < 1:
+        raise ValueError("窗口大小必须大于0")
+    return _window_moments(prefix, window)[0]
+
+
+def _rolling_std(prefix, window: int) -> np.ndarray:
+    window = int(window)
+    if window < 2:
+        raise ValueError("窗口大小必须大于1")
+    return np.sqrt(_window_moments(prefix, window)[1])
+
+
+def ewm(values: np.ndarray, alpha: float, min_periods: int = 1) -> np.ndarray:
+    """指数加权移动平均（递推形式，与 pandas ewm(adjust=False) 一致）
+
+    每行从第一个有效值开始递推，缺失值沿用上一期结果；
+    有效值个数不足 min_periods 的位置为NaN。
+    """
+    if not 0 < alpha <= 1:
+        raise ValueError("alpha 必须在 (0, 1] 区间内")
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    # 转置为 (T, n) 连续内存，每个时间点的所有行相邻存放
+    columns = np.ascontiguousarray(values.T)
+    valid = ~np.isnan(columns)
+    result = np.empty_like(columns)
+    state = np.full(columns.shape[1], np.nan)
+    decay = 1.0 - alpha
+
+    # 时间维度的递推无法消除，逐个时间点推进，每步对所有行做一次向量运算
+    for t in range(columns.shape[0]):
+        x = columns[t]
+        step = alpha * x + decay * state
+        # 首个有效值作为初始状态，缺失值沿用上一期
+        np.copyto(step, x, where=np.isnan(state))
+        np.copyto(state, step, where=valid[t])
+        result[t] = state
+
+    if min_periods > 1:
+        seen = np.cumsum(valid, axis=0)
+        result[seen < min_periods] = np.nan
+    return result.T
+
+
+def ema(close: np.ndarray, span: int) -> np.ndarray:
+    """指数移动平均，alpha = 2 / (span + 1)，前 span-1 个有效位置为NaN"""
+    span = int(span)
+    if span < 1:
+        raise ValueError("span 必须大于0")
+    return ewm(close, 2.0 / (span + 1), min_periods=span)
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """相对强弱指数（Wilder 平滑，alpha = 1 / window）"""
+    window = int(window)
+    if window < 1:
+        raise ValueError("窗口大小必须大于0")
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    change = np.full(close.shape, np.nan)
+    change[:, 1:] = close[:, 1:] - close[:, :-1]
+
+    with np.errstate(invalid="ignore"):
+        gain = np.where(np.isnan(change), np.nan, np.maximum(change, 0.0))
+        loss = np.where(np.isnan(change), np.nan, np.maximum(-change, 0.0))
+    avg_gain = ewm(gain, 1.0 / window, min_periods=window)
+    avg_loss = ewm(loss, 1.0 / window, min_periods=window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # 区间内没有下跌时 RSI 为100，既无上涨也无下跌时为50
+    value = np.where((avg_loss == 0) & (avg_gain > 0), 100.0, value)
+    value = np.where((avg_loss == 0) & (avg_gain == 0), 50.0, value)
+    return value
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    """MACD：快慢EMA之差、其信号线和柱状图"""
+    if fast >= slow:
+        raise ValueError("fast 必须小于 slow")
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+
+
+def bollinger(close: np.ndarray, window: int = 20, num_std: float = 2.0,
+              prefix=None) -> Dict[str, np.ndarray]:
+    """布林带：中轨为SMA，上下轨为中轨 ± num_std 倍滚动标准差"""
+    window = int(window)
+    if window < 2:
+        raise ValueError("窗口大小必须大于1")
+    middle, variance = _window_moments(prefix or _prefix_sums(close), window)
+    width = num_std * np.sqrt(variance)
+    upper = middle + width
+    lower = middle - width
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percent_b = (np.atleast_2d(close) - lower) / (upper - lower)
+    return {"middle": middle, "upper": upper, "lower": lower, "percent_b": percent_b}
+
+
+def compute_indicators(close: np.ndarray, indicators: Optional[Iterable[str]] = None,
+                       params: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, np.ndarray]:
+    """一次计算多个技术指标
+
+    Args:
+        close: (n, T) 收盘价矩阵
+        indicators: 指标名列表，默认全部
+        params: 按指标名覆盖默认参数，如 {"rsi": {"window": 6}}
+
+    Returns:
+        指标列名到 (n, T) 数组的映射，如 sma_20、ema_12、rsi_14、macd、
+        macd_signal、macd_histogram、bb_upper、bb_middle、bb_lower、bb_percent_b
+    """
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    indicators = list(indicators or DEFAULT_INDICATORS)
+    params = params or {}
+    unknown = [name for name in indicators if name not in DEFAULT_PARAMS]
+    if unknown:
+        raise ValueError(f"不支持的技术指标: {', '.join(unknown)}")
+
+    def options(name: str) -> Dict[str, Any]:
+        return {**DEFAULT_PARAMS[name], **(params.get(name) or {})}
+
+    # SMA 和布林带的所有窗口共享同一组前缀和
+    prefix = _prefix_sums(close) if {"sma", "bollinger"} & set(indicators) else None
+    columns: Dict[str, np.ndarray] = {}
+    for name in indicators:
+        opts = options(name)
+        if name == "sma":
+            for window in opts["windows"]:
+                columns[f"sma_{int(window)}"] = _sma(prefix, window)
+        elif name == "ema":
+            for span in opts["spans"]:
+                columns[f"ema_{int(span)}"] = ema(close, span)
+        elif name == "rsi":
+            columns[f"rsi_{int(opts['window'])}"] = rsi(close, opts["window"])
+        elif name == "macd":
+            values = macd(close, int(opts["fast"]), int(opts["slow"]), int(opts["signal"]))
+            columns["macd"] = values["macd"]
+            columns["macd_signal"] = values["signal"]
+            columns["macd_histogram"] = values["histogram"]
+        elif name == "bollinger":
+            values = bollinger(close, int(opts["window"]), float(opts["num_std"]), prefix=prefix)
+            for key in ("upper", "middle", "lower", "percent_b"):
+                columns[f"bb_{key}"] = values[key]
+    return columns
+
+
+def latest_values(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """各指标每行的最新值（最后一列）"""
+    return {name: values[:, -1] for name, values in columns.items()}
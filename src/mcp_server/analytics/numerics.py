@@ -0,0 +1,114 @@
+"""
+数值输入层
+
+工具参数中的序列是 JSON 列表，可能含 null（停牌、缺失数据），直接 np.array 会得到
+object 数组或让整个结果变为NaN。这里统一完成：
+
+- 按指定精度（float32 / float64）转换为一维C连续数组，null / 非有限值视为缺失（NaN）
+- 忽略缺失值的均值、标准差等归约（累加使用 float64，float32 只用于存储）
+- 价格序列在缺失处跳过：停牌前后两个有效价格之间计为一期收益率（一维和 (n, T) 矩阵相同）
+
+float32 可使大批量计算的内存占用减半，精度约7位有效数字，足以表示价格和收益率。
+"""
+
+from typing import Any, Union
+
+import numpy as np
+
+DTYPES = {
+    "float32": np.float32,
+    "float64": np.float64
+}
+DEFAULT_DTYPE = "float64"
+
+
+def resolve_dtype(dtype: Union[str, np.dtype, type, None] = None) -> np.dtype:
+    """精度名称 -> numpy dtype，只支持 float32 和 float64"""
+    if dtype is None:
+        return np.dtype(DTYPES[DEFAULT_DTYPE])
+    name = dtype if isinstance(dtype, str) else np.dtype(dtype).name
+    if name not in DTYPES:
+        raise ValueError(f"不支持的数值精度: {name}，可选 {', '.join(DTYPES)}")
+    return np.dtype(DTYPES[name])
+
+
+def to_array(values: Any, dtype: Union[str, np.dtype, type, None] = None) -> np.ndarray:
+    """把序列转换为指定精度的一维C连续数组，null 和 ±inf 转为NaN"""
+    target = resolve_dtype(dtype)
+    try:
+        array = np.asarray(values, dtype=target)
+    except (TypeError, ValueError):
+        raise ValueError("序列中包含无法转换为数值的元素")
+    if array.ndim != 1:
+        raise ValueError(f"序列必须是一维数组，实际为 {array.ndim} 维")
+    infinite = np.isinf(array)
+    if infinite.any():
+        # np.where 返回新数组，不修改调用方传入的数组
+        return np.where(infinite, np.nan, array)
+    return ensure_contiguous(array, target)
+
+
+def ensure_contiguous(array: np.ndarray, dtype: Union[str, np.dtype, type, None] = None) -> np.ndarray:
+    """校验数组为指定精度的C连续内存，否则复制（如切片视图、memmap 的跨步视图）
+
+    未指定精度时保留 float32 / float64，其他类型（如整数）转为 float64。
+    """
+    if dtype is None:
+        dtype = array.dtype if array.dtype.name in DTYPES else DEFAULT_DTYPE
+    target = resolve_dtype(dtype)
+    if array.dtype != target or not array.flags.c_contiguous:
+        array = np.ascontiguousarray(array, dtype=target)
+    return array
+
+
+def valid_count(array: np.ndarray) -> int:
+    """非缺失值个数"""
+    return int(np.count_nonzero(~np.isnan(array)))
+
+
+def nan_mean(array: np.ndarray) -> float:
+    """忽略NaN的均值，没有有效值时为NaN"""
+    valid = array[~np.isnan(array)]
+    return float(valid.mean(dtype=np.float64)) if valid.size else float("nan")
+
+
+def nan_std(array: np.ndarray, ddof: int = 0) -> float:
+    """忽略NaN的标准差，有效值不足时为NaN"""
+    valid = array[~np.isnan(array)]
+    if valid.size <= ddof:
+        return float("nan")
+    return float(valid.std(dtype=np.float64, ddof=ddof))
+
+
+def drop_missing(array: np.ndarray) -> np.ndarray:
+    """去掉缺失值，返回C连续的新数组（没有缺失值时直接返回原数组）"""
+    mask = np.isnan(array)
+    return array[~mask] if mask.any() else array
+
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    """价格 -> 简单收益率，跳过缺失价格（相邻两个有效价格之间计一期）"""
+    valid = drop_missing(prices)
+    if valid.size < 2:
+        return valid[:0]
+    return np.diff(valid) / valid[:-1]
+
+
+def simple_returns_matrix(prices: np.ndarray) -> np.ndarray:
+    """(n, T) 价格矩阵 -> (n, T-1) 简单收益率，与 simple_returns 一样跳过缺失价格
+
+    第 t 列是第 t+1 期价格相对此前最近一个有效价格的收益率：停牌前后两个有效价格之间
+    计一期，记在复牌的那一列；缺失价格处和每行首个有效价格处为NaN。保持列与时间点对应，
+    结果保留输入的 float32 / float64 精度。
+    """
+    prices = np.atleast_2d(prices)
+    prices = ensure_contiguous(prices, prices.dtype if prices.dtype.name in DTYPES else None)
+    valid = ~np.isnan(prices)
+    # 每个位置及之前最近的有效价格下标，没有时为 -1
+    latest = np.maximum.accumulate(np.where(valid, np.arange(prices.shape[1]), -1), axis=1)
+    previous = latest[:, :-1]
+    base = np.take_along_axis(prices, np.maximum(previous, 0), axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = prices[:, 1:] / base - 1
+    returns[(previous < 0) | ~valid[:, 1:]] = np.nan
+    return returns
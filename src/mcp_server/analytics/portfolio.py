@@ -0,0 +1,302 @@
+"""
+协方差估计与均值-方差组合优化
+
+输入为 (n, T) 收益率矩阵（每行一个资产），只使用所有资产都有数据的时间点。
+
+- 协方差：样本协方差，或 Ledoit-Wolf 收缩（向 μ·I 收缩，收缩强度解析计算）
+- 不允许卖空（long_only）时用加速投影梯度法（FISTA）求解，每步只有矩阵乘法和
+  向量化的单纯形投影；允许卖空时直接用线性方程组的闭式解
+- 有效前沿的 K 个目标收益率同时求解，前沿点堆叠为 (K, n) 矩阵一起迭代
+"""
+
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+from .batch import PERIODS_PER_YEAR
+
+COVARIANCE_METHODS = ("sample", "ledoit_wolf")
+OBJECTIVES = ("min_variance", "max_sharpe")
+
+DEFAULT_MAX_ITER = 5000
+DEFAULT_TOL = 1e-9
+# 不允许卖空的有效前沿中每个点二分查找风险厌恶系数的次数
+DEFAULT_FRONTIER_ITER = 40
+
+
+def common_returns(returns: np.ndarray) -> np.ndarray:
+    """去掉任一资产缺失的时间点，返回 (n, T') 矩阵"""
+    returns = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    complete = ~np.isnan(returns).any(axis=0)
+    return returns[:, complete]
+
+
+def covariance(returns: np.ndarray, method: str = "ledoit_wolf",
+               shrinkage: Optional[float] = None) -> Dict[str, Any]:
+    """估计协方差矩阵
+
+    Args:
+        returns: (n, T) 收益率矩阵，不含NaN
+        method: sample 或 ledoit_wolf
+        shrinkage: 指定收缩强度（0~1），为 None 时 ledoit_wolf 方法自动估计
+
+    Returns:
+        {"covariance": (n, n), "shrinkage": 实际使用的收缩强度}
+    """
+    if method not in COVARIANCE_METHODS:
+        raise ValueError(f"不支持的协方差估计方法: {method}")
+    n, length = returns.shape
+    if length < 2:
+        raise ValueError("共同的收益率数据点至少需要2个")
+
+    centered = returns - returns.mean(axis=1, keepdims=True)
+    if method == "sample" and shrinkage is None:
+        return {"covariance": centered @ centered.T / (length - 1), "shrinkage": 0.0}
+
+    # Ledoit-Wolf 以最大似然估计 S = XXᵀ/T 为基础
+    sample = centered @ centered.T / length
+    target_scale = np.trace(sample) / n
+    if shrinkage is None:
+        # δ² = ||S - μI||²，β² = Σ_t ||x_t x_tᵀ - S||² / T²
+        # 由 Σ_t x_t x_tᵀ = T·S 得 Σ_t ||x_t x_tᵀ - S||² = Σ_t |x_t|⁴ - T·||S||²
+        delta = np.sum((sample - target_scale * np.eye(n)) ** 2)
+        row_norms = np.einsum("it,it->t", centered, centered)
+        beta = (np.sum(row_norms ** 2) / length - np.sum(sample ** 2)) / length
+        shrinkage = 0.0 if delta == 0 else float(min(max(beta, 0.0), delta) / delta)
+    elif not 0 <= shrinkage <= 1:
+        raise ValueError("收缩强度必须在 [0, 1] 区间内")
+
+    shrunk = (1 - shrinkage) * sample
+    shrunk[np.diag_indices(n)] += shrinkage * target_scale
+    return {"covariance": shrunk, "shrinkage": float(shrinkage)}
+
+
+def project_simplex(points: np.ndarray) -> np.ndarray:
+    """把每一行投影到单纯形 {w >= 0, Σw = 1}（排序法，按行向量化）"""
+    points = np.atleast_2d(points)
+    k, n = points.shape
+    ordered = -np.sort(-points, axis=1)
+    cumulative = np.cumsum(ordered, axis=1) - 1
+    ranks = np.arange(1, n + 1)
+    support = ordered - cumulative / ranks > 0
+    rho = n - 1 - np.argmax(support[:, ::-1], axis=1)
+    theta = cumulative[np.arange(k), rho] / (rho + 1)
+    return np.maximum(points - theta[:, None], 0.0)
+
+
+def _project_budget(points: np.ndarray, a: np.ndarray) -> np.ndarray:
+    """把每一行投影到 {y >= 0, aᵀy = 1}
+
+    投影为 max(z + θa, 0)。f(θ) = aᵀmax(z + θa, 0) 是分段线性的不减函数，
+    转折点为 -z_i/a_i：按转折点排序后用前缀和得到每段的截距和斜率，
+    找到 f 首次不小于1的段后直接解出 θ，每行 O(n log n)。
+    """
+    points = np.atleast_2d(points)
+    rows = np.arange(points.shape[0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        breakpoints = np.where(a != 0, -points / a, np.inf)
+    # θ → -∞ 时 a_i < 0 的分量为正；越过转折点后 a_i > 0 的分量变为正，a_i < 0 的变为0
+    sign = np.sign(a)
+    base_intercept = np.where(a < 0, a * points, 0.0).sum(axis=1)
+    base_slope = np.sum(np.where(a < 0, a * a, 0.0))
+
+    order = np.argsort(breakpoints, axis=1)
+    sorted_points = np.take_along_axis(breakpoints, order, axis=1)
+    intercept = base_intercept[:, None] + np.cumsum(
+        np.take_along_axis(sign * a * points, order, axis=1), axis=1
+    )
+    slope = base_slope + np.cumsum((sign * a * a)[order], axis=1)
+
+    with np.errstate(invalid="ignore"):
+        value = np.where(np.isfinite(sorted_points), intercept + slope * sorted_points, np.inf)
+    reached = value >= 1
+    # 根位于第 first 个转折点之前的一段，所有转折点处都小于1时位于最后一段
+    first = np.where(reached.any(axis=1), reached.argmax(axis=1), points.shape[1])
+    prev_intercept = np.where(first > 0, intercept[rows, first - 1], base_intercept)
+    prev_slope = np.where(first > 0, slope[rows, first - 1], base_slope)
+    theta = (1 - prev_intercept) / prev_slope
+    return np.maximum(points + theta[:, None] * a, 0.0)
+
+
+def _fista(gradient, project, step: np.ndarray, start: np.ndarray,
+           max_iter: int = DEFAULT_MAX_ITER, tol: float = DEFAULT_TOL) -> np.ndarray:
+    """加速投影梯度法，start 的每一行是一个独立的问题
+
+    动量方向与本步更新方向相反时重置该行的动量（梯度重启），保证收敛过程单调。
+    """
+    current = start
+    momentum = start
+    t = np.ones(start.shape[0])
+    for _ in range(max_iter):
+        updated = project(momentum - step[:, None] * gradient(momentum))
+        delta = updated - current
+        restart = np.einsum("ki,ki->k", momentum - updated, delta) > 0
+        t = np.where(restart, 1.0, t)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        momentum = updated + ((t - 1) / t_next)[:, None] * delta
+        current, t = updated, t_next
+        if np.max(np.abs(delta)) < tol:
+            break
+    return current
+
+
+def min_variance_weights(cov: np.ndarray, long_only: bool = True) -> np.ndarray:
+    """最小方差组合权重"""
+    n = cov.shape[0]
+    if not long_only:
+        raw = np.linalg.solve(cov, np.ones(n))
+        return raw / raw.sum()
+    lipschitz = 2 * np.linalg.eigvalsh(cov)[-1]
+    return _fista(
+        lambda w: 2 * w @ cov,
+        project_simplex,
+        np.array([1.0 / lipschitz]),
+        np.full((1, n), 1.0 / n)
+    )[0]
+
+
+def max_sharpe_weights(mean: np.ndarray, cov: np.ndarray, risk_free_rate: float = 0.0,
+                       long_only: bool = True) -> np.ndarray:
+    """最大夏普比率组合权重
+
+    等价于在 (μ - rf)ᵀy = 1 约束下最小化 yᵀΣy，再令 w = y / Σy。
+    """
+    excess = mean - risk_free_rate
+    if not np.any(excess > 0):
+        raise ValueError("所有资产的预期超额收益均不为正，无法计算最大夏普比率组合")
+    if not long_only:
+        raw = np.linalg.solve(cov, excess)
+        if raw.sum() <= 0:
+            raise ValueError("允许卖空时切点组合不存在（超额收益加权和不为正）")
+        return raw / raw.sum()
+
+    n = cov.shape[0]
+    lipschitz = 2 * np.linalg.eigvalsh(cov)[-1]
+    positive = np.where(excess > 0, excess, 0.0)
+    start = (positive / (positive @ excess))[None, :]
+    scaled = _fista(
+        lambda y: 2 * y @ cov,
+        lambda y: _project_budget(y, excess),
+        np.array([1.0 / lipschitz]),
+        start
+    )[0]
+    return scaled / scaled.sum()
+
+
+def efficient_frontier(mean: np.ndarray, cov: np.ndarray, points: int = 20,
+                       long_only: bool = True) -> Dict[str, np.ndarray]:
+    """有效前沿
+
+    在最小方差组合的收益率到最大可达收益率之间均匀取 points 个目标收益率：
+    允许卖空时用闭式解；不允许卖空时求解 max μᵀw - λ/2·wᵀΣw（w 在单纯形上），
+    解的收益率随风险厌恶系数 λ 单调递减，对每个目标收益率同时二分查找 λ。
+    所有资产收益率相同时前沿退化为最小方差组合一个点。
+
+    Returns:
+        {"expected_return": (K,), "volatility": (K,), "weights": (K, n)}，按波动率升序
+    """
+    n = cov.shape[0]
+    if points < 2:
+        raise ValueError("前沿点数至少为2")
+
+    if not long_only:
+        inv_ones = np.linalg.solve(cov, np.ones(n))
+        inv_mean = np.linalg.solve(cov, mean)
+        a, b, c = inv_ones.sum(), inv_ones @ mean, mean @ inv_mean
+        determinant = a * c - b * b
+        targets = np.linspace(b / a, mean.max(), points)
+        # w(r) = ((c - b·r)·Σ⁻¹1 + (a·r - b)·Σ⁻¹μ) / (ac - b²)
+        weights = (
+            np.outer(c - b * targets, inv_ones) + np.outer(a * targets - b, inv_mean)
+        ) / determinant
+    else:
+        weights = _long_only_frontier(mean, cov, points)
+
+    expected = weights @ mean
+    volatility = np.sqrt(np.maximum(np.einsum("ki,ij,kj->k", weights, cov, weights), 0.0))
+    order = np.argsort(volatility)
+    return {
+        "expected_return": expected[order],
+        "volatility": volatility[order],
+        "weights": weights[order]
+    }
+
+
+def _long_only_frontier(mean: np.ndarray, cov: np.ndarray, points: int,
+                        iterations: int = DEFAULT_FRONTIER_ITER) -> np.ndarray:
+    """不允许卖空的前沿权重 (K, n)：两端为最小方差组合和收益率最高的单一资产，
+    中间各点二分查找使收益率等于目标收益率的风险厌恶系数"""
+    min_var = min_variance_weights(cov, long_only=True)
+    low, high = float(min_var @ mean), float(mean.max())
+    spread = high - low
+    if spread <= 1e-12 * max(abs(high), 1.0):
+        return min_var[None, :]
+
+    top_asset = np.zeros_like(mean)
+    top_asset[int(np.argmax(mean))] = 1.0
+    targets = np.linspace(low, high, points)[1:-1]
+    top = float(np.linalg.eigvalsh(cov)[-1])
+
+    def solve(aversion: np.ndarray, start: np.ndarray) -> np.ndarray:
+        return _fista(
+            lambda w: aversion[:, None] * (w @ cov) - mean,
+            project_simplex,
+            1.0 / (aversion * top),
+            start
+        )
+
+    # λ 足够小时解为收益率最高的资产，足够大时为最小方差组合；在对数尺度上二分
+    lower = np.full(len(targets), np.log(spread / top * 1e-2))
+    upper = np.full(len(targets), np.log(spread / (min_var @ cov @ min_var) * 1e2))
+    weights = np.tile(min_var, (len(targets), 1))
+    for _ in range(iterations):
+        middle = (lower + upper) / 2
+        weights = solve(np.exp(middle), weights)
+        above = weights @ mean >= targets
+        # 收益率高于目标时需要更大的风险厌恶系数
+        lower = np.where(above, middle, lower)
+        upper = np.where(above, upper, middle)
+    return np.vstack([min_var, weights, top_asset])
+
+
+def optimize_portfolio(returns: np.ndarray, objective: str = "max_sharpe", period: str = "daily",
+                       risk_free_rate: float = 0.02, method: str = "ledoit_wolf",
+                       shrinkage: Optional[float] = None, long_only: bool = True,
+                       frontier_points: int = 0) -> Dict[str, Union[np.ndarray, float, int]]:
+    """由收益率矩阵估计年化均值和协方差并求最优权重
+
+    Returns:
+        weights、年化的 expected_return / volatility / sharpe_ratio、
+        shrinkage、data_points，frontier_points > 0 时另含 frontier
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"不支持的优化目标: {objective}")
+    if period not in PERIODS_PER_YEAR:
+        raise ValueError(f"不支持的周期: {period}")
+    periods = PERIODS_PER_YEAR[period]
+
+    aligned = common_returns(returns)
+    if aligned.shape[0] < 2:
+        raise ValueError("组合优化至少需要2个资产")
+    estimate = covariance(aligned, method=method, shrinkage=shrinkage)
+    cov = estimate["covariance"] * periods
+    mean = aligned.mean(axis=1) * periods
+
+    if objective == "min_variance":
+        weights = min_variance_weights(cov, long_only)
+    else:
+        weights = max_sharpe_weights(mean, cov, risk_free_rate, long_only)
+
+    expected = float(weights @ mean)
+    volatility = float(np.sqrt(max(weights @ cov @ weights, 0.0)))
+    result: Dict[str, Any] = {
+        "weights": weights,
+        "expected_return": expected,
+        "volatility": volatility,
+        "sharpe_ratio": (expected - risk_free_rate) / volatility if volatility > 0 else float("nan"),
+        "shrinkage": estimate["shrinkage"],
+        "data_points": int(aligned.shape[1])
+    }
+    if frontier_points:
+        result["frontier"] = efficient_frontier(mean, cov, int(frontier_points), long_only)
+    return result
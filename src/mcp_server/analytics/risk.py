@@ -0,0 +1,150 @@
+"""
+回撤与相对基准的风险归因
+
+多条资产序列按行堆叠为 (n, T) 矩阵，与长度为 T 的基准序列按位置对齐：
+
+- 最大回撤：对净值曲线做逐行累计最大值扫描
+- 贝塔/阿尔法：对每个资产回归 超额收益 = alpha + beta * 基准超额收益，
+  各资产的 2x2 正规方程堆叠为 (n, 2, 2) 后一次批量求解
+- 信息比率：主动收益（资产 - 基准）的均值 / 跟踪误差
+
+NaN 表示缺失，回归和信息比率只使用资产与基准同时有值的位置。
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from .batch import PERIODS_PER_YEAR
+
+
+def wealth_curves(matrix: np.ndarray, series_type: str = "prices") -> np.ndarray:
+    """(n, T) 价格或收益率矩阵 -> 净值曲线，缺失位置为NaN
+
+    收益率序列在每行第一个收益率之前补上期初净值1.0，结果为 (n, T+1)：
+    下标 i 为第 i 个收益率之前的净值，与同一序列以价格表示时的下标一致。
+    """
+    if series_type == "prices":
+        return matrix
+    if series_type != "returns":
+        raise ValueError(f"不支持的序列类型: {series_type}")
+    valid = ~np.isnan(matrix)
+    log_growth = np.cumsum(np.where(valid, np.log1p(np.where(valid, matrix, 0.0)), 0.0), axis=1)
+    wealth = np.full((matrix.shape[0], matrix.shape[1] + 1), np.nan)
+    wealth[:, 1:] = np.where(valid, np.exp(log_growth), np.nan)
+    has_data = valid.any(axis=1)
+    rows = np.arange(matrix.shape[0])[has_data]
+    wealth[rows, valid[has_data].argmax(axis=1)] = 1.0
+    return wealth
+
+
+def max_drawdown(matrix: np.ndarray, series_type: str = "prices") -> Dict[str, np.ndarray]:
+    """逐行计算最大回撤
+
+    Returns:
+        max_drawdown: 最大回撤（负数，如 -0.25 表示 25%），无数据的行为NaN
+        peak_index / trough_index: 回撤起点和谷底在净值曲线上的位置，无回撤时二者相同；
+            收益率序列的下标 0 为期初净值（见 wealth_curves）
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        wealth = wealth_curves(np.asarray(matrix, dtype=float), series_type)
+        # fmax 忽略NaN，缺失位置沿用之前的最高点
+        running_max = np.fmax.accumulate(wealth, axis=1)
+        drawdown = wealth / running_max - 1
+
+    has_data = ~np.isnan(drawdown).all(axis=1)
+    filled = np.where(np.isnan(drawdown), np.inf, drawdown)
+    trough = filled.argmin(axis=1)
+    rows = np.arange(wealth.shape[0])
+    worst = np.where(has_data, filled[rows, trough], np.nan)
+
+    # 谷底之前净值最高的位置即回撤起点
+    columns = np.arange(wealth.shape[1])
+    before_trough = np.where(
+        (columns[None, :] <= trough[:, None]) & ~np.isnan(wealth), wealth, -np.inf
+    )
+    peak = before_trough.argmax(axis=1)
+
+    return {
+        "max_drawdown": worst,
+        "peak_index": np.where(has_data, peak, -1),
+        "trough_index": np.where(has_data, trough, -1)
+    }
+
+
+def risk_attribution(returns: np.ndarray, benchmark: np.ndarray, period: str = "daily",
+                     risk_free_rate: float = 0.02) -> Dict[str, np.ndarray]:
+    """批量计算相对基准的贝塔、阿尔法、R²、跟踪误差和信息比率
+
+    Args:
+        returns: (n, T) 资产收益率矩阵
+        benchmark: 长度为 T 的基准收益率
+        period: 数据周期，用于年化
+        risk_free_rate: 年化无风险利率
+
+    Returns:
+        各指标名到长度为n的数组的映射，样本不足或基准无波动时为NaN
+    """
+    if period not in PERIODS_PER_YEAR:
+        raise ValueError(f"不支持的周期: {period}")
+    periods = PERIODS_PER_YEAR[period]
+
+    returns = np.asarray(returns, dtype=float)
+    benchmark = np.asarray(benchmark, dtype=float)
+    if returns.ndim != 2 or benchmark.shape != (returns.shape[1],):
+        raise ValueError("基准序列长度必须与资产序列长度一致")
+
+    rf = risk_free_rate / periods
+    valid = ~np.isnan(returns) & ~np.isnan(benchmark)[None, :]
+    count = valid.sum(axis=1).astype(float)
+    x = np.where(valid, benchmark[None, :] - rf, 0.0)
+    y = np.where(valid, returns - rf, 0.0)
+
+    # 正规方程 [[n, Σx], [Σx, Σx²]] [alpha, beta]ᵀ = [Σy, Σxy]ᵀ
+    sum_x = x.sum(axis=1)
+    sum_y = y.sum(axis=1)
+    sum_xx = (x * x).sum(axis=1)
+    sum_xy = (x * y).sum(axis=1)
+    sum_yy = (y * y).sum(axis=1)
+
+    lhs = np.empty((returns.shape[0], 2, 2))
+    lhs[:, 0, 0] = count
+    lhs[:, 0, 1] = lhs[:, 1, 0] = sum_x
+    lhs[:, 1, 1] = sum_xx
+    rhs = np.stack([sum_y, sum_xy], axis=1)[:, :, None]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_var = sum_xx / count - (sum_x / count) ** 2
+        y_var = sum_yy / count - (sum_y / count) ** 2
+        # 基准方差相对其二阶矩过小视为无波动（避免常数基准的舍入误差）
+        solvable = (count >= 3) & (x_var > 1e-12 * sum_xx / count)
+        # 不可解的行用单位矩阵占位，结果随后置为NaN
+        lhs[~solvable] = np.eye(2)
+        coefficients = np.linalg.solve(lhs, rhs)[:, :, 0]
+        alpha = np.where(solvable, coefficients[:, 0], np.nan)
+        beta = np.where(solvable, coefficients[:, 1], np.nan)
+
+        covariance = sum_xy / count - (sum_x / count) * (sum_y / count)
+        r_squared = np.where(solvable & (y_var > 0), covariance ** 2 / (x_var * y_var), np.nan)
+
+        # 主动收益
+        active = np.where(valid, returns - benchmark[None, :], 0.0)
+        active_mean = active.sum(axis=1) / count
+        active_dev = np.where(valid, active - active_mean[:, None], 0.0)
+        tracking_error = np.sqrt((active_dev ** 2).sum(axis=1) / count)
+        information_ratio = np.where(
+            (count >= 2) & (tracking_error > 0), active_mean / tracking_error, np.nan
+        )
+        tracking_error = np.where(count >= 2, tracking_error, np.nan)
+
+    return {
+        "data_points": count.astype(np.int64),
+        "beta": beta,
+        "alpha": alpha,
+        "annualized_alpha": alpha * periods,
+        "r_squared": r_squared,
+        "tracking_error": tracking_error,
+        "annualized_tracking_error": tracking_error * np.sqrt(periods),
+        "information_ratio": information_ratio,
+        "annualized_information_ratio": information_ratio * np.sqrt(periods)
+    }
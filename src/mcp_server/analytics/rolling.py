@@ -0,0 +1,92 @@
+"""
+滚动窗口风险指标
+
+基于前缀和在 O(n) 时间内计算每根K线的滚动平均收益率、滚动波动率和滚动夏普比率，
+窗口大小只影响一次相减，不会对每个窗口重新求和。多个窗口共享同一组前缀和，
+输入可以是 (n, T) 的多条序列。
+"""
+
+from typing import Dict, Sequence
+
+import numpy as np
+
+from .batch import PERIODS_PER_YEAR
+
+DEFAULT_WINDOWS = (20, 60, 252)
+
+
+def _prefix_sums(returns: np.ndarray):
+    """计算计数、一阶和二阶前缀和（首列补0）
+
+    先按行减去均值再求平方和，减小长序列上前缀和相减带来的精度损失。
+    """
+    valid = ~np.isnan(returns)
+    with np.errstate(invalid="ignore"):
+        shift = np.nanmean(returns, axis=1, keepdims=True)
+    shift = np.nan_to_num(shift)
+    centered = np.where(valid, returns - shift, 0.0)
+
+    pad = np.zeros((returns.shape[0], 1))
+    count = np.concatenate([pad, np.cumsum(valid, axis=1, dtype=np.float64)], axis=1)
+    s1 = np.concatenate([pad, np.cumsum(centered, axis=1)], axis=1)
+    s2 = np.concatenate([pad, np.cumsum(centered ** 2, axis=1)], axis=1)
+    return count, s1, s2, shift
+
+
+def rolling_metrics(returns: np.ndarray, windows: Sequence[int] = DEFAULT_WINDOWS,
+                    period: str = "daily", risk_free_rate: float = 0.02) -> Dict[int, Dict[str, np.ndarray]]:
+    """计算多窗口滚动指标
+
+    Args:
+        returns: (n, T) 收益率矩阵，NaN表示缺失；窗口内含缺失值时该位置结果为NaN
+        windows: 窗口大小列表
+        period: 数据周期，用于年化
+        risk_free_rate: 年化无风险利率
+
+    Returns:
+        {窗口: {"mean_return": (n, T), "volatility": (n, T), "sharpe": (n, T)}}，
+        波动率和夏普比率已年化，前 window-1 个位置为NaN
+    """
+    if period not in PERIODS_PER_YEAR:
+        raise ValueError(f"不支持的周期: {period}")
+    periods = PERIODS_PER_YEAR[period]
+    returns = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    n, length = returns.shape
+
+    count, s1, s2, shift = _prefix_sums(returns)
+    results = {}
+
+    for window in windows:
+        window = int(window)
+        if window < 2:
+            raise ValueError("窗口大小必须大于1")
+
+        mean = np.full((n, length), np.nan)
+        volatility = np.full((n, length), np.nan)
+        sharpe = np.full((n, length), np.nan)
+
+        if window <= length:
+            # 位置 t 的窗口为 [t-window+1, t]，对应前缀和下标 [t-window+1, t+1)
+            window_count = count[:, window:] - count[:, :-window]
+            window_sum = s1[:, window:] - s1[:, :-window]
+            window_sq = s2[:, window:] - s2[:, :-window]
+            complete = window_count == window
+
+            window_mean = window_sum / window
+            variance = np.maximum(window_sq / window - window_mean ** 2, 0.0)
+            window_std = np.sqrt(variance)
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                window_sharpe = (window_mean + shift - risk_free_rate / periods) / window_std
+
+            mean[:, window - 1:] = np.where(complete, window_mean + shift, np.nan)
+            volatility[:, window - 1:] = np.where(complete, window_std * np.sqrt(periods), np.nan)
+            sharpe[:, window - 1:] = np.where(complete & (window_std > 0), window_sharpe * np.sqrt(periods), np.nan)
+
+        results[window] = {
+            "mean_return": mean,
+            "volatility": volatility,
+            "sharpe": sharpe
+        }
+
+    return results
@@ -0,0 +1,168 @@
+"""
+增量统计状态
+
+为实时行情按序列ID保存运行统计量（数量、均值、M2、极值），新到的收益率
+只需与已有状态合并，读取当前收益率/波动率/夏普比率无需重新遍历完整历史。
+合并采用 Chan 等人的并行方差合并公式，单次更新的开销只与新增数据量有关。
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .batch import PERIODS_PER_YEAR
+
+DEFAULT_MAX_SERIES = 1024
+
+
+class StreamingStats:
+    """单条序列的运行统计量"""
+
+    __slots__ = ("series_type", "count", "mean", "m2", "min", "max",
+                 "log_growth", "last_price", "updated_at")
+
+    def __init__(self, series_type: str = "returns"):
+        if series_type not in ("prices", "returns"):
+            raise ValueError(f"不支持的序列类型: {series_type}")
+        self.series_type = series_type
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # 累计 log(1 + r)，用于计算累计收益率
+        self.log_growth = 0.0
+        self.last_price: Optional[float] = None
+        self.updated_at = time.time()
+
+    def update(self, values: Sequence[float]) -> int:
+        """追加新数据，返回新增的收益率个数
+
+        series_type 为 prices 时，values 为新的价格，与上次最后一个价格衔接计算收益率。
+        NaN 值被忽略。
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+
+        if self.series_type == "prices":
+            if values.size == 0:
+                return 0
+            if np.any(values <= 0):
+                raise ValueError("价格必须大于0")
+            if self.last_price is not None:
+                values = np.concatenate(([self.last_price], values))
+            self.last_price = float(values[-1])
+            returns = values[1:] / values[:-1] - 1
+        else:
+            returns = values
+            if np.any(returns <= -1):
+                raise ValueError("收益率必须大于-100%")
+
+        self._merge(returns)
+        self.updated_at = time.time()
+        return int(returns.size)
+
+    def _merge(self, returns: np.ndarray):
+        """把一批收益率合并到运行统计量"""
+        n_b = returns.size
+        if n_b == 0:
+            return
+        mean_b = float(returns.mean())
+        m2_b = float(((returns - mean_b) ** 2).sum())
+
+        n_a = self.count
+        total = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / total
+        self.m2 += m2_b + delta * delta * n_a * n_b / total
+        self.count = total
+
+        self.min = min(self.min, float(returns.min()))
+        self.max = max(self.max, float(returns.max()))
+        self.log_growth += float(np.log1p(returns).sum())
+
+    def snapshot(self, period: str = "daily", risk_free_rate: float = 0.02) -> Dict[str, Any]:
+        """当前的收益率、波动率和夏普比率
+
+        波动率为总体标准差，与 calculate_volatility / calculate_sharpe_ratio 一致。
+        """
+        if period not in PERIODS_PER_YEAR:
+            raise ValueError(f"不支持的周期: {period}")
+        periods = PERIODS_PER_YEAR[period]
+
+        result: Dict[str, Any] = {
+            "series_type": self.series_type,
+            "period": period,
+            "data_points": self.count,
+            "updated_at": self.updated_at
+        }
+        if self.count == 0:
+            return result
+
+        volatility = math.sqrt(self.m2 / self.count)
+        result.update({
+            "total_return_pct": round(math.expm1(self.log_growth) * 100, 4),
+            "avg_return_pct": round(self.mean * 100, 4),
+            "max_return_pct": round(self.max * 100, 4),
+            "min_return_pct": round(self.min * 100, 4),
+            "volatility_pct": round(volatility * 100, 4),
+            "annualized_volatility_pct": round(volatility * math.sqrt(periods) * 100, 4),
+            "sharpe_ratio": None,
+            "annualized_sharpe_ratio": None
+        })
+        if self.count >= 2 and volatility > 0:
+            sharpe = (self.mean - risk_free_rate / periods) / volatility
+            result["sharpe_ratio"] = round(sharpe, 4)
+            result["annualized_sharpe_ratio"] = round(sharpe * math.sqrt(periods), 4)
+        if self.last_price is not None:
+            result["last_price"] = self.last_price
+        return result
+
+
+class StreamingStatsStore:
+    """按序列ID保存增量统计状态，超过 max_series 时淘汰最久未更新的序列"""
+
+    def __init__(self, max_series: int = DEFAULT_MAX_SERIES):
+        if max_series < 1:
+            raise ValueError("max_series 必须大于0")
+        self.max_series = max_series
+        self._states: "OrderedDict[str, StreamingStats]" = OrderedDict()
+
+    def update(self, series_id: str, values: Sequence[float],
+               series_type: Optional[str] = None, reset: bool = False) -> StreamingStats:
+        """追加数据到指定序列，序列不存在或 reset 为真时新建状态
+
+        series_type 未指定时沿用已有序列的类型，新建序列默认为 returns。
+        """
+        state = None if reset else self._states.get(series_id)
+        if state is not None and series_type is not None and state.series_type != series_type:
+            raise ValueError(f"序列 {series_id} 的类型为 {state.series_type}，不能追加 {series_type}")
+        if state is None:
+            state = StreamingStats(series_type or "returns")
+            self._states[series_id] = state
+
+        state.update(values)
+        self._states.move_to_end(series_id)
+        while len(self._states) > self.max_series:
+            self._states.popitem(last=False)
+        return state
+
+    def get(self, series_id: str) -> StreamingStats:
+        """获取序列状态"""
+        state = self._states.get(series_id)
+        if state is None:
+            raise ValueError(f"序列不存在: {series_id}")
+        return state
+
+    def remove(self, series_id: str) -> bool:
+        """删除序列状态"""
+        return self._states.pop(series_id, None) is not None
+
+    def series_ids(self) -> List[str]:
+        return list(self._states.keys())
+
+    def __len__(self) -> int:
+        return len(self._states)
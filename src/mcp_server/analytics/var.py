@@ -0,0 +1,153 @@
+"""
+风险价值（VaR）与条件风险价值（CVaR）
+
+组合收益率由 (n, T) 资产收益率矩阵和权重得到，支持三种方法：
+
+- historical：历史模拟，horizon 天的收益率用重叠窗口的复利收益率
+- parametric：正态分布假设下的解析解
+- monte_carlo：按多元正态分布模拟各资产每日收益率，持有期内按资产复利后加权。
+  模拟按块生成（每块占用内存不超过上限，块数不少于计算进程数），每块有独立的随机种子
+  （由同一个 SeedSequence 派生），结果与块在哪个进程中执行无关，给定种子即可复现
+
+VaR / CVaR 均以正数表示损失比例，如 0.05 表示可能损失组合价值的 5%。
+"""
+
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+VAR_METHODS = ("historical", "parametric", "monte_carlo")
+DEFAULT_CONFIDENCE_LEVELS = (0.95, 0.99)
+DEFAULT_BLOCK_MEMORY_MB = 32
+# 每块至少的路径数，块太小时进程间传递参数和结果的开销超过模拟本身
+DEFAULT_MIN_BLOCK_PATHS = 1000
+
+# 每条路径每个资产每天在模拟中同时存在的 float64 数组个数（正态样本、收益率、累计净值）
+_ARRAYS_PER_CELL = 3
+
+
+def portfolio_returns(returns: np.ndarray, weights: Optional[Sequence[float]] = None) -> np.ndarray:
+    """(n, T) 资产收益率 -> 组合收益率（只用所有资产都有数据的时间点）"""
+    returns = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    returns = returns[:, ~np.isnan(returns).any(axis=0)]
+    return normalize_weights(weights, returns.shape[0]) @ returns
+
+
+def normalize_weights(weights: Optional[Sequence[float]], n: int) -> np.ndarray:
+    """校验权重并归一化为和为1，未提供时等权"""
+    if weights is None:
+        return np.full(n, 1.0 / n)
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.shape != (n,):
+        raise ValueError(f"权重数量 ({weights.size}) 与资产数量 ({n}) 不一致")
+    total = weights.sum()
+    if total == 0:
+        raise ValueError("权重之和不能为0")
+    return weights / total
+
+
+def horizon_returns(returns: np.ndarray, horizon: int) -> np.ndarray:
+    """单期收益率 -> 重叠的 horizon 期复利收益率"""
+    if horizon < 1:
+        raise ValueError("持有期必须大于0")
+    if horizon == 1:
+        return returns
+    if len(returns) < horizon:
+        raise ValueError(f"数据点不足以计算 {horizon} 期收益率")
+    log_growth = np.concatenate([[0.0], np.cumsum(np.log1p(returns))])
+    return np.expm1(log_growth[horizon:] - log_growth[:-horizon])
+
+
+def var_from_samples(samples: np.ndarray, confidence_levels: Sequence[float]) -> Dict[str, Dict[str, float]]:
+    """由收益率样本计算各置信水平的 VaR / CVaR"""
+    samples = np.sort(np.asarray(samples, dtype=np.float64))
+    if samples.size == 0:
+        raise ValueError("收益率样本为空")
+    result = {}
+    for level in confidence_levels:
+        _check_level(level)
+        threshold = np.quantile(samples, 1 - level)
+        tail = samples[: max(int(np.searchsorted(samples, threshold, side="right")), 1)]
+        result[str(level)] = {"var": float(-threshold), "cvar": float(-tail.mean())}
+    return result
+
+
+def historical_var(returns: np.ndarray, confidence_levels: Sequence[float] = DEFAULT_CONFIDENCE_LEVELS,
+                   horizon: int = 1) -> Dict[str, Dict[str, float]]:
+    """历史模拟法"""
+    return var_from_samples(horizon_returns(returns, horizon), confidence_levels)
+
+
+def parametric_var(returns: np.ndarray, confidence_levels: Sequence[float] = DEFAULT_CONFIDENCE_LEVELS,
+                   horizon: int = 1) -> Dict[str, Dict[str, float]]:
+    """正态分布参数法：VaR = -(μh + zσ√h)，CVaR = σ√h·φ(z)/(1-c) - μh"""
+    if len(returns) < 2:
+        raise ValueError("收益率序列至少需要2个数据点")
+    mean = float(np.mean(returns)) * horizon
+    std = float(np.std(returns, ddof=1)) * np.sqrt(horizon)
+    normal = NormalDist()
+    result = {}
+    for level in confidence_levels:
+        _check_level(level)
+        z = normal.inv_cdf(1 - level)
+        result[str(level)] = {
+            "var": -(mean + z * std),
+            "cvar": std * normal.pdf(z) / (1 - level) - mean
+        }
+    return result
+
+
+def plan_blocks(paths: int, n_assets: int, horizon: int,
+                max_block_bytes: int = DEFAULT_BLOCK_MEMORY_MB * 1024 * 1024,
+                min_blocks: int = 1, min_block_paths: int = DEFAULT_MIN_BLOCK_PATHS) -> List[int]:
+    """把模拟路径切分为内存不超过上限的块，返回各块的路径数
+
+    块数至少为 min_blocks（通常为计算进程数，使每个进程都有任务），
+    但每块不少于 min_block_paths 条路径，路径太少时少分几块以免进程间通信开销超过计算本身。
+    各块路径数至多相差1。
+    """
+    if paths < 1:
+        raise ValueError("模拟路径数必须大于0")
+    per_path = _ARRAYS_PER_CELL * horizon * n_assets * 8
+    by_memory = -(-paths // max(1, max_block_bytes // per_path))
+    by_workers = min(max(min_blocks, 1), max(1, paths // max(min_block_paths, 1)))
+    count = max(by_memory, by_workers)
+    block, extra = divmod(paths, count)
+    return [block + 1] * extra + [block] * (count - extra)
+
+
+def simulate_block(mean: np.ndarray, chol: np.ndarray, weights: np.ndarray, horizon: int,
+                   paths: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """模拟一个块的组合持有期收益率（在计算进程中执行）
+
+    各资产每日收益率 r = μ + Lz（LLᵀ 为协方差矩阵），
+    持有期内按资产复利：组合收益率 = Σ w_i Π_t (1 + r_it) - 1。
+    """
+    rng = np.random.default_rng(seed)
+    simulated = rng.standard_normal((paths, horizon, len(mean))) @ chol.T
+    simulated += mean
+    simulated += 1.0
+    growth = np.prod(simulated, axis=1)
+    return growth @ weights - 1.0
+
+
+def simulation_inputs(returns: np.ndarray):
+    """由 (n, T) 资产收益率估计模拟所需的均值和协方差因子 L（LLᵀ = Σ）"""
+    returns = np.atleast_2d(returns)
+    if returns.shape[1] < 2:
+        raise ValueError("收益率序列至少需要2个数据点")
+    mean = returns.mean(axis=1)
+    cov = np.atleast_2d(np.cov(returns))
+    try:
+        factor = np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        # 资产数多于样本数或资产完全相关时协方差矩阵奇异，改用特征分解
+        eigenvalues, eigenvectors = np.linalg.eigh(cov)
+        factor = eigenvectors * np.sqrt(np.maximum(eigenvalues, 0.0))
+    return mean, factor
+
+
+def _check_level(level: float):
+    if not 0 < level < 1:
+        raise ValueError(f"置信水平必须在 (0, 1) 区间内: {level}")
@@ -0,0 +1,48 @@
+"""
+财务数据配置加载
+
+读取 config/financial_config.yaml，供数据获取、缓存等模块共享。
+"""
+
+import logging
+from functools import lru_cache
+from typing import Any, Dict
+
+FINANCIAL_CONFIG_PATH = "config/financial_config.yaml"
+
+
+@lru_cache(maxsize=None)
+def load_financial_config(config_path: str = FINANCIAL_CONFIG_PATH) -> Dict[str, Any]:
+    """加载财务数据配置文件
+
+    Args:
+        config_path: 配置文件路径
+
+    Returns:
+        配置字典；文件不存在或无法解析时返回空字典，由调用方使用默认值
+    """
+    try:
+        import yaml
+    except ImportError:
+        logging.warning("PyYAML未安装，财务数据配置使用默认值")
+        return {}
+
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        logging.warning(f"配置文件 {config_path} 未找到，使用默认配置")
+        return {}
+    except yaml.YAMLError as e:
+        logging.warning(f"配置文件 {config_path} 解析失败: {e}，使用默认配置")
+        return {}
+
+
+def get_config_section(*keys: str) -> Dict[str, Any]:
+    """按路径获取配置小节，如 get_config_section("cache")"""
+    section: Any = load_financial_config()
+    for key in keys:
+        if not isinstance(section, dict):
+            return {}
+        section = section.get(key, {})
+    return section if isinstance(section, dict) else {}
@@ -0,0 +1,89 @@
+"""
+上游数据请求执行器
+
+yfinance 等数据源的调用都是同步阻塞的。这里用一个有界线程池承载这些调用，
+工具处理函数通过 await 执行器把请求移出事件循环，并为每次调用设置超时。
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from .config import get_config_section
+
+T = TypeVar("T")
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT = 30.0
+
+
+class DataFetchExecutor:
+    """有界线程池执行器
+
+    - max_workers 限制同时进行的上游请求数量，超出的请求在线程池队列中等待
+    - 每次调用有独立的超时；超时或被取消时，尚未开始执行的请求会从队列中撤销，
+      已在执行的请求无法中断，完成后结果被丢弃
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, timeout: float = DEFAULT_TIMEOUT):
+        if max_workers < 1:
+            raise ValueError("max_workers 必须大于0")
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="data-fetch")
+
+    async def run(self, func: Callable[..., T], *args: Any,
+                  timeout: Optional[float] = None, **kwargs: Any) -> T:
+        """在线程池中执行阻塞调用
+
+        Args:
+            func: 阻塞函数
+            timeout: 本次调用的超时秒数，默认使用执行器配置
+
+        Raises:
+            TimeoutError: 调用超时
+        """
+        timeout = self.timeout if timeout is None else timeout
+        call = functools.partial(func, *args, **kwargs)
+        future = asyncio.wrap_future(self._executor.submit(call))
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            name = getattr(func, "__name__", repr(func))
+            self.logger.warning(f"上游数据请求超时: {name} ({timeout}秒)")
+            raise TimeoutError(f"上游数据请求超时（{timeout}秒）")
+
+    def shutdown(self):
+        """关闭线程池，撤销排队中的请求"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_data_executor: Optional[DataFetchExecutor] = None
+
+
+def get_data_executor() -> DataFetchExecutor:
+    """获取进程内共享的数据请求执行器
+
+    线程数和超时读取 financial_config.yaml 中
+    financial_data.data_sources.yahoo_finance 的 max_workers / timeout。
+    """
+    global _data_executor
+    if _data_executor is None:
+        source_config = get_config_section("financial_data", "data_sources", "yahoo_finance")
+        _data_executor = DataFetchExecutor(
+            max_workers=int(source_config.get("max_workers", DEFAULT_MAX_WORKERS)),
+            timeout=float(source_config.get("timeout", DEFAULT_TIMEOUT))
+        )
+    return _data_executor
+
+
+def shutdown_data_executor():
+    """关闭共享执行器"""
+    global _data_executor
+    if _data_executor is not None:
+        _data_executor.shutdown()
+        _data_executor = None
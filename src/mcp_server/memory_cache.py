@@ -0,0 +1,139 @@
+"""
+进程内TTL+LRU缓存
+
+用于缓存 Ticker.info 以及 financials / balance_sheet / cashflow 等体积较大、
+日内变化很少的上游数据。条目超过TTL即失效，总大小超过内存预算时按LRU淘汰。
+"""
+
+import logging
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from .config import get_config_section
+
+DEFAULT_TTL = 900
+DEFAULT_MAX_SIZE_MB = 64
+
+
+def estimate_size(value: Any) -> int:
+    """估算对象占用的内存字节数"""
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        # NumPy 数组以及 PriceSeries 等列式对象，按数据缓冲区大小计
+        return nbytes
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        # pandas DataFrame / Series
+        usage = memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class AsyncTTLCache:
+    """带内存预算的异步TTL+LRU缓存"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_SIZE_MB * 1024 * 1024):
+        self.logger = logging.getLogger(__name__)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # key -> (过期时间, 大小, 值)，按最近使用顺序排列
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """读取缓存，未命中时调用 loader 加载并写入缓存"""
+        found, value = self.get(key)
+        if found:
+            return value
+        value = await loader()
+        self.set(key, value)
+        return value
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """读取缓存，返回 (是否命中, 值)"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, size, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, value
+            self._remove(key)
+            self.expirations += 1
+        self.misses += 1
+        return False, None
+
+    def set(self, key: Hashable, value: Any):
+        """写入缓存，超出内存预算时淘汰最久未使用的条目"""
+        if self.ttl <= 0:
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            self.logger.debug(f"缓存条目过大，不缓存: {key} ({size} 字节)")
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self):
+        """清空缓存"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+_info_cache: Optional[AsyncTTLCache] = None
+
+
+def get_info_cache() -> AsyncTTLCache:
+    """获取共享的公司信息/财务报表缓存
+
+    读取 financial_config.yaml 中 cache.memory 的 ttl 和 max_size_mb；
+    cache.enabled 为 false 时TTL为0，相当于不缓存。
+    """
+    global _info_cache
+    if _info_cache is None:
+        cache_config = get_config_section("cache")
+        memory_config = cache_config.get("memory", {}) or {}
+        ttl = float(memory_config.get("ttl", DEFAULT_TTL)) if cache_config.get("enabled", True) else 0.0
+        _info_cache = AsyncTTLCache(
+            ttl=ttl,
+            max_bytes=int(float(memory_config.get("max_size_mb", DEFAULT_MAX_SIZE_MB)) * 1024 * 1024)
+        )
+    return _info_cache
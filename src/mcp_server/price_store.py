@@ -0,0 +1,260 @@
+"""
+本地价格数据缓存
+
+按 (symbol, interval) 把历史K线以列式二进制文件保存在 cache.directory 下，
+每列一个定长数组文件，读取时通过 np.memmap 内存映射。缓存未过期（cache.ttl）
+时直接从磁盘返回；过期后只向上游请求最后一根缓存K线之后的数据并追加到缓存末尾
+（写入新文件后替换，已读取的数据不受影响）。
+
+目录结构::
+
+    {cache.directory}/prices/{SYMBOL}/{interval}/
+        meta.json        行数、时区、覆盖起点、最后更新时间
+        index.i8         K线时间（UTC纳秒）
+        open.f8 high.f8 low.f8 close.f8 volume.f8
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config_section
+
+# DataFrame列名 -> 文件名
+COLUMNS = {
+    "Open": "open.f8",
+    "High": "high.f8",
+    "Low": "low.f8",
+    "Close": "close.f8",
+    "Volume": "volume.f8",
+}
+INDEX_FILE = "index.i8"
+META_FILE = "meta.json"
+
+DEFAULT_CACHE_DIR = "./cache"
+DEFAULT_TTL = 3600
+
+# 上游请求函数：fetch(period=..., start=...) -> DataFrame，二者只传其一
+HistoryFetcher = Callable[..., pd.DataFrame]
+
+
+def period_start(period: str, now: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
+    """把yfinance的period换算为大致的起始时间（UTC），max返回None"""
+    now = now or pd.Timestamp.now(tz="UTC")
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1, tz="UTC")
+
+    match = re.fullmatch(r"(\d+)(d|mo|y)", period)
+    if not match:
+        raise ValueError(f"不支持的时间周期: {period}")
+    count, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        # 按交易日计，预留周末和节假日
+        return now - pd.Timedelta(days=count * 7 // 5 + 4)
+    if unit == "mo":
+        return now - pd.DateOffset(months=count)
+    return now - pd.DateOffset(years=count)
+
+
+class PriceStore:
+    """列式K线磁盘缓存"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(directory) / "prices"
+        self.ttl = ttl
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def get_history(self, symbol: str, period: str, interval: str,
+                    fetch: HistoryFetcher) -> pd.DataFrame:
+        """获取历史价格，优先使用磁盘缓存
+
+        阻塞调用，应在数据请求执行器线程中运行。
+
+        Args:
+            symbol: 股票代码
+            period: 时间周期
+            interval: K线间隔
+            fetch: 上游请求函数
+        """
+        key_dir = self._key_dir(symbol, interval)
+        start = period_start(period)
+
+        with self._lock(key_dir):
+            meta = self._read_meta(key_dir)
+            covered = meta is not None and self._covers(meta, start)
+            stale = meta is not None and time.time() - meta["updated_at"] > self.ttl
+
+            if not covered or (stale and meta["rows"] == 0):
+                # 无缓存或缓存覆盖区间不足，完整下载后重写
+                self._rewrite(key_dir, fetch(period=period), start)
+            elif stale:
+                # 缓存过期，只下载最后一根K线及之后的数据
+                last = pd.Timestamp(int(self._read_index(key_dir, meta)[-1]), tz="UTC")
+                self._append(key_dir, meta, fetch(start=last.tz_convert(meta["tz"])))
+
+            meta = self._read_meta(key_dir)
+            return self._slice(self._load(key_dir, meta), period)
+
+    def _covers(self, meta: Dict, start: Optional[pd.Timestamp]) -> bool:
+        """缓存是否覆盖请求的起始时间"""
+        covered_from = meta.get("covered_from")
+        if covered_from is None:
+            return True
+        return start is not None and covered_from <= start.value
+
+    def _rewrite(self, key_dir: Path, frame: pd.DataFrame, start: Optional[pd.Timestamp]):
+        """用完整下载的数据重写缓存"""
+        key_dir.mkdir(parents=True, exist_ok=True)
+        index, columns = self._to_arrays(frame)
+
+        for name, values in [(INDEX_FILE, index)] + [(COLUMNS[c], columns[c]) for c in COLUMNS]:
+            tmp_path = key_dir / f"{name}.tmp"
+            values.tofile(tmp_path)
+            os.replace(tmp_path, key_dir / name)
+
+        self._write_meta(key_dir, {
+            "rows": len(index),
+            "tz": self._tz_name(frame),
+            "covered_from": None if start is None else start.value,
+            "updated_at": time.time()
+        })
+
+    def _append(self, key_dir: Path, meta: Dict, frame: pd.DataFrame):
+        """追加增量数据
+
+        最后一根缓存K线可能是未收盘的，增量数据从它开始下载，
+        因此先截掉缓存中时间不早于增量首行的部分再追加。
+        每列写入临时文件后整体替换，不原地修改：此前 _load 返回的内存映射
+        （以及引用它们的 DataFrame、PriceSeries）仍指向旧文件，内容保持不变。
+        """
+        index, columns = self._to_arrays(frame)
+        rows = meta["rows"]
+
+        if len(index):
+            cached_index = self._read_index(key_dir, meta)
+            rows = int(np.searchsorted(cached_index, index[0], side="left"))
+
+        for name, values in [(INDEX_FILE, index)] + [(COLUMNS[c], columns[c]) for c in COLUMNS]:
+            # 只保留前 rows 行，同时丢弃上次写入中断时残留在文件尾部的数据
+            kept = np.fromfile(key_dir / name, dtype=values.dtype, count=rows)
+            tmp_path = key_dir / f"{name}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(kept.tobytes())
+                f.write(values.tobytes())
+            os.replace(tmp_path, key_dir / name)
+
+        meta = dict(meta, rows=rows + len(index), updated_at=time.time())
+        self._write_meta(key_dir, meta)
+        self.logger.debug(f"价格缓存追加 {key_dir}: {len(index)} 行")
+
+    def _load(self, key_dir: Path, meta: Dict) -> pd.DataFrame:
+        """以内存映射方式读取缓存，不复制数据
+
+        每列一个内存映射数组；copy=False 时 pandas 按列各建一个块、不合并为二维数组，
+        DataFrame 的各列直接引用内存映射，PriceSeries.from_dataframe 再引用同一内存。
+        """
+        rows = meta["rows"]
+        index = pd.DatetimeIndex(self._read_index(key_dir, meta), tz="UTC").tz_convert(meta["tz"])
+        data = {
+            column: self._memmap(key_dir / filename, np.float64, rows)
+            for column, filename in COLUMNS.items()
+        }
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def _read_index(self, key_dir: Path, meta: Dict) -> np.ndarray:
+        return self._memmap(key_dir / INDEX_FILE, np.int64, meta["rows"])
+
+    @staticmethod
+    def _memmap(path: Path, dtype, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+
+    @staticmethod
+    def _slice(frame: pd.DataFrame, period: str) -> pd.DataFrame:
+        """按请求的period截取数据
+
+        索引按时间升序，按位置截取尾部得到各列的视图，不复制内存映射的数据。
+        """
+        if frame.empty or period == "max":
+            return frame
+        if period.endswith("d") and period[:-1].isdigit():
+            # 与yfinance一致，Nd表示最近N个交易日
+            sessions = frame.index.normalize().unique()
+            start = sessions[-min(int(period[:-1]), len(sessions))]
+        else:
+            start = period_start(period)
+        return frame.iloc[int(frame.index.searchsorted(start, side="left")):]
+
+    @staticmethod
+    def _to_arrays(frame: pd.DataFrame):
+        """DataFrame -> (UTC纳秒索引, 各列float64数组)"""
+        if frame.empty:
+            return np.empty(0, dtype=np.int64), {c: np.empty(0) for c in COLUMNS}
+        index = frame.index
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        index_values = np.ascontiguousarray(index.tz_convert("UTC").as_unit("ns").asi8, dtype=np.int64)
+        columns = {
+            column: np.ascontiguousarray(frame[column].to_numpy(dtype=np.float64, na_value=np.nan))
+            if column in frame else np.full(len(frame), np.nan)
+            for column in COLUMNS
+        }
+        return index_values, columns
+
+    @staticmethod
+    def _tz_name(frame: pd.DataFrame) -> str:
+        tz = getattr(frame.index, "tz", None)
+        return str(tz) if tz is not None else "UTC"
+
+    @staticmethod
+    def _read_meta(key_dir: Path) -> Optional[Dict]:
+        try:
+            with open(key_dir / META_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _write_meta(key_dir: Path, meta: Dict):
+        tmp_path = key_dir / f"{META_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, key_dir / META_FILE)
+
+    def _key_dir(self, symbol: str, interval: str) -> Path:
+        safe_symbol = re.sub(r"[^A-Za-z0-9._-]", "_", symbol.upper())
+        return self.root / safe_symbol / interval
+
+    def _lock(self, key_dir: Path) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(str(key_dir), threading.Lock())
+
+
+_price_store: Optional[PriceStore] = None
+
+
+def get_price_store() -> Optional[PriceStore]:
+    """获取共享的价格缓存，cache.enabled 为 false 时返回 None"""
+    global _price_store
+    cache_config = get_config_section("cache")
+    if not cache_config.get("enabled", True):
+        return None
+    if _price_store is None:
+        _price_store = PriceStore(
+            directory=cache_config.get("directory", DEFAULT_CACHE_DIR),
+            ttl=float(cache_config.get("ttl", DEFAULT_TTL))
+        )
+    return _price_store
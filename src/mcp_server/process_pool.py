@@ -0,0 +1,144 @@
+"""
+计算密集型任务的进程池
+
+蒙特卡洛模拟等纯CPU计算会长时间持有GIL，放在线程池中无法并行，也会拖慢事件循环。
+这里维护一个进程内共享、常驻的进程池，工具处理函数通过 await 把任务交给子进程执行。
+报告的 PDF 和图表渲染使用另一个常驻进程池，子进程启动时预加载绘图库。
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, Sequence, TypeVar
+
+from .config import get_config_section
+
+T = TypeVar("T")
+
+DEFAULT_START_METHOD = "spawn"
+
+
+class ComputePool:
+    """常驻进程池
+
+    - 子进程在首次提交任务时启动，之后一直复用，避免每次调用重新导入NumPy等模块
+    - 默认使用 spawn 启动方式：服务进程中已有数据请求线程，fork 出的子进程可能继承被占用的锁
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, start_method: str = DEFAULT_START_METHOD,
+                 initializer: Optional[Callable[..., None]] = None, initargs: Sequence[Any] = ()):
+        """
+        Args:
+            max_workers: 进程数，默认为CPU核数
+            start_method: 子进程启动方式
+            initializer: 子进程启动时执行一次的函数（如预先导入绘图库），必须可被 pickle
+            initargs: initializer 的参数
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if self.max_workers < 1:
+            raise ValueError("max_workers 必须大于0")
+        self.start_method = start_method
+        self.initializer = initializer
+        self.initargs = tuple(initargs)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._started = False
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=self.initializer,
+                initargs=self.initargs
+            )
+            self.logger.debug(f"计算进程池已启动: {self.max_workers} 个进程 ({self.start_method})")
+        return self._executor
+
+    async def start(self):
+        """启动全部子进程并等待其就绪，已启动时立即返回
+
+        ProcessPoolExecutor 在提交任务时才按需启动子进程，需要计时的任务可以先调用本方法，
+        把进程启动的开销排除在外。
+        """
+        if self._started and self._executor is not None:
+            return
+        await asyncio.gather(*(self.run(os.getpid) for _ in range(self.max_workers)))
+        self._started = True
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """在子进程中执行 func，func 及其参数必须可被 pickle"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        """关闭进程池，撤销排队中的任务"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._started = False
+
+
+_compute_pool: Optional[ComputePool] = None
+
+
+def get_compute_pool() -> ComputePool:
+    """获取进程内共享的计算进程池
+
+    进程数和启动方式读取 financial_config.yaml 中 analysis.compute_pool 的
+    max_workers / start_method，max_workers 默认为CPU核数。
+    """
+    global _compute_pool
+    if _compute_pool is None:
+        pool_config = get_config_section("analysis", "compute_pool")
+        max_workers = pool_config.get("max_workers")
+        _compute_pool = ComputePool(
+            max_workers=int(max_workers) if max_workers else None,
+            start_method=pool_config.get("start_method", DEFAULT_START_METHOD)
+        )
+    return _compute_pool
+
+
+def shutdown_compute_pool():
+    """关闭共享进程池"""
+    global _compute_pool
+    if _compute_pool is not None:
+        _compute_pool.shutdown()
+        _compute_pool = None
+
+
+_render_pool: Optional[ComputePool] = None
+
+
+def get_render_pool() -> ComputePool:
+    """获取进程内共享的报告渲染进程池（PDF、图表）
+
+    与计算进程池分开，避免批量出图和蒙特卡洛模拟互相排队。进程数和启动方式读取
+    financial_config.yaml 中 reports.render_pool，子进程启动时按 reports.charts
+    预加载 matplotlib 和 reportlab，之后每次渲染不再承担导入和字体加载的开销。
+    """
+    global _render_pool
+    if _render_pool is None:
+        from .rendering import chart_config, preload_renderer
+
+        pool_config = get_config_section("reports", "render_pool")
+        max_workers = pool_config.get("max_workers")
+        charts = chart_config()
+        _render_pool = ComputePool(
+            max_workers=int(max_workers) if max_workers else None,
+            start_method=pool_config.get("start_method", DEFAULT_START_METHOD),
+            initializer=preload_renderer,
+            initargs=(charts["style"], charts["fonts"])
+        )
+    return _render_pool
+
+
+def shutdown_render_pool():
+    """关闭共享渲染进程池"""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown()
+        _render_pool = None
@@ -0,0 +1,125 @@
+"""
+MCP工具注册表
+
+汇总所有工具类的Tool定义，维护工具名到处理函数的映射，
+由服务器统一分发工具调用。支持延迟加载：工具组可以只登记静态Tool定义，
+在首次调用其中某个工具时才导入并实例化对应的工具类。
+"""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from mcp.types import (
+    CallToolRequest,
+    CallToolResult,
+    ListToolsRequest,
+    ListToolsResult,
+    TextContent,
+    Tool,
+)
+
+ToolHandler = Callable[[Dict[str, Any]], Awaitable[CallToolResult]]
+ToolLoader = Callable[[], Dict[str, ToolHandler]]
+
+
+class ToolRegistry:
+    """工具注册表
+
+    启动时一次性合并各工具类的Tool定义并缓存ListToolsResult，
+    调用时按工具名直接查表分发，不再经过各工具类的if/elif链。
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._tools: Dict[str, Tool] = {}
+        self._handlers: Dict[str, ToolHandler] = {}
+        self._loaders: Dict[str, ToolLoader] = {}
+        self._list_result: Optional[ListToolsResult] = None
+
+    def register(self, tools: List[Tool], handlers: Dict[str, ToolHandler]):
+        """注册一组工具
+
+        Args:
+            tools: 工具定义列表
+            handlers: 工具名到处理函数的映射
+        """
+        for tool in tools:
+            if tool.name not in handlers:
+                raise ValueError(f"工具 {tool.name} 缺少处理函数")
+        self._add_tools(tools)
+        for tool in tools:
+            self._handlers[tool.name] = handlers[tool.name]
+
+    def register_lazy(self, tools: List[Tool], loader: ToolLoader):
+        """注册一组延迟加载的工具
+
+        Args:
+            tools: 工具定义列表（静态元数据）
+            loader: 首次调用该组工具时执行，返回工具名到处理函数的映射
+        """
+        self._add_tools(tools)
+        for tool in tools:
+            self._loaders[tool.name] = loader
+
+    def load_all(self):
+        """立即加载所有延迟注册的工具组"""
+        for loader in list(dict.fromkeys(self._loaders.values())):
+            self._load(loader)
+
+    def _add_tools(self, tools: List[Tool]):
+        """登记工具定义"""
+        for tool in tools:
+            if tool.name in self._tools:
+                raise ValueError(f"工具名称重复: {tool.name}")
+            self._tools[tool.name] = tool
+
+        # 工具集变化后重新生成缓存
+        self._list_result = None
+
+    def _load(self, loader: ToolLoader):
+        """执行加载函数，把返回的处理函数登记到分发表"""
+        names = [name for name, pending in self._loaders.items() if pending is loader]
+        handlers = loader()
+        for name in names:
+            if name not in handlers:
+                raise ValueError(f"工具 {name} 缺少处理函数")
+            self._handlers[name] = handlers[name]
+            del self._loaders[name]
+        self.logger.info(f"已加载工具: {', '.join(names)}")
+
+    @property
+    def tool_names(self) -> List[str]:
+        """已注册的工具名称"""
+        return list(self._tools)
+
+    async def list_tools(self, request: ListToolsRequest) -> ListToolsResult:
+        """返回预先合并并缓存的工具列表"""
+        if self._list_result is None:
+            self._list_result = ListToolsResult(tools=list(self._tools.values()))
+        return self._list_result
+
+    async def dispatch(self, name: str, arguments: Optional[Dict[str, Any]]) -> CallToolResult:
+        """按工具名分发调用"""
+        try:
+            handler = self._handlers.get(name)
+            if handler is None and name in self._loaders:
+                self._load(self._loaders[name])
+                handler = self._handlers[name]
+            if handler is None:
+                raise ValueError(f"未知的工具: {name}")
+            return await handler(arguments or {})
+
+        except Exception as e:
+            self.logger.error(f"工具调用失败 [{name}]: {e}")
+            return CallToolResult(
+                content=[
+                    TextContent(
+                        type="text",
+                        text=f"错误: {str(e)}"
+                    )
+                ]
+            )
+
+    async def call_tool(self, request: CallToolRequest) -> CallToolResult:
+        """调用工具"""
+        return await self.dispatch(request.params.name, request.params.arguments)
@@ -0,0 +1,256 @@
+"""
+报告的 PDF 与图表渲染
+
+matplotlib 绘图和 reportlab 排版都是纯CPU计算，放在渲染进程池（process_pool.get_render_pool）
+的子进程中执行，不阻塞事件循环，批量生成时多个报告的图表在多个核上并行渲染：
+
+- 子进程启动时由 preload_renderer 导入绘图库、应用图表样式、注册中文字体并预渲染一张空图，
+  之后每次渲染不再承担这些开销
+- 子进程只返回 PNG / PDF 字节，文件由主进程中的报告写入器落盘（原子提交、批量 fsync）
+- 图表以描述字典传给子进程，如 {"kind": "price", "title": ..., "close": ...}
+"""
+
+import io
+import logging
+import warnings
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from .config import get_config_section
+
+# 文本报告之外支持生成的格式
+DOCUMENT_FORMATS = ("pdf", "png")
+DEFAULT_CHART_STYLE = "seaborn"
+DEFAULT_FIGURE_SIZE = (12, 8)
+DEFAULT_DPI = 100
+# 图表中文字体的候选列表，按顺序使用系统中第一个可用的字体
+DEFAULT_CJK_FONTS = ("SimHei", "Microsoft YaHei", "PingFang SC", "Noto Sans CJK SC", "WenQuanYi Zen Hei")
+# reportlab 内置的中文字体，无需字体文件
+PDF_FONT = "STSong-Light"
+
+_preloaded = False
+
+
+def chart_config() -> Dict[str, Any]:
+    """读取 financial_config.yaml 中的 reports.charts"""
+    charts = get_config_section("reports", "charts")
+    return {
+        "enabled": bool(charts.get("enabled", True)),
+        "style": charts.get("style", DEFAULT_CHART_STYLE),
+        "figure_size": tuple(charts.get("figure_size", DEFAULT_FIGURE_SIZE)),
+        "dpi": int(charts.get("dpi", DEFAULT_DPI)),
+        "fonts": list(charts.get("fonts") or DEFAULT_CJK_FONTS)
+    }
+
+
+def resolve_formats(requested: Optional[Sequence[str]] = None) -> List[str]:
+    """确定要生成的格式，未指定时使用 reports.output.formats 中支持的格式（默认为空，只生成文本报告）"""
+    if requested is None:
+        configured = get_config_section("reports", "output").get("formats", [])
+        return [name for name in DOCUMENT_FORMATS if name in configured]
+    unknown = [name for name in requested if name not in DOCUMENT_FORMATS]
+    if unknown:
+        raise ValueError(f"不支持的报告格式: {', '.join(unknown)}，可选 {', '.join(DOCUMENT_FORMATS)}")
+    return list(dict.fromkeys(requested))
+
+
+def preload_renderer(style: str = DEFAULT_CHART_STYLE, fonts: Sequence[str] = DEFAULT_CJK_FONTS):
+    """渲染子进程的初始化函数：导入绘图库、设置样式和字体，预渲染一张空图"""
+    global _preloaded
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    from reportlab.platypus import SimpleDocTemplate  # noqa: F401 预先导入排版模块
+
+    from . import analytics  # noqa: F401 股价图的均线计算
+
+    # matplotlib 3.6 起 seaborn 样式更名为 seaborn-v0_8
+    for name in (style, f"{style}-v0_8"):
+        if name in plt.style.available:
+            plt.style.use(name)
+            break
+    plt.rcParams["font.sans-serif"] = list(fonts) + plt.rcParams["font.sans-serif"]
+    plt.rcParams["axes.unicode_minus"] = False
+    # 系统中没有中文字体时图表照常生成，不逐个字形告警
+    logging.getLogger("matplotlib.font_manager").setLevel(logging.ERROR)
+    warnings.filterwarnings("ignore", message=r"Glyph .* missing from")
+
+    pdfmetrics.registerFont(UnicodeCIDFont(PDF_FONT))
+    figure = plt.figure(figsize=(1, 1))
+    figure.savefig(io.BytesIO(), format="png")
+    plt.close(figure)
+    _preloaded = True
+
+
+def _subplots(figure_size: Sequence[float], dpi: int):
+    import matplotlib.pyplot as plt
+    return plt.subplots(figsize=tuple(figure_size), dpi=dpi)
+
+
+def _to_png(figure) -> bytes:
+    import matplotlib.pyplot as plt
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(figure)
+    return buffer.getvalue()
+
+
+def price_chart(title: str, close: Sequence[float], dates: Optional[np.ndarray] = None,
+                figure_size: Sequence[float] = DEFAULT_FIGURE_SIZE, dpi: int = DEFAULT_DPI) -> bytes:
+    """收盘价走势及50日、200日均线"""
+    from .analytics import compute_indicators
+
+    close = np.asarray(close, dtype=np.float64)
+    x = dates if dates is not None else np.arange(len(close))
+    columns = compute_indicators(close, indicators=["sma"], params={"sma": {"windows": [50, 200]}})
+    figure, axes = _subplots(figure_size, dpi)
+    axes.plot(x, close, label="收盘价", linewidth=1.5)
+    for window in (50, 200):
+        average = columns[f"sma_{window}"][0]
+        if not np.isnan(average).all():
+            axes.plot(x, average, label=f"{window}日均线", linewidth=1)
+    axes.set_title(title)
+    axes.set_ylabel("价格")
+    axes.legend()
+    return _to_png(figure)
+
+
+def ratio_chart(title: str, ratios: Dict[str, float],
+                figure_size: Sequence[float] = DEFAULT_FIGURE_SIZE, dpi: int = DEFAULT_DPI) -> bytes:
+    """财务比率横向条形图（比率以百分比显示）"""
+    names = list(ratios)
+    values = np.array([ratios[name] for name in names], dtype=np.float64) * 100
+    figure, axes = _subplots(figure_size, dpi)
+    bars = axes.barh(names, values)
+    axes.bar_label(bars, labels=[f"{value:.1f}%" for value in values], padding=3)
+    axes.invert_yaxis()
+    axes.set_title(title)
+    axes.set_xlabel("%")
+    return _to_png(figure)
+
+
+def weights_chart(title: str, symbols: Sequence[str], weights: Sequence[float],
+                  figure_size: Sequence[float] = DEFAULT_FIGURE_SIZE, dpi: int = DEFAULT_DPI) -> bytes:
+    """组合权重条形图"""
+    values = np.asarray(weights, dtype=np.float64) * 100
+    figure, axes = _subplots(figure_size, dpi)
+    bars = axes.bar(list(symbols), values)
+    axes.bar_label(bars, labels=[f"{value:.1f}%" for value in values], padding=3)
+    axes.set_title(title)
+    axes.set_ylabel("权重 (%)")
+    return _to_png(figure)
+
+
+def growth_chart(title: str, growth: Sequence[float],
+                 figure_size: Sequence[float] = DEFAULT_FIGURE_SIZE, dpi: int = DEFAULT_DPI) -> bytes:
+    """组合净值曲线（期初为1）"""
+    figure, axes = _subplots(figure_size, dpi)
+    axes.plot(np.asarray(growth, dtype=np.float64), linewidth=1.5)
+    axes.axhline(1.0, color="gray", linewidth=0.8, linestyle="--")
+    axes.set_title(title)
+    axes.set_xlabel("交易日")
+    axes.set_ylabel("净值")
+    return _to_png(figure)
+
+
+CHART_RENDERERS = {
+    "price": price_chart,
+    "ratios": ratio_chart,
+    "weights": weights_chart,
+    "growth": growth_chart
+}
+
+
+def render_pdf(title: str, text: str, images: Sequence[bytes] = ()) -> bytes:
+    """把文本报告排版为PDF（A4，中文字体），图表附在正文之后"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import ImageReader
+    from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer
+
+    buffer = io.BytesIO()
+    document = SimpleDocTemplate(
+        buffer, pagesize=A4, title=title,
+        leftMargin=18 * mm, rightMargin=18 * mm, topMargin=18 * mm, bottomMargin=18 * mm
+    )
+    title_style = ParagraphStyle("ReportTitle", fontName=PDF_FONT, fontSize=16, leading=22, spaceAfter=10)
+    body_style = ParagraphStyle("ReportBody", fontName=PDF_FONT, fontSize=9, leading=13, wordWrap="CJK")
+
+    story = [Paragraph(escape(title), title_style)]
+    for line in text.splitlines():
+        stripped = line.lstrip(" ")
+        if not stripped.strip():
+            story.append(Spacer(1, body_style.leading / 2))
+            continue
+        # 保留行首缩进
+        indent = "&nbsp;" * (len(line) - len(stripped))
+        story.append(Paragraph(indent + escape(stripped), body_style))
+    for png in images:
+        width, height = ImageReader(io.BytesIO(png)).getSize()
+        scale = min(document.width / width, document.height / height)
+        story.append(Spacer(1, 6 * mm))
+        story.append(Image(io.BytesIO(png), width=width * scale, height=height * scale))
+    document.build(story)
+    return buffer.getvalue()
+
+
+def build_documents(title: str, text: str, charts: Sequence[Dict[str, Any]], formats: Sequence[str],
+                    figure_size: Sequence[float] = DEFAULT_FIGURE_SIZE,
+                    dpi: int = DEFAULT_DPI) -> Dict[str, Any]:
+    """渲染图表和PDF（在渲染子进程中执行）
+
+    Returns:
+        {"png": {图表类型: PNG字节}, "pdf": PDF字节}，只包含 formats 中的格式
+    """
+    if not _preloaded:
+        preload_renderer()
+    images = []
+    for chart in charts:
+        options = {key: value for key, value in chart.items() if key != "kind"}
+        images.append((chart["kind"], CHART_RENDERERS[chart["kind"]](figure_size=figure_size, dpi=dpi, **options)))
+    outputs: Dict[str, Any] = {}
+    if "png" in formats:
+        outputs["png"] = dict(images)
+    if "pdf" in formats:
+        outputs["pdf"] = render_pdf(title, text, [png for _, png in images])
+    return outputs
+
+
+async def render_documents(pool, writer, report_path: Path, title: str, text: str,
+                           charts: Sequence[Dict[str, Any]], formats: Sequence[str]) -> List[Tuple[Path, Future]]:
+    """在渲染进程池中生成文本报告对应的PDF和图表，并交给报告写入器落盘
+
+    文件与文本报告同名：report.pdf、report_<图表类型>.png。
+    图表在请求了 png 格式或 reports.charts.enabled 为 true 时绘制（后者会嵌入PDF）。
+
+    Args:
+        pool: 渲染进程池（ComputePool）
+        writer: 报告写入器（ReportWriter）
+
+    Returns:
+        [(文件路径, 落盘完成时结束的 Future)]
+    """
+    if not formats:
+        return []
+    options = chart_config()
+    if "png" not in formats and not options["enabled"]:
+        charts = []
+    outputs = await pool.run(
+        build_documents, title, text, list(charts), list(formats), options["figure_size"], options["dpi"]
+    )
+    report_path = Path(report_path)
+    written = []
+    for kind, png in outputs.get("png", {}).items():
+        path = report_path.with_name(f"{report_path.stem}_{kind}.png")
+        written.append((path, await writer.write(path, png)))
+    if "pdf" in outputs:
+        path = report_path.with_suffix(".pdf")
+        written.append((path, await writer.write(path, outputs["pdf"])))
+    return written
@@ -0,0 +1,160 @@
+"""
+按内容寻址的报告缓存
+
+报告正文完全由输入决定（报告参数、数据快照和模板），对这些输入的规范化JSON
+计算 SHA-256 作为报告的内容地址，正文以 <摘要>.txt 保存在缓存目录中：
+
+- 命中时不再渲染和写入，新报告文件名以硬链接指向已有正文；
+  文件系统不支持硬链接时直接返回缓存中的正文文件
+- 未命中时正常生成，报告文件落盘后再硬链接进缓存目录，正文只写一次
+- PDF、图表等附加文件以 <摘要><后缀> 保存在同一目录，报告命中时一并复用，不重新渲染
+- 缓存目录可跨进程、跨重启复用；报告生成代码变化时递增 CACHE_VERSION 使旧缓存失效
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .config import get_config_section
+
+# 报告内容的生成逻辑变化时递增
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = "./output/.report_cache"
+
+
+def canonical_digest(inputs: Dict[str, Any]) -> str:
+    """输入的规范化JSON（键排序、无多余空白）的 SHA-256"""
+    payload = json.dumps(
+        {"version": CACHE_VERSION, "inputs": inputs},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """内容寻址的报告正文存储"""
+
+    def __init__(self, directory: Path, suffix: str = ".txt"):
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.stored = 0
+        self.links = 0
+
+    def path_for(self, digest: str, suffix: Optional[str] = None) -> Path:
+        return self.directory / f"{digest}{suffix or self.suffix}"
+
+    def reuse(self, digest: str, target: Path) -> Optional[Tuple[str, Path]]:
+        """命中时返回 (正文, 报告文件路径)，未命中返回None
+
+        报告文件路径为指向缓存正文的硬链接 target；无法创建硬链接时为缓存正文本身。
+        会读取文件，应在线程中调用。
+        """
+        blob = self.path_for(digest)
+        try:
+            content = blob.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return content, self._link(blob, target)
+
+    def reuse_file(self, digest: str, target: Path, suffix: str) -> Optional[Path]:
+        """不读取内容的 reuse（用于PDF、图表等二进制文件），命中时返回文件路径"""
+        blob = self.path_for(digest, suffix)
+        if not blob.is_file():
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return self._link(blob, target)
+
+    def _link(self, blob: Path, target: Path) -> Path:
+        """把缓存文件硬链接到 target，无法链接时返回缓存文件本身"""
+        try:
+            os.link(blob, target)
+        except FileExistsError:
+            # 同名报告文件已存在（同一秒内重复生成），除非它就是缓存正文，否则不覆盖
+            if not os.path.samefile(blob, target):
+                return blob
+            return Path(target)
+        except OSError as e:
+            self.logger.debug(f"无法创建硬链接 {target}，直接使用缓存文件: {e}")
+            return blob
+        with self._lock:
+            self.links += 1
+        return Path(target)
+
+    def record_bypass(self):
+        """记录一次跳过缓存的生成"""
+        with self._lock:
+            self.bypassed += 1
+
+    def store(self, digest: str, report_path: Path, written: Optional[Future] = None,
+              suffix: Optional[str] = None):
+        """报告文件落盘后把它硬链接进缓存目录
+
+        Args:
+            digest: 报告输入的摘要
+            report_path: 报告文件路径
+            written: 报告写入器返回的 Future，提供时在写入成功后再链接
+            suffix: 缓存文件后缀，默认为正文后缀（如 .txt），PDF等文件使用各自的后缀
+        """
+        if written is None:
+            self._store(digest, report_path, suffix)
+            return
+        written.add_done_callback(
+            lambda future: None if future.exception() else self._store(digest, report_path, suffix)
+        )
+
+    def _store(self, digest: str, report_path: Path, suffix: Optional[str] = None):
+        blob = self.path_for(digest, suffix)
+        try:
+            os.link(report_path, blob)
+        except FileExistsError:
+            return
+        except OSError as e:
+            self.logger.warning(f"报告加入缓存失败 {report_path}: {e}")
+            return
+        with self._lock:
+            self.stored += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        lookups = self.hits + self.misses
+        return {
+            "directory": str(self.directory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "bypassed": self.bypassed,
+            "stored": self.stored,
+            "links": self.links
+        }
+
+
+_report_cache: Optional[ReportCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_report_cache() -> ReportCache:
+    """获取进程内共享的报告缓存，目录读取 financial_config.yaml 中的 reports.cache.directory"""
+    global _report_cache
+    with _cache_lock:
+        if _report_cache is None:
+            cache_config = get_config_section("reports", "cache")
+            _report_cache = ReportCache(Path(cache_config.get("directory", DEFAULT_CACHE_DIR)))
+    return _report_cache
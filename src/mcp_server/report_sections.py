@@ -0,0 +1,136 @@
+"""
+按段缓存的报告渲染
+
+报告模板由若干 {% block %} 分段依次组成，每段声明它依赖的输入（上下文变量名，
+或 data.字段名 形式的数据字段）。渲染时对每段的依赖值和模板源码计算指纹：
+
+- 指纹未变的分段直接取缓存中的文本，不再调用耗时的内容生成函数（业务分析、投资建议等）
+- 只重新计算依赖发生变化的分段（如股价变动只影响摘要和技术分析），再按顺序拼接
+- 分段文本放在进程内 TTL+LRU 缓存中，以指纹为键，受内存预算限制
+- render_async 供内容由异步函数生成的报告（如逐段调用AI模型）使用，需要重新生成的分段并发执行
+- producer 返回的上下文中 UNCACHED 为真时，该段照常渲染但不写入缓存（如AI模型失败后的降级内容）
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import get_config_section
+from .memory_cache import AsyncTTLCache
+from .report_cache import canonical_digest
+from .report_templates import ReportTemplates
+
+DEFAULT_SECTION_TTL = 86400
+DEFAULT_SECTION_MAX_SIZE_MB = 16
+# producer 返回的上下文中的标记键：该段本次的内容不写入缓存
+UNCACHED = "_uncached"
+
+
+def resolve_dependency(context: Dict[str, Any], name: str) -> Any:
+    """依赖名 -> 当前值：symbol 取上下文变量，data.pe_ratio 取上下文中 data 的字段（缺失为None）"""
+    head, _, field = name.partition(".")
+    value = context.get(head)
+    if field:
+        return value.get(field) if isinstance(value, dict) else None
+    return value
+
+
+class SectionedReport:
+    """由带依赖声明的分段组成的报告模板"""
+
+    def __init__(self, templates: ReportTemplates, template: str,
+                 sections: Dict[str, Sequence[str]], cache: AsyncTTLCache,
+                 related_templates: Sequence[str] = ()):
+        """
+        Args:
+            templates: 报告模板集合
+            template: 报告模板名称（不含 .j2），其中每个分段是一个同名 block
+            sections: 分段名 -> 依赖的输入名，按在报告中的顺序排列
+            cache: 分段文本缓存
+            related_templates: 分段内容用到的其他模板，修改后所有分段失效
+        """
+        self.templates = templates
+        self.template = template
+        self.sections = dict(sections)
+        self.cache = cache
+        self.related_templates = tuple(related_templates)
+
+    def fingerprint(self, section: str, context: Dict[str, Any]) -> str:
+        """分段指纹：模板源码和该段依赖的输入值"""
+        return canonical_digest({
+            "template": self.template,
+            "source": self.templates.fingerprint(self.template, *self.related_templates),
+            "section": section,
+            "inputs": {name: resolve_dependency(context, name) for name in self.sections[section]}
+        })
+
+    def render(self, context: Dict[str, Any],
+               producers: Optional[Dict[str, Callable[[], Dict[str, Any]]]] = None
+               ) -> Tuple[str, List[str]]:
+        """渲染报告，只重新计算指纹变化的分段
+
+        Args:
+            context: 各分段共用的模板上下文
+            producers: 分段名 -> 生成该段额外上下文的函数，只在该段需要重新渲染时调用
+
+        Returns:
+            (报告全文, 重新渲染的分段名列表)
+        """
+        producers = producers or {}
+        parts = self._cached_parts(context)
+        rendered = [section for section, (_, text) in parts.items() if text is None]
+        for section in rendered:
+            extra = producers[section]() if section in producers else {}
+            self._render_part(parts, section, context, extra)
+        return "".join(text for _, text in parts.values()), rendered
+
+    async def render_async(self, context: Dict[str, Any],
+                           producers: Optional[Dict[str, Callable[[], Awaitable[Dict[str, Any]]]]] = None
+                           ) -> Tuple[str, List[str]]:
+        """与 render 相同，producers 为异步函数，需要重新渲染的分段的 producer 并发执行
+
+        任一 producer 失败时异常向上传递，已成功的分段照常写入缓存。
+        """
+        producers = producers or {}
+        parts = self._cached_parts(context)
+        rendered = [section for section, (_, text) in parts.items() if text is None]
+
+        async def produce(section: str):
+            extra = await producers[section]() if section in producers else {}
+            self._render_part(parts, section, context, extra)
+
+        await asyncio.gather(*(produce(section) for section in rendered))
+        return "".join(text for _, text in parts.values()), rendered
+
+    def _cached_parts(self, context: Dict[str, Any]) -> Dict[str, Tuple[Tuple[str, str, str], Optional[str]]]:
+        """分段名 -> (缓存键, 缓存中的文本，未命中为None)，按报告顺序排列"""
+        parts = {}
+        for section in self.sections:
+            key = (self.template, section, self.fingerprint(section, context))
+            found, text = self.cache.get(key)
+            parts[section] = (key, text if found else None)
+        return parts
+
+    def _render_part(self, parts: Dict[str, Tuple[Tuple[str, str, str], Optional[str]]],
+                     section: str, context: Dict[str, Any], extra: Dict[str, Any]):
+        key, _ = parts[section]
+        extra = dict(extra)
+        cacheable = not extra.pop(UNCACHED, False)
+        text = self.templates.render_block(self.template, section, **{**context, **extra})
+        if cacheable:
+            self.cache.set(key, text)
+        parts[section] = (key, text)
+
+
+_section_cache: Optional[AsyncTTLCache] = None
+
+
+def get_section_cache() -> AsyncTTLCache:
+    """获取共享的报告分段缓存，读取 financial_config.yaml 中 reports.sections 的 ttl 和 max_size_mb"""
+    global _section_cache
+    if _section_cache is None:
+        sections_config = get_config_section("reports", "sections")
+        _section_cache = AsyncTTLCache(
+            ttl=float(sections_config.get("ttl", DEFAULT_SECTION_TTL)),
+            max_bytes=int(float(sections_config.get("max_size_mb", DEFAULT_SECTION_MAX_SIZE_MB)) * 1024 * 1024)
+        )
+    return _section_cache
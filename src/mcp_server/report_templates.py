@@ -0,0 +1,142 @@
+"""
+报告模板
+
+所有文本报告由 Jinja2 模板渲染，模板位于包内 templates/ 目录；
+financial_config.yaml 中 reports.templates.directory 指向的目录存在时优先使用其中的同名模板。
+
+- 模板只编译一次：服务启动后在后台预编译全部模板，之后从内存缓存中取出，
+  渲染只做变量替换；配置 bytecode_cache 目录后编译结果也会跨进程复用
+- render_to 把渲染结果分段直接写入文件流，不在内存中拼接整篇报告
+- render_block 单独渲染模板中的一个 block，供按段缓存的报告使用
+"""
+
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+from jinja2 import (
+    ChoiceLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    StrictUndefined,
+    Template,
+)
+
+from .config import get_config_section
+
+BUILTIN_TEMPLATE_DIR = Path(__file__).parent / "templates"
+TEMPLATE_SUFFIX = ".j2"
+
+
+def percent(value: float, digits: int = 2) -> str:
+    """比例 -> 百分比文本，如 0.1234 -> 12.34%"""
+    return f"{value:.{digits}%}"
+
+
+def number(value: float, digits: int = 2, grouping: bool = False) -> str:
+    """定点小数文本，grouping 为 True 时加千分位"""
+    return f"{value:,.{digits}f}" if grouping else f"{value:.{digits}f}"
+
+
+class ReportTemplates:
+    """编译后常驻内存的报告模板集合"""
+
+    def __init__(self, template_dirs: Optional[List[Path]] = None,
+                 bytecode_cache_dir: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        dirs = list(template_dirs or []) + [BUILTIN_TEMPLATE_DIR]
+        bytecode_cache = None
+        if bytecode_cache_dir is not None:
+            Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(bytecode_cache_dir))
+        self.env = Environment(
+            loader=ChoiceLoader([FileSystemLoader(str(d)) for d in dirs]),
+            bytecode_cache=bytecode_cache,
+            # 模板缓存不限数量，且不检查源文件修改时间
+            cache_size=-1,
+            auto_reload=False,
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+            autoescape=False
+        )
+        self.env.filters["percent"] = percent
+        self.env.filters["number"] = number
+        self.env.globals["nan"] = float("nan")
+        self._fingerprints: Dict[Tuple[str, ...], str] = {}
+        self._lock = threading.Lock()
+
+    def preload(self) -> int:
+        """编译全部模板并放入缓存，返回模板数量"""
+        with self._lock:
+            names = self.env.list_templates(filter_func=lambda name: name.endswith(TEMPLATE_SUFFIX))
+            for name in names:
+                self.env.get_template(name)
+        self.logger.debug(f"已预编译 {len(names)} 个报告模板")
+        return len(names)
+
+    def get(self, name: str) -> Template:
+        """按名称获取编译后的模板，名称不含 .j2 后缀，如 company_report.txt"""
+        return self.env.get_template(name + TEMPLATE_SUFFIX)
+
+    def render(self, name: str, **context: Any) -> str:
+        """渲染为字符串"""
+        return self.get(name).render(**context)
+
+    def render_to(self, stream: IO[str], name: str, **context: Any):
+        """把渲染结果分段写入文本流"""
+        stream.writelines(self.get(name).generate(**context))
+
+    def render_block(self, name: str, block: str, **context: Any) -> str:
+        """只渲染模板中的一个 {% block %}（用于分段缓存的报告）"""
+        template = self.get(name)
+        render = template.blocks.get(block)
+        if render is None:
+            raise ValueError(f"模板 {name} 中没有分段: {block}")
+        return "".join(render(template.new_context(context)))
+
+    def fingerprint(self, *names: str) -> str:
+        """若干模板源码的 SHA-256（用于报告缓存的键），与编译后的模板一样只计算一次"""
+        fingerprint = self._fingerprints.get(names)
+        if fingerprint is None:
+            digest = hashlib.sha256()
+            for name in names:
+                digest.update(name.encode("utf-8"))
+                digest.update(self.source(name).encode("utf-8"))
+            fingerprint = self._fingerprints[names] = digest.hexdigest()
+        return fingerprint
+
+    def source(self, name: str) -> str:
+        """模板源码（用于把模板本身作为资源提供）"""
+        source, _, _ = self.env.loader.get_source(self.env, name + TEMPLATE_SUFFIX)
+        return source
+
+
+_report_templates: Optional[ReportTemplates] = None
+_templates_lock = threading.Lock()
+
+
+def get_report_templates() -> ReportTemplates:
+    """获取进程内共享的报告模板集合
+
+    读取 financial_config.yaml 中 reports.templates 的 directory（自定义模板目录）
+    和 bytecode_cache（编译缓存目录，可选）。
+    """
+    global _report_templates
+    with _templates_lock:
+        if _report_templates is None:
+            templates_config = get_config_section("reports", "templates")
+            template_dirs = []
+            directory = templates_config.get("directory")
+            if directory and Path(directory).is_dir():
+                template_dirs.append(Path(directory))
+            bytecode_cache = templates_config.get("bytecode_cache")
+            _report_templates = ReportTemplates(
+                template_dirs=template_dirs,
+                bytecode_cache_dir=Path(bytecode_cache) if bytecode_cache else None
+            )
+    return _report_templates
@@ -0,0 +1,223 @@
+"""
+报告文件的异步后写队列
+
+生成报告的工具把文件内容放入队列后立即返回，由一个后台线程负责落盘，
+慢速磁盘或网络挂载目录上的写操作不会阻塞事件循环。
+
+- 原子提交：先写同目录下的临时文件，fsync 后再 rename 为目标文件，
+  读取方只会看到完整的旧文件或新文件
+- fsync 批处理：后台线程一次取出队列中积压的多个文件，全部写完后依次 fsync，
+  rename 后每个目录只 fsync 一次
+- 队列中尚未落盘的内容可通过 pending_content 读取，关闭时等待队列全部写完
+"""
+
+import asyncio
+import atexit
+import itertools
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from .config import get_config_section
+
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_PENDING = 1000
+
+# 队列中的结束标记
+_STOP = object()
+
+
+class ReportWriter:
+    """后台线程落盘的报告写入器"""
+
+    def __init__(self, fsync: bool = True, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        self.logger = logging.getLogger(__name__)
+        self.fsync = fsync
+        self.max_batch = max(1, max_batch)
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        # 目标绝对路径 -> 最近一次排队、尚未落盘的内容
+        self._pending: Dict[Path, bytes] = {}
+        self._pending_lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._closed = False
+        self.stats = {"queued": 0, "written": 0, "failed": 0, "batches": 0}
+        self._thread = threading.Thread(target=self._run, name="report-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: Union[str, Path], content: Union[str, bytes]) -> Future:
+        """把写入请求放入队列（队列满时阻塞等待），返回落盘完成时结束的 Future"""
+        if self._closed:
+            raise RuntimeError("报告写入器已关闭")
+        path = Path(os.path.abspath(path))
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        future: Future = Future()
+        with self._pending_lock:
+            self._pending[path] = data
+        self._queue.put((path, data, future))
+        self.stats["queued"] += 1
+        return future
+
+    async def write(self, path: Union[str, Path], content: Union[str, bytes]) -> Future:
+        """异步排队写入，队列未满时立即返回；需要确认落盘时 await asyncio.wrap_future(结果)"""
+        if not self._queue.full():
+            return self.submit(path, content)
+        return await asyncio.to_thread(self.submit, path, content)
+
+    def pending_content(self, path: Union[str, Path]) -> Optional[bytes]:
+        """已排队但尚未落盘的文件内容，没有时返回None"""
+        with self._pending_lock:
+            return self._pending.get(Path(os.path.abspath(path)))
+
+    def pending_paths(self) -> List[Path]:
+        """已排队但尚未落盘的文件（绝对路径）"""
+        with self._pending_lock:
+            return list(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待此前排队的写入全部完成，超时返回False"""
+        if not self._thread.is_alive():
+            return self._queue.empty()
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """写完队列中的全部文件后停止后台线程"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self.logger.warning("报告写入器关闭超时，部分报告可能未写入")
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch: List[Tuple[Path, bytes, Future]] = []
+            markers: List[threading.Event] = []
+            item = self._queue.get()
+            # 取出当前积压的全部请求（最多 max_batch 个文件）作为一批
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._commit(batch)
+            for marker in markers:
+                marker.set()
+
+    def _commit(self, batch: List[Tuple[Path, bytes, Future]]):
+        """写临时文件 -> 批量 fsync -> rename -> 每个目录 fsync 一次"""
+        staged = []
+        for path, data, future in batch:
+            temp = path.with_name(f".{path.name}.{os.getpid()}.{next(self._sequence)}.tmp")
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                handle = open(temp, "wb")
+                try:
+                    handle.write(data)
+                    handle.flush()
+                except BaseException:
+                    handle.close()
+                    raise
+                staged.append((path, data, future, temp, handle))
+            except Exception as e:
+                self._fail(path, data, future, temp, e)
+
+        directories = set()
+        for path, data, future, temp, handle in staged:
+            try:
+                try:
+                    if self.fsync:
+                        os.fsync(handle.fileno())
+                finally:
+                    handle.close()
+                os.replace(temp, path)
+                directories.add(path.parent)
+            except Exception as e:
+                self._fail(path, data, future, temp, e)
+                continue
+            self._done(path, data)
+            self.stats["written"] += 1
+            future.set_result(path)
+
+        if self.fsync:
+            for directory in directories:
+                self._fsync_directory(directory)
+        self.stats["batches"] += 1
+
+    def _done(self, path: Path, data: bytes):
+        with self._pending_lock:
+            # 同一路径可能已有更新的内容排队，只在内容未变时移除
+            if self._pending.get(path) is data:
+                del self._pending[path]
+
+    def _fail(self, path: Path, data: bytes, future: Future, temp: Path, error: Exception):
+        self.logger.error(f"写入报告文件失败 {path}: {error}")
+        self.stats["failed"] += 1
+        self._done(path, data)
+        try:
+            temp.unlink()
+        except OSError:
+            pass
+        future.set_exception(error)
+
+    @staticmethod
+    def _fsync_directory(directory: Path):
+        """fsync 目录使 rename 持久化（Windows 不支持对目录 fsync，跳过）"""
+        if os.name == "nt":
+            return
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+_report_writer: Optional[ReportWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_report_writer() -> ReportWriter:
+    """获取进程内共享的报告写入器
+
+    读取 financial_config.yaml 中 reports.writer 的 fsync / max_batch / max_pending；
+    进程退出时自动写完队列中的文件。
+    """
+    global _report_writer
+    with _writer_lock:
+        if _report_writer is None:
+            writer_config = get_config_section("reports", "writer")
+            _report_writer = ReportWriter(
+                fsync=bool(writer_config.get("fsync", True)),
+                max_batch=int(writer_config.get("max_batch", DEFAULT_MAX_BATCH)),
+                max_pending=int(writer_config.get("max_pending", DEFAULT_MAX_PENDING))
+            )
+            atexit.register(shutdown_report_writer)
+    return _report_writer
+
+
+def shutdown_report_writer(timeout: Optional[float] = None):
+    """写完队列中的文件并关闭共享写入器"""
+    global _report_writer
+    with _writer_lock:
+        writer, _report_writer = _report_writer, None
+    if writer is not None:
+        writer.close(timeout)
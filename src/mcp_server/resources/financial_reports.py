@@ -6,6 +6,7 @@
 
 import json
 import logging
+import os
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -20,6 +21,7 @@ from mcp.types import (
 )
 
 
+
 class FinancialReportsResource:
     """财务报告资源"""
     
@@ -28,6 +30,18 @@ class FinancialReportsResource:
         self.reports_dir = Path("output")
         self.reports_dir.mkdir(exist_ok=True)
         
+    @property
+    def templates(self):
+        """报告模板集合，首次读取资源时才导入模板模块，不拖慢服务启动"""
+        from ..report_templates import get_report_templates
+        return get_report_templates()
+        
+    @property
+    def writer(self):
+        """报告后写队列，首次读取资源时才导入"""
+        from ..report_writer import get_report_writer
+        return get_report_writer()
+        
     async def list_resources(self, request: ListResourcesRequest) -> ListResourcesResult:
         """列出可用的财务报告资源"""
         resources = []
@@ -54,9 +68,15 @@ class FinancialReportsResource:
             )
         ])
         
-        # 添加已生成的报告文件
+        # 添加已生成的报告文件（包括仍在后写队列中的）
         if self.reports_dir.exists():
-            for report_file in self.reports_dir.glob("*.txt"):
+            report_files = set(self.reports_dir.glob("*.txt"))
+            reports_dir = Path(os.path.abspath(self.reports_dir))
+            report_files.update(
+                self.reports_dir / path.name for path in self.writer.pending_paths()
+                if path.parent == reports_dir and path.suffix == ".txt"
+            )
+            for report_file in sorted(report_files):
                 resources.append(
                     Resource(
                         uri=f"financial://reports/generated/{report_file.name}",
@@ -114,122 +134,26 @@ class FinancialReportsResource:
         )
         
     def _get_stock_analysis_template(self) -> str:
-        """获取股票分析报告模板"""
-        return """
-股票分析报告模板
-====================
-
-基本信息:
-- 股票代码: [SYMBOL]
-- 公司名称: [COMPANY_NAME]
-- 行业: [INDUSTRY]
-- 分析日期: [DATE]
-
-价格分析:
-- 当前价格: $[CURRENT_PRICE]
-- 52周最高: $[52W_HIGH]
-- 52周最低: $[52W_LOW]
-- 价格变动: $[PRICE_CHANGE] ([PRICE_CHANGE_PCT]%)
-
-财务指标:
-- 市值: [MARKET_CAP]
-- 市盈率: [PE_RATIO]
-- 市净率: [PB_RATIO]
-- 股息收益率: [DIVIDEND_YIELD]%
-
-技术分析:
-- 趋势: [TREND]
-- 支撑位: $[SUPPORT_LEVEL]
-- 阻力位: $[RESISTANCE_LEVEL]
-- RSI: [RSI]
-
-投资建议: [RECOMMENDATION]
-
-风险提示:
-[RISK_WARNINGS]
-
-====================
-        """
+        """获取股票分析报告模板（Jinja2 模板源码，变量即报告需要填写的字段）"""
+        return self.templates.source("resources/stock_analysis.txt")
         
     def _get_portfolio_template(self) -> str:
-        """获取投资组合报告模板"""
-        return """
-投资组合分析报告模板
-====================
-
-投资组合信息:
-- 组合名称: [PORTFOLIO_NAME]
-- 创建日期: [CREATION_DATE]
-- 股票数量: [STOCK_COUNT]
-- 总价值: $[TOTAL_VALUE]
-
-持仓明细:
-[POSITIONS_TABLE]
-
-绩效分析:
-- 总收益率: [TOTAL_RETURN]%
-- 年化收益率: [ANNUALIZED_RETURN]%
-- 波动率: [VOLATILITY]%
-- 夏普比率: [SHARPE_RATIO]
-- 最大回撤: [MAX_DRAWDOWN]%
-
-风险分析:
-- 贝塔系数: [BETA]
-- 阿尔法系数: [ALPHA]
-- 信息比率: [INFORMATION_RATIO]
-
-资产配置:
-[ASSET_ALLOCATION_CHART]
-
-投资建议:
-[RECOMMENDATIONS]
-
-====================
-        """
+        """获取投资组合报告模板（Jinja2 模板源码，变量即报告需要填写的字段）"""
+        return self.templates.source("resources/portfolio.txt")
         
     def _get_market_analysis_template(self) -> str:
-        """获取市场分析报告模板"""
-        return """
-市场分析报告模板
-====================
-
-市场概况:
-- 分析日期: [DATE]
-- 市场指数: [MARKET_INDEX]
-- 指数点位: [INDEX_LEVEL]
-- 指数变动: [INDEX_CHANGE]%
-
-行业表现:
-[INDUSTRY_PERFORMANCE_TABLE]
-
-市场情绪:
-- 恐慌贪婪指数: [FEAR_GREED_INDEX]
-- 成交量: [VOLUME]
-- 市场宽度: [MARKET_BREADTH]
-
-技术指标:
-- 移动平均线: [MOVING_AVERAGES]
-- MACD: [MACD_SIGNAL]
-- 布林带: [BOLLINGER_BANDS]
-
-宏观经济:
-- GDP增长率: [GDP_GROWTH]%
-- 通货膨胀率: [INFLATION_RATE]%
-- 利率: [INTEREST_RATE]%
-
-市场展望:
-[OUTLOOK]
-
-投资策略:
-[STRATEGY]
-
-====================
-        """
+        """获取市场分析报告模板（Jinja2 模板源码，变量即报告需要填写的字段）"""
+        return self.templates.source("resources/market_analysis.txt")
         
     async def _read_generated_report(self, filename: str) -> str:
         """读取已生成的报告文件"""
         report_path = self.reports_dir / filename
         
+        # 刚生成、仍在后写队列中的报告直接返回排队的内容
+        pending = self.writer.pending_content(report_path)
+        if pending is not None:
+            return pending.decode('utf-8')
+            
         if not report_path.exists():
             raise FileNotFoundError(f"报告文件不存在: {filename}")
             
@@ -0,0 +1,93 @@
+"""
+服务端序列存储
+
+get_stock_price 把获取到的完整价格序列登记在这里并返回一个不透明的句柄，
+数据分析工具通过句柄（或股票代码）直接读取服务端的 PriceSeries，
+无需客户端把价格数组放进JSON参数来回传输。句柄超过TTL或超出内存预算时按LRU失效。
+"""
+
+import logging
+import secrets
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from ..data.models import PriceSeries
+except ImportError:
+    # src 目录在 sys.path 上、mcp_server 作为顶层包导入时
+    from data.models import PriceSeries
+
+from .config import get_config_section
+from .memory_cache import AsyncTTLCache
+
+DEFAULT_TTL = 3600
+DEFAULT_MAX_SIZE_MB = 256
+
+
+class SeriesStore:
+    """价格序列句柄存储"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_SIZE_MB * 1024 * 1024):
+        self.logger = logging.getLogger(__name__)
+        self._cache = AsyncTTLCache(ttl=ttl, max_bytes=max_bytes)
+        # 股票代码 -> 最近登记的句柄
+        self._latest: Dict[str, str] = {}
+
+    def put(self, series: PriceSeries) -> str:
+        """登记序列，返回句柄"""
+        series_id = f"ser_{secrets.token_hex(8)}"
+        self._cache.set(series_id, series)
+        if series.symbol:
+            self._latest[series.symbol.upper()] = series_id
+        return series_id
+
+    def get(self, series_id: str) -> PriceSeries:
+        """按句柄读取序列
+
+        Raises:
+            ValueError: 句柄不存在或已失效
+        """
+        found, series = self._cache.get(series_id)
+        if not found:
+            raise ValueError(f"序列句柄不存在或已过期: {series_id}，请重新调用 get_stock_price")
+        return series
+
+    def get_by_symbol(self, symbol: str) -> Tuple[str, PriceSeries]:
+        """按股票代码读取最近登记的序列，返回 (句柄, 序列)"""
+        series_id = self._latest.get(symbol.upper())
+        if series_id is None:
+            raise ValueError(f"没有 {symbol} 的服务端序列，请先调用 get_stock_price")
+        found, series = self._cache.get(series_id)
+        if not found:
+            del self._latest[symbol.upper()]
+            raise ValueError(f"{symbol} 的服务端序列已过期，请重新调用 get_stock_price")
+        return series_id, series
+
+    def resolve(self, arguments: Dict[str, Any]) -> Optional[PriceSeries]:
+        """根据工具参数中的 series_id 或 symbol 读取序列，二者都未提供时返回 None"""
+        if arguments.get("series_id"):
+            return self.get(arguments["series_id"])
+        if arguments.get("symbol"):
+            return self.get_by_symbol(arguments["symbol"])[1]
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """存储统计"""
+        return self._cache.stats()
+
+
+_series_store: Optional[SeriesStore] = None
+
+
+def get_series_store() -> SeriesStore:
+    """获取进程内共享的序列存储
+
+    读取 financial_config.yaml 中 cache.series 的 ttl 和 max_size_mb。
+    """
+    global _series_store
+    if _series_store is None:
+        series_config = get_config_section("cache", "series")
+        _series_store = SeriesStore(
+            ttl=float(series_config.get("ttl", DEFAULT_TTL)),
+            max_bytes=int(float(series_config.get("max_size_mb", DEFAULT_MAX_SIZE_MB)) * 1024 * 1024)
+        )
+    return _series_store
@@ -5,8 +5,10 @@
 """
 
 import asyncio
+import importlib
 import json
 import logging
+import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -25,23 +27,37 @@ from mcp.types import (
     Tool,
 )
 
+# 工具模块不在此处导入，由注册表在首次调用时按需加载；
+# 报告模板、后写队列和进程池模块也只在用到时导入（模板在后台线程中预编译时导入）
 try:
-    from .tools.financial_data import FinancialDataTool
-    from .tools.report_generator import ReportGeneratorTool
-    from .tools.data_analyzer import DataAnalyzerTool
-    from .tools.ocr_tools import OCRTools
-    from .tools.company_report_generator import CompanyReportGenerator
-    from .tools.ai_enhanced_report_generator import AIEnhancedReportGenerator
     from .resources.financial_reports import FinancialReportsResource
+    from .registry import ToolRegistry
+    from .tool_specs import TOOL_GROUPS, ToolGroupSpec
+    from .executor import shutdown_data_executor
 except ImportError:
     # 当直接运行时使用绝对导入
-    from mcp_server.tools.financial_data import FinancialDataTool
-    from mcp_server.tools.report_generator import ReportGeneratorTool
-    from mcp_server.tools.data_analyzer import DataAnalyzerTool
-    from mcp_server.tools.ocr_tools import OCRTools
-    from mcp_server.tools.company_report_generator import CompanyReportGenerator
-    from mcp_server.tools.ai_enhanced_report_generator import AIEnhancedReportGenerator
     from mcp_server.resources.financial_reports import FinancialReportsResource
+    from mcp_server.registry import ToolRegistry
+    from mcp_server.tool_specs import TOOL_GROUPS, ToolGroupSpec
+    from mcp_server.executor import shutdown_data_executor
+
+PACKAGE = __package__ or "mcp_server"
+TOOLS_PACKAGE = f"{PACKAGE}.tools"
+
+# 退出时按顺序调用的关闭函数：模块 -> 函数名；后写队列最后关闭，写完排队中的报告文件
+SHUTDOWN_HOOKS = (
+    ("process_pool", "shutdown_compute_pool"),
+    ("process_pool", "shutdown_render_pool"),
+    ("report_writer", "shutdown_report_writer"),
+)
+
+
+def shutdown_loaded_modules():
+    """调用已导入模块的关闭函数；运行期间没有用到的模块不会为了关闭而导入"""
+    for module_name, function in SHUTDOWN_HOOKS:
+        module = sys.modules.get(f"{PACKAGE}.{module_name}")
+        if module is not None:
+            getattr(module, function)()
 
 
 class FinancialMCPServer:
@@ -56,6 +72,7 @@ class FinancialMCPServer:
         self.config_path = config_path or "config/mcp_config.json"
         self.config = self._load_config()
         self.server = Server("financial-report-mcp-server")
+        self.tool_registry = ToolRegistry()
         self._setup_logging()
         self._register_tools()
         self._register_resources()
@@ -75,7 +92,8 @@ class FinancialMCPServer:
             "server": {
                 "name": "financial-report-mcp-server",
                 "version": "1.0.0",
-                "description": "财务报告生成MCP服务器"
+                "description": "财务报告生成MCP服务器",
+                "lazy_tools": True
             },
             "tools": {
                 "financial_data": {"enabled": True},
@@ -87,7 +105,8 @@ class FinancialMCPServer:
                     "enabled": True,
                     "ollama_url": "http://localhost:11434",
                     "ollama_model": "deepseek-r1",
-                    "use_ollama": True
+                    "use_ollama": True,
+                    "ollama_concurrency": 2
                 }
             },
             "resources": {
@@ -104,48 +123,44 @@ class FinancialMCPServer:
         )
         
     def _register_tools(self):
-        """注册MCP工具"""
+        """注册MCP工具
+
+        所有工具统一登记到注册表，服务器只注册一次list_tools/call_tool，
+        由注册表按工具名直接分发。工具列表来自静态元数据，工具类默认在
+        首次调用时才导入和实例化（server.lazy_tools=false 时启动即加载）。
+        """
         tools_config = self.config.get("tools", {})
         
-        # 注册财务数据工具
-        if tools_config.get("financial_data", {}).get("enabled", True):
-            financial_data_tool = FinancialDataTool()
-            self.server.list_tools()(financial_data_tool.list_tools)
-            self.server.call_tool()(financial_data_tool.call_tool)
-            
-        # 注册报告生成工具
-        if tools_config.get("report_generator", {}).get("enabled", True):
-            report_generator_tool = ReportGeneratorTool()
-            self.server.list_tools()(report_generator_tool.list_tools)
-            self.server.call_tool()(report_generator_tool.call_tool)
-            
-        # 注册数据分析工具
-        if tools_config.get("data_analyzer", {}).get("enabled", True):
-            data_analyzer_tool = DataAnalyzerTool()
-            self.server.list_tools()(data_analyzer_tool.list_tools)
-            self.server.call_tool()(data_analyzer_tool.call_tool)
-            
-        # 注册OCR工具
-        if tools_config.get("ocr_tools", {}).get("enabled", True):
-            ocr_tool = OCRTools()
-            self.server.list_tools()(ocr_tool.list_tools)
-            self.server.call_tool()(ocr_tool.call_tool)
-            
-        # 注册公司财报生成工具
-        if tools_config.get("company_report_generator", {}).get("enabled", True):
-            company_report_tool = CompanyReportGenerator()
-            self.server.list_tools()(company_report_tool.list_tools)
-            self.server.call_tool()(company_report_tool.call_tool)
-            
-        # 注册AI增强报告生成工具
-        if tools_config.get("ai_enhanced_report_generator", {}).get("enabled", True):
-            ai_enhanced_report_tool = AIEnhancedReportGenerator(
-                ollama_url="http://localhost:11434",
-                ollama_model="deepseek-r1:7b",
-                use_ollama=True
-            )
-            self.server.list_tools()(ai_enhanced_report_tool.list_tools)
-            self.server.call_tool()(ai_enhanced_report_tool.call_tool)
+        for spec in TOOL_GROUPS:
+            if tools_config.get(spec.config_key, {}).get("enabled", True):
+                self.tool_registry.register_lazy(spec.tools, self._make_tool_loader(spec))
+                
+        if not self.config.get("server", {}).get("lazy_tools", True):
+            self.tool_registry.load_all()
+                
+        self.server.list_tools()(self.tool_registry.list_tools)
+        self.server.call_tool()(self.tool_registry.dispatch)
+        
+    def _make_tool_loader(self, spec: ToolGroupSpec):
+        """创建工具组的加载函数：导入模块、实例化工具类并返回处理函数映射"""
+        def load():
+            module = importlib.import_module(f"{TOOLS_PACKAGE}.{spec.module}")
+            tool_class = getattr(module, spec.class_name)
+            tool_config = self.config.get("tools", {}).get(spec.config_key, {})
+            tool = tool_class(**self._get_tool_kwargs(spec.config_key, tool_config))
+            return tool.get_tool_handlers()
+        return load
+        
+    def _get_tool_kwargs(self, config_key: str, tool_config: Dict[str, Any]) -> Dict[str, Any]:
+        """获取工具类的构造参数"""
+        if config_key == "ai_enhanced_report_generator":
+            return {
+                "ollama_url": tool_config.get("ollama_url", "http://localhost:11434"),
+                "ollama_model": tool_config.get("ollama_model", "deepseek-r1:7b"),
+                "use_ollama": tool_config.get("use_ollama", True),
+                "ollama_concurrency": int(tool_config.get("ollama_concurrency", 2))
+            }
+        return {}
             
     def _register_resources(self):
         """注册MCP资源"""
@@ -157,18 +172,31 @@ class FinancialMCPServer:
             self.server.list_resources()(financial_reports_resource.list_resources)
             self.server.read_resource()(financial_reports_resource.read_resource)
             
+    def _preload_templates(self):
+        """预编译全部报告模板，失败时在首次渲染时再编译"""
+        try:
+            importlib.import_module(f"{PACKAGE}.report_templates").get_report_templates().preload()
+        except Exception as e:
+            logging.warning(f"报告模板预编译失败: {e}")
+            
     async def run(self):
         """运行MCP服务器"""
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name="financial-report-mcp-server",
-                    server_version="1.0.0",
-                    capabilities=self.server.get_capabilities(),
-                ),
-            )
+        # 在后台线程中编译报告模板，不推迟握手
+        asyncio.get_running_loop().run_in_executor(None, self._preload_templates)
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    InitializationOptions(
+                        server_name="financial-report-mcp-server",
+                        server_version="1.0.0",
+                        capabilities=self.server.get_capabilities(),
+                    ),
+                )
+        finally:
+            shutdown_data_executor()
+            shutdown_loaded_modules()
 
 
 async def main():
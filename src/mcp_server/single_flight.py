@@ -0,0 +1,71 @@
+"""
+请求合并（single-flight）
+
+相同键的并发请求只向上游发起一次，其余调用方等待同一个进行中的任务并得到相同结果。
+各工具（以及报告工具内部创建的数据工具）共用 get_single_flight() 返回的同一个实例，
+不同工具发起的相同请求也会合并。
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """按键合并并发的异步调用"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """执行 fn，若相同键的调用正在进行则等待其结果
+
+        共享任务用 asyncio.shield 保护，单个调用方被取消不会影响其他调用方。
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+            self.logger.debug(f"合并并发请求: {key}")
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        """任务结束后移出进行中列表"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # 所有调用方都已取消时，避免出现未读取异常的警告
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """合并统计"""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """获取进程内共享的请求合并器"""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,946 @@
+"""
+MCP工具静态元数据
+
+集中定义各工具组的Tool定义以及所在模块和类名。服务器启动时只需导入本模块
+即可发布工具列表，工具模块（及其pandas、yfinance、openai等依赖）
+在首次调用时才会导入。
+"""
+
+from dataclasses import dataclass
+from typing import List
+
+from mcp.types import Tool
+
+
+@dataclass(frozen=True)
+class ToolGroupSpec:
+    """工具组元数据"""
+    config_key: str
+    module: str
+    class_name: str
+    tools: List[Tool]
+
+
+# 财务数据工具
+FINANCIAL_DATA_TOOLS = [
+    Tool(
+        name="get_stock_price",
+        description="获取股票实时价格和历史价格数据，完整序列登记在服务端并返回 series_id 句柄供分析工具使用",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "symbol": {
+                    "type": "string",
+                    "description": "股票代码，如AAPL、GOOGL"
+                },
+                "period": {
+                    "type": "string",
+                    "description": "时间周期：1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max",
+                    "default": "1mo"
+                },
+                "interval": {
+                    "type": "string", 
+                    "description": "数据间隔：1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo",
+                    "default": "1d"
+                }
+            },
+            "required": ["symbol"]
+        }
+    ),
+    Tool(
+        name="get_financial_info",
+        description="获取公司财务信息",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "symbol": {
+                    "type": "string",
+                    "description": "股票代码"
+                },
+                "info_type": {
+                    "type": "string",
+                    "description": "信息类型：info, financials, balance_sheet, cashflow",
+                    "default": "info"
+                }
+            },
+            "required": ["symbol"]
+        }
+    ),
+    Tool(
+        name="get_market_data",
+        description="获取市场数据",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "symbols": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "股票代码列表"
+                },
+                "data_type": {
+                    "type": "string",
+                    "description": "数据类型：price, volume, market_cap",
+                    "default": "price"
+                },
+                "batch": {
+                    "type": "boolean",
+                    "description": "price/volume 是否批量下载并以列式结构返回",
+                    "default": True
+                },
+                "chunk_size": {
+                    "type": "integer",
+                    "description": "批量下载时每批的股票数量，各批并发执行",
+                    "default": 50
+                }
+            },
+            "required": ["symbols"]
+        }
+    ),
+    Tool(
+        name="get_technical_indicators",
+        description="基于（缓存的）历史K线批量计算多个股票的SMA、EMA、RSI、MACD和布林带",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "symbols": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "股票代码列表"
+                },
+                "indicators": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "指标列表：sma, ema, rsi, macd, bollinger，默认全部"
+                },
+                "params": {
+                    "type": "object",
+                    "description": "覆盖默认参数，如 {\"sma\": {\"windows\": [50, 200]}, \"rsi\": {\"window\": 14}}"
+                },
+                "period": {
+                    "type": "string",
+                    "description": "历史数据周期，需覆盖最长的指标窗口",
+                    "default": "1y"
+                },
+                "interval": {
+                    "type": "string",
+                    "description": "K线间隔",
+                    "default": "1d"
+                },
+                "tail": {
+                    "type": "integer",
+                    "description": "除最新值外，另返回最近N根K线的指标序列",
+                    "default": 0
+                }
+            },
+            "required": ["symbols"]
+        }
+    ),
+    Tool(
+        name="get_cache_stats",
+        description="获取数据缓存、服务端序列存储的命中/淘汰统计、并发请求合并统计、报告缓存和报告分段缓存命中率",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    )
+]
+
+# 报告生成工具
+REPORT_GENERATOR_TOOLS = [
+    Tool(
+        name="generate_stock_report",
+        description="生成股票分析报告",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "symbol": {
+                    "type": "string",
+                    "description": "股票代码"
+                },
+                "report_type": {
+                    "type": "string",
+                    "description": "报告类型：basic, detailed",
+                    "default": "basic"
+                }
+            },
+            "required": ["symbol"]
+        }
+    ),
+    Tool(
+        name="generate_portfolio_report",
+        description="生成投资组合报告",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "symbols": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "股票代码列表"
+                },
+                "objective": {
+                    "type": "string",
+                    "description": "权重优化目标：min_variance, max_sharpe",
+                    "default": "max_sharpe"
+                },
+                "period": {
+                    "type": "string",
+                    "description": "用于估计收益和协方差的历史周期",
+                    "default": "1y"
+                },
+                "total_value": {
+                    "type": "number",
+                    "description": "组合总价值",
+                    "default": 100000
+                },
+                "formats": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": ["pdf", "png"]},
+                    "description": "文本报告之外生成的格式：pdf（含图表的PDF）、png（图表图片），默认读取配置 reports.output.formats（默认为空，只生成文本报告）"
+                }
+            },
+            "required": ["symbols"]
+        }
+    )
+]
+
+# 数据分析工具
+DATA_ANALYZER_TOOLS = [
+    Tool(
+        name="calculate_returns",
+        description="计算投资收益率",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "series_id": {
+                    "type": "string",
+                    "description": "get_stock_price 返回的服务端序列句柄，提供时不需要传入价格序列"
+                },
+                "symbol": {
+                    "type": "string",
+                    "description": "股票代码，使用该代码最近一次 get_stock_price 登记的序列"
+                },
+                "prices": {
+                    "type": "array",
+                    "items": {"type": ["number", "null"]},
+                    "description": "价格序列，null 表示缺失（如停牌），计算时跳过"
+                },
+                "period": {
+                    "type": "string",
+                    "description": "计算周期：daily, weekly, monthly",
+                    "default": "daily"
+                },
+                "dtype": {
+                    "type": "string",
+                    "description": "计算精度：float32（内存减半）, float64，默认读取配置 analysis.numerics.dtype"
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="calculate_volatility",
+        description="计算波动率",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "series_id": {
+                    "type": "string",
+                    "description": "get_stock_price 返回的服务端序列句柄，提供时不需要传入收益率序列（由收盘价计算）"
+                },
+                "symbol": {
+                    "type": "string",
+                    "description": "股票代码，使用该代码最近一次 get_stock_price 登记的序列"
+                },
+                "returns": {
+                    "type": "array",
+                    "items": {"type": ["number", "null"]},
+                    "description": "收益率序列，null 表示缺失，计算时忽略"
+                },
+                "period": {
+                    "type": "string",
+                    "description": "年化周期：daily, weekly, monthly",
+                    "default": "daily"
+                },
+                "confidence_interval": {
+                    "type": "boolean",
+                    "description": "是否用块自助法（block bootstrap）估计置信区间",
+                    "default": False
+                },
+                "confidence_level": {
+                    "type": "number",
+                    "description": "置信水平",
+                    "default": 0.95
+                },
+                "resamples": {
+                    "type": "integer",
+                    "description": "重抽样次数，默认读取配置 analysis.bootstrap.resamples",
+                    "default": 2000
+                },
+                "block_size": {
+                    "type": "integer",
+                    "description": "块长度，默认为数据点数的立方根"
+                },
+                "time_budget_seconds": {
+                    "type": "number",
+                    "description": "置信区间计算时间上限（秒），超时则使用已完成的重抽样"
+                },
+                "seed": {
+                    "type": "integer",
+                    "description": "随机种子，相同种子和参数得到相同的置信区间"
+                },
+                "dtype": {
+                    "type": "string",
+                    "description": "计算精度：float32（内存减半）, float64，默认读取配置 analysis.numerics.dtype"
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="calculate_sharpe_ratio",
+        description="计算夏普比率",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "series_id": {
+                    "type": "string",
+                    "description": "get_stock_price 返回的服务端序列句柄，提供时不需要传入收益率序列（由收盘价计算）"
+                },
+                "symbol": {
+                    "type": "string",
+                    "description": "股票代码，使用该代码最近一次 get_stock_price 登记的序列"
+                },
+                "returns": {
+                    "type": "array",
+                    "items": {"type": ["number", "null"]},
+                    "description": "收益率序列，null 表示缺失，计算时忽略"
+                },
+                "risk_free_rate": {
+                    "type": "number",
+                    "description": "无风险利率",
+                    "default": 0.02
+                },
+                "confidence_interval": {
+                    "type": "boolean",
+                    "description": "是否用块自助法（block bootstrap）估计置信区间",
+                    "default": False
+                },
+                "confidence_level": {
+                    "type": "number",
+                    "description": "置信水平",
+                    "default": 0.95
+                },
+                "resamples": {
+                    "type": "integer",
+                    "description": "重抽样次数，默认读取配置 analysis.bootstrap.resamples",
+                    "default": 2000
+                },
+                "block_size": {
+                    "type": "integer",
+                    "description": "块长度，默认为数据点数的立方根"
+                },
+                "time_budget_seconds": {
+                    "type": "number",
+                    "description": "置信区间计算时间上限（秒），超时则使用已完成的重抽样"
+                },
+                "seed": {
+                    "type": "integer",
+                    "description": "随机种子，相同种子和参数得到相同的置信区间"
+                },
+                "dtype": {
+                    "type": "string",
+                    "description": "计算精度：float32（内存减半）, float64，默认读取配置 analysis.numerics.dtype"
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="calculate_batch_metrics",
+        description="批量计算多条序列的收益率、波动率和夏普比率，一次调用返回一张列式结果表",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "series_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "服务端序列句柄列表（使用收盘价），提供时不需要传入 series"
+                },
+                "series": {
+                    "type": ["object", "array"],
+                    "description": "多条序列：{代码: [数值...]} 字典，或二维数组（每行一条序列，长度可不同）"
+                },
+                "symbols": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "series 为二维数组时各行的名称，默认使用行号"
+                },
+                "series_type": {
+                    "type": "string",
+                    "description": "序列类型：prices, returns",
+                    "default": "prices"
+                },
+                "period": {
+                    "type": "string",
+                    "description": "数据周期：daily, weekly, monthly",
+                    "default": "daily"
+                },
+                "risk_free_rate": {
+                    "type": "number",
+                    "description": "年化无风险利率",
+                    "default": 0.02
+                },
+                "dtype": {
+                    "type": "string",
+                    "description": "计算精度：float32（内存减半）, float64，默认读取配置 analysis.numerics.dtype"
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="calculate_rolling_metrics",
+        description="计算滚动平均收益率、滚动波动率和滚动夏普比率（多窗口、多序列，O(n)算法）",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "series_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "服务端序列句柄列表（使用收盘价，按日期取所有序列都有价格的交易日对齐），提供时不需要传入 series"
+                },
+                "series": {
+                    "type": ["object", "array"],
+                    "description": "多条序列：{代码: [数值...]} 字典，或二维数组（每行一条序列）"
+                },
+                "symbols": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "series 为二维数组时各行的名称，默认使用行号"
+                },
+                "series_type": {
+                    "type": "string",
+                    "description": "序列类型：prices, returns",
+                    "default": "prices"
+                },
+                "windows": {
+                    "type": "array",
+                    "items": {"type": "integer"},
+                    "description": "滚动窗口大小列表",
+                    "default": [20, 60, 252]
+                },
+                "period": {
+                    "type": "string",
+                    "description": "数据周期：daily, weekly, monthly",
+                    "default": "daily"
+                },
+                "risk_free_rate": {
+                    "type": "number",
+                    "description": "年化无风险利率",
+                    "default": 0.02
+                },
+                "tail": {
+                    "type": "integer",
+                    "description": "只返回最近N个位置的结果，默认返回全部"
+                },
+                "dtype": {
+                    "type": "string",
+                    "description": "计算精度：float32（内存减半）, float64，默认读取配置 analysis.numerics.dtype"
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="calculate_risk_attribution",
+        description="批量计算多个资产相对基准的最大回撤、贝塔、阿尔法和信息比率",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "series_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "服务端序列句柄列表（使用收盘价，按日期取所有序列都有价格的交易日对齐），提供时不需要传入 series"
+                },
+                "series": {
+                    "type": ["object", "array"],
+                    "description": "多条资产序列：{代码: [数值...]} 字典，或二维数组（每行一条序列）"
+                },
+                "symbols": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "series 为二维数组时各行的名称，默认使用行号"
+                },
+                "benchmark": {
+                    "type": "array",
+                    "items": {"type": "number"},
+                    "description": "基准序列，类型与 series_type 一致，按最后一个值与各资产对齐"
+                },
+                "benchmark_id": {
+                    "type": "string",
+                    "description": "基准的服务端序列句柄（使用收盘价），提供时不需要传入 benchmark"
+                },
+                "series_type": {
+                    "type": "string",
+                    "description": "序列类型：prices, returns",
+                    "default": "prices"
+                },
+                "period": {
+                    "type": "string",
+                    "description": "数据周期：daily, weekly, monthly",
+                    "default": "daily"
+                },
+                "risk_free_rate": {
+                    "type": "number",
+                    "description": "年化无风险利率",
+                    "default": 0.02
+                },
+                "dtype": {
+                    "type": "string",
+                    "description": "计算精度：float32（内存减半）, float64，默认读取配置 analysis.numerics.dtype"
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="optimize_portfolio",
+        description="估计协方差矩阵（支持Ledoit-Wolf收缩），求最小方差或最大夏普比率组合权重及有效前沿",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "series_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "服务端序列句柄列表（使用收盘价，按日期取所有序列都有价格的交易日对齐），提供时不需要传入 series"
+                },
+                "series": {
+                    "type": ["object", "array"],
+                    "description": "多条资产序列：{代码: [数值...]} 字典，或二维数组（每行一条序列）"
+                },
+                "symbols": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "series 为二维数组时各行的名称，默认使用行号"
+                },
+                "series_type": {
+                    "type": "string",
+                    "description": "序列类型：prices, returns",
+                    "default": "prices"
+                },
+                "objective": {
+                    "type": "string",
+                    "description": "优化目标：min_variance, max_sharpe",
+                    "default": "max_sharpe"
+                },
+                "covariance": {
+                    "type": "string",
+                    "description": "协方差估计方法：sample, ledoit_wolf",
+                    "default": "ledoit_wolf"
+                },
+                "shrinkage": {
+                    "type": "number",
+                    "description": "指定收缩强度（0~1），默认由Ledoit-Wolf公式估计"
+                },
+                "long_only": {
+                    "type": "boolean",
+                    "description": "是否禁止卖空",
+                    "default": True
+                },
+                "frontier_points": {
+                    "type": "integer",
+                    "description": "有效前沿点数，0表示不计算",
+                    "default": 0
+                },
+                "period": {
+                    "type": "string",
+                    "description": "数据周期：daily, weekly, monthly",
+                    "default": "daily"
+                },
+                "risk_free_rate": {
+                    "type": "number",
+                    "description": "年化无风险利率",
+                    "default": 0.02
+                },
+                "total_value": {
+                    "type": "number",
+                    "description": "组合总价值，用于填充投资组合数据",
+                    "default": 100000
+                },
+                "name": {
+                    "type": "string",
+                    "description": "投资组合名称",
+                    "default": "优化组合"
+                },
+                "dtype": {
+                    "type": "string",
+                    "description": "计算精度：float32（内存减半）, float64，默认读取配置 analysis.numerics.dtype"
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="calculate_var",
+        description="计算组合的风险价值（VaR）和条件风险价值（CVaR），支持历史模拟、参数法和多进程蒙特卡洛模拟",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "series_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "服务端序列句柄列表（使用收盘价，按日期取所有序列都有价格的交易日对齐），提供时不需要传入 series"
+                },
+                "series": {
+                    "type": ["object", "array"],
+                    "description": "多条资产序列：{代码: [数值...]} 字典，或二维数组（每行一条序列）"
+                },
+                "symbols": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "series 为二维数组时各行的名称，默认使用行号"
+                },
+                "series_type": {
+                    "type": "string",
+                    "description": "序列类型：prices, returns",
+                    "default": "prices"
+                },
+                "weights": {
+                    "type": "array",
+                    "items": {"type": "number"},
+                    "description": "组合权重（自动归一化），默认等权"
+                },
+                "methods": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "计算方法：historical, parametric, monte_carlo，默认全部"
+                },
+                "confidence_levels": {
+                    "type": "array",
+                    "items": {"type": "number"},
+                    "description": "置信水平列表",
+                    "default": [0.95, 0.99]
+                },
+                "horizon": {
+                    "type": "integer",
+                    "description": "持有期（数据周期数，如交易日）",
+                    "default": 1
+                },
+                "paths": {
+                    "type": "integer",
+                    "description": "蒙特卡洛模拟路径数",
+                    "default": 100000
+                },
+                "seed": {
+                    "type": "integer",
+                    "description": "随机种子，相同种子和参数得到相同结果；不提供时随机生成并在结果中返回"
+                },
+                "portfolio_value": {
+                    "type": "number",
+                    "description": "组合价值，提供时同时返回损失金额"
+                },
+                "dtype": {
+                    "type": "string",
+                    "description": "计算精度：float32（内存减半）, float64，默认读取配置 analysis.numerics.dtype"
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="update_series_stats",
+        description="向服务端增量统计状态追加新数据，并返回当前收益率、波动率和夏普比率",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "series_id": {
+                    "type": "string",
+                    "description": "序列ID，如股票代码"
+                },
+                "values": {
+                    "type": "array",
+                    "items": {"type": "number"},
+                    "description": "新增的价格或收益率"
+                },
+                "series_type": {
+                    "type": "string",
+                    "description": "序列类型：prices, returns；只需在新建序列时指定（默认 returns），已有序列沿用其类型"
+                },
+                "reset": {
+                    "type": "boolean",
+                    "description": "丢弃已有状态后重新开始累计",
+                    "default": False
+                },
+                "period": {
+                    "type": "string",
+                    "description": "数据周期：daily, weekly, monthly",
+                    "default": "daily"
+                },
+                "risk_free_rate": {
+                    "type": "number",
+                    "description": "年化无风险利率",
+                    "default": 0.02
+                }
+            },
+            "required": ["series_id", "values"]
+        }
+    ),
+    Tool(
+        name="get_series_stats",
+        description="读取服务端增量统计状态的当前指标，不传 series_id 时列出所有序列",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "series_id": {
+                    "type": "string",
+                    "description": "序列ID"
+                },
+                "period": {
+                    "type": "string",
+                    "description": "数据周期：daily, weekly, monthly",
+                    "default": "daily"
+                },
+                "risk_free_rate": {
+                    "type": "number",
+                    "description": "年化无风险利率",
+                    "default": 0.02
+                },
+                "remove": {
+                    "type": "boolean",
+                    "description": "读取后删除该序列的状态",
+                    "default": False
+                }
+            }
+        }
+    )
+]
+
+# OCR工具
+OCR_TOOLS = [
+    Tool(
+        name="ocr_to_text",
+        description="从PDF文件中提取文本内容（支持OCR）",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_path": {
+                    "type": "string",
+                    "description": "PDF文件路径"
+                },
+                "use_ocr": {
+                    "type": "boolean",
+                    "description": "是否使用OCR提取文本",
+                    "default": True
+                }
+            },
+            "required": ["file_path"]
+        }
+    )
+]
+
+# 公司财报生成工具
+COMPANY_REPORT_TOOLS = [
+    Tool(
+        name="list_companies",
+        description="列出可用的公司列表",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    ),
+    Tool(
+        name="generate_company_report",
+        description="生成指定公司的财报",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "symbol": {
+                    "type": "string",
+                    "description": "公司股票代码，如NVDA、AAPL等"
+                },
+                "report_type": {
+                    "type": "string",
+                    "description": "报告类型：basic, comprehensive, financial_analysis",
+                    "default": "comprehensive"
+                },
+                "period": {
+                    "type": "string",
+                    "description": "报告期间：quarterly, annual, latest",
+                    "default": "latest"
+                },
+                "bypass_cache": {
+                    "type": "boolean",
+                    "description": "跳过报告缓存，强制重新生成（新报告仍会写入缓存）",
+                    "default": False
+                },
+                "formats": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": ["pdf", "png"]},
+                    "description": "文本报告之外生成的格式：pdf（含图表的PDF）、png（图表图片），默认读取配置 reports.output.formats（默认为空，只生成文本报告）"
+                }
+            },
+            "required": ["symbol"]
+        }
+    ),
+    Tool(
+        name="generate_batch_reports",
+        description="批量生成多家公司的财报：数据获取、渲染和写文件分阶段流水线并发执行，返回生成文件清单",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "symbols": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "公司股票代码列表"
+                },
+                "sector": {
+                    "type": "string",
+                    "description": "行业分类（如 Technology），未提供 symbols 时生成该行业全部公司的财报"
+                },
+                "report_type": {
+                    "type": "string",
+                    "description": "报告类型：basic, comprehensive, financial_analysis",
+                    "default": "comprehensive"
+                },
+                "period": {
+                    "type": "string",
+                    "description": "报告期间：quarterly, annual, latest",
+                    "default": "latest"
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": "同时进行的数据获取和写文件任务数，默认读取配置 reports.batch.concurrency"
+                },
+                "bypass_cache": {
+                    "type": "boolean",
+                    "description": "跳过报告缓存，强制重新生成（新报告仍会写入缓存）",
+                    "default": False
+                },
+                "formats": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": ["pdf", "png"]},
+                    "description": "文本报告之外生成的格式：pdf（含图表的PDF）、png（图表图片），默认读取配置 reports.output.formats（默认为空，只生成文本报告）"
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="interactive_report_generation",
+        description="交互式财报生成，支持选择公司",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "auto_select": {
+                    "type": "boolean",
+                    "description": "是否自动选择公司（用于演示）",
+                    "default": False
+                }
+            },
+            "required": []
+        }
+    )
+]
+
+# AI增强工具
+AI_ENHANCED_REPORT_TOOLS = [
+    Tool(
+        name="ai_analyze_company",
+        description="使用AI分析公司财务状况和投资价值",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "symbol": {
+                    "type": "string",
+                    "description": "公司股票代码，如NVDA、AAPL等"
+                },
+                "analysis_type": {
+                    "type": "string",
+                    "description": "分析类型：financial, investment, risk, comprehensive",
+                    "default": "comprehensive"
+                }
+            },
+            "required": ["symbol"]
+        }
+    ),
+    Tool(
+        name="ai_generate_report",
+        description="使用AI生成智能财务报告",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "symbol": {
+                    "type": "string",
+                    "description": "公司股票代码"
+                },
+                "report_style": {
+                    "type": "string",
+                    "description": "报告风格：professional, simple, detailed",
+                    "default": "professional"
+                }
+            },
+            "required": ["symbol"]
+        }
+    ),
+    Tool(
+        name="ai_investment_advice",
+        description="使用AI提供投资建议",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "symbol": {
+                    "type": "string",
+                    "description": "公司股票代码"
+                },
+                "investment_horizon": {
+                    "type": "string",
+                    "description": "投资期限：short_term, medium_term, long_term",
+                    "default": "medium_term"
+                }
+            },
+            "required": ["symbol"]
+        }
+    )
+]
+
+
+TOOL_GROUPS = [
+    ToolGroupSpec(
+        config_key="financial_data",
+        module="financial_data",
+        class_name="FinancialDataTool",
+        tools=FINANCIAL_DATA_TOOLS
+    ),
+    ToolGroupSpec(
+        config_key="report_generator",
+        module="report_generator",
+        class_name="ReportGeneratorTool",
+        tools=REPORT_GENERATOR_TOOLS
+    ),
+    ToolGroupSpec(
+        config_key="data_analyzer",
+        module="data_analyzer",
+        class_name="DataAnalyzerTool",
+        tools=DATA_ANALYZER_TOOLS
+    ),
+    ToolGroupSpec(
+        config_key="ocr_tools",
+        module="ocr_tools",
+        class_name="OCRTools",
+        tools=OCR_TOOLS
+    ),
+    ToolGroupSpec(
+        config_key="company_report_generator",
+        module="company_report_generator",
+        class_name="CompanyReportGenerator",
+        tools=COMPANY_REPORT_TOOLS
+    ),
+    ToolGroupSpec(
+        config_key="ai_enhanced_report_generator",
+        module="ai_enhanced_report_generator",
+        class_name="AIEnhancedReportGenerator",
+        tools=AI_ENHANCED_REPORT_TOOLS
+    )
+]
@@ -2,14 +2,27 @@
 MCP工具包
 
 包含财务报告生成相关的MCP工具实现。
+
+工具类按需导入，避免导入本包时加载pandas、yfinance等重量级依赖。
 """
 
-from .financial_data import FinancialDataTool
-from .report_generator import ReportGeneratorTool
-from .data_analyzer import DataAnalyzerTool
+import importlib
+
+_EXPORTS = {
+    "FinancialDataTool": ".financial_data",
+    "ReportGeneratorTool": ".report_generator",
+    "DataAnalyzerTool": ".data_analyzer",
+}
 
 __all__ = [
     "FinancialDataTool",
     "ReportGeneratorTool", 
     "DataAnalyzerTool"
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        module = importlib.import_module(_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -10,7 +10,7 @@ import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from mcp.types import (
     CallToolRequest,
@@ -21,6 +21,11 @@ from mcp.types import (
     Tool,
 )
 
+from ..report_sections import UNCACHED, SectionedReport, get_section_cache
+from ..report_templates import get_report_templates, number, percent
+from ..report_writer import get_report_writer
+from ..tool_specs import AI_ENHANCED_REPORT_TOOLS
+
 # 导入AI模型相关库
 try:
     import openai
@@ -38,6 +43,60 @@ except ImportError:
     OLLAMA_AVAILABLE = False
     logging.warning("Ollama客户端未安装，Ollama功能将不可用")
 
+OPENAI_MODEL = "gpt-3.5-turbo"
+# 模型的降级顺序，都失败时使用模拟内容
+AI_BACKENDS = ("ollama", "openai")
+# 同时发往本地Ollama模型的请求数上限：本地模型逐个处理请求，并发过多只会排队并占用显存
+DEFAULT_OLLAMA_CONCURRENCY = 2
+
+# AI报告的分段（ai_report.md 中的 block，按报告顺序）及各段依赖的输入。
+# 每个AI分段单独调用一次模型，提示中只包含该段依赖的财务数据，依赖值不变的分段复用
+# 上次生成的文本：如股价变动时只重新生成执行摘要、财务分析和投资建议，业务分析和风险评估不再调用模型
+AI_REPORT_SECTIONS = {
+    "header": ("symbol", "company", "generated_date"),
+    "summary": ("model", "symbol", "company", "report_style", "data.current_price", "data.market_cap",
+                "data.revenue", "data.net_income", "data.profit_margin", "data.pe_ratio"),
+    "financials": ("model", "symbol", "company", "report_style", "data.current_price", "data.market_cap",
+                   "data.revenue", "data.net_income", "data.debt_ratio", "data.profit_margin",
+                   "data.pe_ratio", "data.roe"),
+    "business": ("model", "symbol", "company", "report_style", "data.revenue", "data.profit_margin"),
+    "risks": ("model", "symbol", "company", "report_style", "data.debt_ratio", "data.pe_ratio"),
+    "recommendation": ("model", "symbol", "company", "report_style", "data.current_price",
+                       "data.profit_margin", "data.pe_ratio", "data.roe"),
+    "footer": ()
+}
+
+# AI分段 -> (标题, 撰写要求)
+AI_SECTION_PROMPTS = {
+    "summary": ("执行摘要", "用一到两段话概括公司当前的经营和估值状况，以及报告的核心结论"),
+    "financials": ("财务分析", "分析盈利能力、偿债能力和估值水平，指出数据反映的优势和隐忧"),
+    "business": ("业务分析", "介绍公司的主营业务、行业地位和竞争优势"),
+    "risks": ("风险评估", "列出公司面临的主要风险因素，并评估其影响"),
+    "recommendation": ("投资建议", "给出投资评级（买入/持有/卖出）和理由，并说明需要关注的风险")
+}
+
+# 财务数据字段 -> (名称, 格式化函数)
+AI_DATA_FIELDS = {
+    "current_price": ("当前股价", lambda value: f"${value}"),
+    "market_cap": ("市值", lambda value: f"${value}"),
+    "revenue": ("营业收入", lambda value: f"${value}"),
+    "net_income": ("净利润", lambda value: f"${value}"),
+    "debt_ratio": ("资产负债率", percent),
+    "profit_margin": ("净利润率", percent),
+    "pe_ratio": ("市盈率", number),
+    "roe": ("股本收益率", percent)
+}
+
+# 没有可用的AI模型时各分段的模拟内容
+MOCK_AI_SECTIONS = {
+    "summary": "本报告基于最新的财务数据生成，公司整体经营稳健，盈利能力良好，当前估值处于合理区间。",
+    "financials": "- 收入增长稳定\n- 利润率保持良好水平\n- 资产负债率处于合理水平，现金流状况健康",
+    "business": "公司在所属行业中具有较强的竞争地位，核心业务保持增长，具备长期发展潜力。",
+    "risks": "- 市场波动风险\n- 行业竞争风险\n- 政策变化风险",
+    "recommendation": "基于当前分析，建议投资者：\n1. 关注公司基本面\n2. 分散投资风险\n3. 长期持有策略\n\n"
+                      "*注：这是模拟AI生成的内容，仅供参考。*"
+}
+
 
 class AIEnhancedReportGenerator:
     """AI增强报告生成工具"""
@@ -45,14 +104,24 @@ class AIEnhancedReportGenerator:
     def __init__(self, api_key: Optional[str] = None, 
                  ollama_url: str = "http://localhost:11434", 
                  ollama_model: str = "deepseek-r1:7b",
-                 use_ollama: bool = True):
+                 use_ollama: bool = True,
+                 ollama_concurrency: int = DEFAULT_OLLAMA_CONCURRENCY):
         self.logger = logging.getLogger(__name__)
         self.output_dir = Path("output")
         self.output_dir.mkdir(exist_ok=True)
+        self.writer = get_report_writer()
+        # 获取最新股价的数据工具，首次使用时创建
+        self._data_tool = None
+        self.ai_report = SectionedReport(
+            get_report_templates(), "ai_report.md", AI_REPORT_SECTIONS, get_section_cache()
+        )
         
         # 初始化AI客户端
         self.ai_client = None
         self.ollama_client = None
+        if ollama_concurrency < 1:
+            raise ValueError("ollama_concurrency 必须大于0")
+        self.ollama_slots = asyncio.Semaphore(ollama_concurrency)
         
         # 优先使用Ollama
         if use_ollama and OLLAMA_AVAILABLE:
@@ -108,82 +177,30 @@ class AIEnhancedReportGenerator:
     
     async def list_tools(self, request: ListToolsRequest) -> ListToolsResult:
         """列出可用的AI增强工具"""
-        tools = [
-            Tool(
-                name="ai_analyze_company",
-                description="使用AI分析公司财务状况和投资价值",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "symbol": {
-                            "type": "string",
-                            "description": "公司股票代码，如NVDA、AAPL等"
-                        },
-                        "analysis_type": {
-                            "type": "string",
-                            "description": "分析类型：financial, investment, risk, comprehensive",
-                            "default": "comprehensive"
-                        }
-                    },
-                    "required": ["symbol"]
-                }
-            ),
-            Tool(
-                name="ai_generate_report",
-                description="使用AI生成智能财务报告",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "symbol": {
-                            "type": "string",
-                            "description": "公司股票代码"
-                        },
-                        "report_style": {
-                            "type": "string",
-                            "description": "报告风格：professional, simple, detailed",
-                            "default": "professional"
-                        }
-                    },
-                    "required": ["symbol"]
-                }
-            ),
-            Tool(
-                name="ai_investment_advice",
-                description="使用AI提供投资建议",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "symbol": {
-                            "type": "string",
-                            "description": "公司股票代码"
-                        },
-                        "investment_horizon": {
-                            "type": "string",
-                            "description": "投资期限：short_term, medium_term, long_term",
-                            "default": "medium_term"
-                        }
-                    },
-                    "required": ["symbol"]
-                }
-            )
-        ]
-        
-        return ListToolsResult(tools=tools)
+        return ListToolsResult(tools=self.get_tools())
+        
+    def get_tools(self) -> List[Tool]:
+        """获取AI增强工具定义"""
+        return list(AI_ENHANCED_REPORT_TOOLS)
+        
+    def get_tool_handlers(self) -> Dict[str, Callable[[Dict[str, Any]], Awaitable[CallToolResult]]]:
+        """获取工具名到处理函数的映射"""
+        return {
+            "ai_analyze_company": self._ai_analyze_company,
+            "ai_generate_report": self._ai_generate_report,
+            "ai_investment_advice": self._ai_investment_advice
+        }
     
     async def call_tool(self, request: CallToolRequest) -> CallToolResult:
         """调用AI增强工具"""
         tool_name = request.params.name
-        arguments = request.params.arguments
+        arguments = request.params.arguments or {}
         
         try:
-            if tool_name == "ai_analyze_company":
-                return await self._ai_analyze_company(arguments)
-            elif tool_name == "ai_generate_report":
-                return await self._ai_generate_report(arguments)
-            elif tool_name == "ai_investment_advice":
-                return await self._ai_investment_advice(arguments)
-            else:
+            handler = self.get_tool_handlers().get(tool_name)
+            if handler is None:
                 raise ValueError(f"未知的工具: {tool_name}")
+            return await handler(arguments)
                 
         except Exception as e:
             self.logger.error(f"AI工具调用失败: {e}")
@@ -216,7 +233,7 @@ class AIEnhancedReportGenerator:
             )
         
         # 获取基础财务数据
-        financial_data = self._get_mock_financial_data(symbol)
+        financial_data = await self._get_financial_data(symbol)
         company_info = self.companies[symbol]
         
         # 构建AI分析提示
@@ -265,26 +282,19 @@ class AIEnhancedReportGenerator:
             )
         
         # 获取基础数据
-        financial_data = self._get_mock_financial_data(symbol)
+        financial_data = await self._get_financial_data(symbol)
         company_info = self.companies[symbol]
         
-        # 构建报告生成提示
-        prompt = self._build_report_prompt(symbol, company_info, financial_data, report_style)
-        
         try:
-            # 调用AI模型
-            ai_report = await self._call_ai_model(prompt)
-            
-            # 确保报告是markdown格式
-            markdown_report = self._ensure_markdown_format(ai_report, symbol, company_info)
+            # 逐段调用AI模型，只重新生成依赖数据发生变化的分段
+            markdown_report = await self._create_ai_report(symbol, company_info, financial_data, report_style)
             
             # 保存报告为markdown格式
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"ai_report_{symbol}_{timestamp}.md"
             filepath = self.output_dir / filename
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(markdown_report)
+            await self.writer.write(filepath, markdown_report)
             
             return CallToolResult(
                 content=[
@@ -325,7 +335,7 @@ class AIEnhancedReportGenerator:
             )
         
         # 获取基础数据
-        financial_data = self._get_mock_financial_data(symbol)
+        financial_data = await self._get_financial_data(symbol)
         company_info = self.companies[symbol]
         
         # 构建投资建议提示
@@ -354,6 +364,22 @@ class AIEnhancedReportGenerator:
                 ]
             )
     
+    async def _get_financial_data(self, symbol: str) -> Dict[str, Any]:
+        """财务数据：当前股价取最新日K线的收盘价，获取失败时使用模拟数据中的股价"""
+        data = dict(self._get_mock_financial_data(symbol))
+        if self._data_tool is None:
+            from .financial_data import FinancialDataTool
+            self._data_tool = FinancialDataTool()
+            
+        try:
+            series = await self._data_tool.load_price_series(symbol, period="1y", interval="1d")
+        except Exception as e:
+            self.logger.warning(f"获取 {symbol} 最新股价失败，使用模拟数据: {e}")
+            return data
+        if len(series) > 0:
+            data["current_price"] = round(float(series.close[-1]), 2)
+        return data
+    
     def _get_mock_financial_data(self, symbol: str) -> Dict[str, Any]:
         """获取模拟财务数据"""
         data_templates = {
@@ -420,36 +446,64 @@ class AIEnhancedReportGenerator:
 请用专业、客观的语言进行分析。
 """
     
-    def _build_report_prompt(self, symbol: str, company_info: Dict[str, str], 
-                            financial_data: Dict[str, Any], report_style: str) -> str:
-        """构建AI报告生成提示"""
+    async def _create_ai_report(self, symbol: str, company_info: Dict[str, str],
+                                financial_data: Dict[str, Any], report_style: str) -> str:
+        """生成AI报告，各AI分段并发调用模型，依赖数据未变的分段取缓存中的文本
+
+        每个分段单独按 Ollama -> OpenAI -> 模拟内容降级，一个分段失败不影响其他分段。
+        """
+        backend = await self._available_backend()
+        context = {
+            "model": self._model_name(backend),
+            "symbol": symbol,
+            "company": company_info,
+            "report_style": report_style,
+            "generated_date": datetime.now().strftime('%Y年%m月%d日'),
+            "data": financial_data
+        }
+        
+        def producer(section: str):
+            async def produce() -> Dict[str, Any]:
+                if backend == "mock":
+                    return {section: MOCK_AI_SECTIONS[section]}
+                prompt = self._build_section_prompt(section, symbol, company_info, financial_data, report_style)
+                used, text = await self._generate_with_fallback(backend, prompt, MOCK_AI_SECTIONS[section])
+                extra: Dict[str, Any] = {section: text.strip()}
+                if used != backend:
+                    # 降级生成的内容不按原模型缓存，下次仍先尝试原模型
+                    extra[UNCACHED] = True
+                return extra
+            return produce
+        
+        content, rendered = await self.ai_report.render_async(
+            context, producers={section: producer(section) for section in AI_SECTION_PROMPTS}
+        )
+        self.logger.debug(f"{symbol} AI报告重新生成的分段: {', '.join(rendered)}")
+        return content
+    
+    def _build_section_prompt(self, section: str, symbol: str, company_info: Dict[str, str],
+                              financial_data: Dict[str, Any], report_style: str) -> str:
+        """构建AI报告单个分段的提示，只列出该段依赖的财务数据"""
+        title, requirement = AI_SECTION_PROMPTS[section]
+        data_lines = []
+        for name in AI_REPORT_SECTIONS[section]:
+            head, _, field = name.partition(".")
+            if head == "data":
+                label, fmt = AI_DATA_FIELDS[field]
+                data_lines.append(f"- {label}: {fmt(financial_data[field])}")
+        data_text = "\n".join(data_lines)
         return f"""
-请为 {company_info['name']} ({symbol}) 生成一份{report_style}风格的财务报告。
+请为 {company_info['name']} ({symbol}) 撰写一份{report_style}风格财务报告中的「{title}」部分。
 
 公司信息:
 - 公司名称: {company_info['name']}
 - 行业: {company_info['sector']} - {company_info['industry']}
 
 财务数据:
-- 当前股价: ${financial_data['current_price']}
-- 市值: ${financial_data['market_cap']}
-- 营业收入: ${financial_data['revenue']}
-- 净利润: ${financial_data['net_income']}
-- 资产负债率: {financial_data['debt_ratio']:.2%}
-- 净利润率: {financial_data['profit_margin']:.2%}
-- 市盈率: {financial_data['pe_ratio']:.2f}
-- 股本收益率: {financial_data['roe']:.2%}
+{data_text}
 
-请生成一份包含以下内容的{report_style}风格报告：
-1. 执行摘要
-2. 公司概况
-3. 财务分析
-4. 业务分析
-5. 风险评估
-6. 投资建议
-7. 结论
-
-请确保报告结构清晰、内容专业、数据准确。
+要求：{requirement}。
+只输出这一部分的正文（可使用markdown列表），不要输出标题，不要编写报告的其他部分。
 """
     
     def _build_investment_prompt(self, symbol: str, company_info: Dict[str, str], 
@@ -493,41 +547,72 @@ class AIEnhancedReportGenerator:
         Returns:
             AI生成的响应
         """
-        # 优先使用Ollama
+        backend = await self._available_backend()
+        _, response = await self._generate_with_fallback(
+            backend, prompt, self._get_mock_ai_response(prompt), system_prompt
+        )
+        return response
+    
+    async def _generate_with_fallback(self, backend: str, prompt: str, fallback: str,
+                                      system_prompt: str = "") -> Tuple[str, str]:
+        """从 backend 开始按 Ollama -> OpenAI 的顺序调用模型，都失败时返回 fallback
+
+        Returns:
+            (实际使用的模型：ollama、openai 或 mock, 响应)
+        """
+        candidates = AI_BACKENDS[AI_BACKENDS.index(backend):] if backend in AI_BACKENDS else ()
+        for name in candidates:
+            if name == "openai" and not self.ai_client:
+                continue
+            try:
+                return name, await self._generate(name, prompt, system_prompt)
+            except Exception as e:
+                self.logger.error(f"{'Ollama' if name == 'ollama' else 'OpenAI'}调用失败: {e}")
+        return "mock", fallback
+    
+    async def _available_backend(self) -> str:
+        """当前可用的模型：ollama、openai，都不可用时为 mock"""
         if self.ollama_client:
             try:
                 # 检查Ollama服务是否可用
                 if await self.ollama_client.health_check():
-                    response = await self.ollama_client.generate(
-                        prompt=prompt,
-                        system_prompt=system_prompt,
-                        temperature=0.7,
-                        max_tokens=2048
-                    )
-                    return response
-                else:
-                    self.logger.warning("Ollama服务不可用，尝试使用OpenAI")
+                    return "ollama"
+                self.logger.warning("Ollama服务不可用，尝试使用OpenAI")
             except Exception as e:
                 self.logger.error(f"Ollama调用失败: {e}")
-        
-        # 如果Ollama不可用，使用OpenAI
         if self.ai_client:
-            try:
-                response = await self.ai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": prompt}
-                    ],
+            return "openai"
+        return "mock"
+    
+    def _model_name(self, backend: str) -> str:
+        """模型标识，作为AI分段的依赖：换用模型后已缓存的分段失效"""
+        if backend == "ollama":
+            return f"ollama:{self.ollama_client.model}"
+        if backend == "openai":
+            return f"openai:{OPENAI_MODEL}"
+        return backend
+    
+    async def _generate(self, backend: str, prompt: str, system_prompt: str = "") -> str:
+        """用指定的模型生成响应，失败时抛出异常"""
+        if backend == "ollama":
+            # 限制同时发往本地模型的请求数，多余的分段在此排队
+            async with self.ollama_slots:
+                return await self.ollama_client.generate(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
                     temperature=0.7,
                     max_tokens=2048
                 )
-                return response.choices[0].message.content
-            except Exception as e:
-                self.logger.error(f"OpenAI调用失败: {e}")
-        
-        # 如果AI都不可用，返回模拟响应
-        return self._get_mock_ai_response(prompt)
+        response = await self.ai_client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=2048
+        )
+        return response.choices[0].message.content
     
     def _get_mock_ai_response(self, prompt: str) -> str:
         """获取模拟AI响应"""
@@ -576,80 +661,3 @@ class AIEnhancedReportGenerator:
 """
         else:
             return "AI分析完成。基于提供的数据，建议投资者进行充分的风险评估和投资决策。"
-
-    def _ensure_markdown_format(self, content: str, symbol: str, company_info: Dict[str, str]) -> str:
-        """确保内容是正确的markdown格式"""
-        # 如果内容已经是markdown格式，直接返回
-        if content.strip().startswith('#'):
-            return content
-        
-        # 否则，转换为markdown格式
-        lines = content.split('\n')
-        markdown_lines = []
-        
-        # 添加标题
-        markdown_lines.append(f"# {company_info['name']} ({symbol}) 财务报告")
-        markdown_lines.append("")
-        markdown_lines.append(f"**生成日期：** {datetime.now().strftime('%Y年%m月%d日')}")
-        markdown_lines.append("")
-        markdown_lines.append("**免责声明：** 本报告基于AI分析生成，仅供参考，不构成投资建议。投资者应在做出任何投资决策之前，进行充分的研究并咨询专业财务顾问。")
-        markdown_lines.append("")
-        
-        # 处理内容
-        in_list = False
-        for line in lines:
-            line = line.strip()
-            if not line:
-                markdown_lines.append("")
-                in_list = False
-                continue
-            
-            # 处理标题
-            if line.startswith('**') and line.endswith('**'):
-                # 移除粗体标记，添加markdown标题
-                title = line.replace('**', '').strip()
-                if title.isdigit() or title.startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.')):
-                    # 数字标题，转换为二级标题
-                    title = title.split('.', 1)[1] if '.' in title else title
-                    markdown_lines.append(f"## {title}")
-                else:
-                    # 其他标题，转换为三级标题
-                    markdown_lines.append(f"### {title}")
-                markdown_lines.append("")
-                in_list = False
-            elif line.startswith('* **') and line.endswith('**'):
-                # 列表项
-                if not in_list:
-                    markdown_lines.append("")
-                item = line.replace('* **', '- **').replace('**', '**')
-                markdown_lines.append(item)
-                in_list = True
-            elif line.startswith('* '):
-                # 普通列表项
-                if not in_list:
-                    markdown_lines.append("")
-                markdown_lines.append(line.replace('* ', '- '))
-                in_list = True
-            elif '|' in line and ('指标' in line or '---' in line):
-                # 表格行
-                markdown_lines.append(line)
-            elif line.startswith('**') and ':' in line:
-                # 键值对
-                key, value = line.split(':', 1)
-                key = key.replace('**', '').strip()
-                value = value.replace('**', '').strip()
-                markdown_lines.append(f"**{key}：** {value}")
-            else:
-                # 普通段落
-                if in_list:
-                    markdown_lines.append("")
-                    in_list = False
-                markdown_lines.append(line)
-        
-        # 添加结尾
-        markdown_lines.append("")
-        markdown_lines.append("---")
-        markdown_lines.append("")
-        markdown_lines.append("**请注意：** 此报告基于AI分析生成，数据和分析可能随时间变化，请参考最新的财务报告和市场信息。")
-        
-        return '\n'.join(markdown_lines)
@@ -7,10 +7,13 @@
 import asyncio
 import json
 import logging
+import time
+from concurrent.futures import Future
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 from mcp.types import (
     CallToolRequest,
     CallToolResult,
@@ -20,6 +23,54 @@ from mcp.types import (
     Tool,
 )
 
+try:
+    from ...data.models import PriceSeries
+except ImportError:
+    # src 目录在 sys.path 上、mcp_server 作为顶层包导入时
+    from data.models import PriceSeries
+
+from ..analytics import compute_indicators, latest_values
+from ..config import get_config_section
+from ..process_pool import get_render_pool
+from ..rendering import chart_config, render_documents, resolve_formats
+from ..report_cache import canonical_digest, get_report_cache
+from ..report_sections import SectionedReport, get_section_cache
+from ..report_templates import get_report_templates
+from ..report_writer import get_report_writer
+from ..tool_specs import COMPANY_REPORT_TOOLS
+
+# 报告技术分析部分使用的指标：列名 -> 报告字段名
+TECHNICAL_FIELDS = {
+    "sma_50": "ma_50",
+    "sma_200": "ma_200",
+    "rsi_14": "rsi",
+    "macd": "macd",
+    "macd_signal": "macd_signal",
+    "bb_upper": "bb_upper",
+    "bb_middle": "bb_middle",
+    "bb_lower": "bb_lower"
+}
+
+# 公司财报的分段（company_report.txt 中的 block，按报告顺序）及各段依赖的输入；
+# 依赖值不变的分段复用上次渲染的文本，如股价变动时业务分析和风险因素不会重新生成
+COMPANY_REPORT_SECTIONS = {
+    "header": ("symbol", "company", "report_type", "period", "generated_at"),
+    "summary": ("data.current_price", "data.market_cap", "data.revenue", "data.net_income",
+                "data.total_assets", "data.total_liabilities"),
+    "ratios": ("data.debt_ratio", "data.profit_margin", "data.roa", "data.roe",
+               "data.pe_ratio", "data.pb_ratio"),
+    "business": ("symbol",),
+    "risks": ("symbol",),
+    "recommendation": ("data.pe_ratio", "data.debt_ratio", "data.profit_margin"),
+    "technicals": ("data.52w_high", "data.52w_low", "data.ma_50", "data.ma_200", "data.rsi",
+                   "data.macd", "data.macd_signal", "data.bb_upper", "data.bb_middle", "data.bb_lower"),
+    "performance": ("data.ytd_return", "data.1y_return", "data.3y_return"),
+    "footer": ()
+}
+
+# 批量生成时同时进行的数据获取/写文件任务数
+DEFAULT_BATCH_CONCURRENCY = 8
+
 
 class CompanyReportGenerator:
     """公司财报生成工具"""
@@ -28,6 +79,19 @@ class CompanyReportGenerator:
         self.logger = logging.getLogger(__name__)
         self.output_dir = Path("output")
         self.output_dir.mkdir(exist_ok=True)
+        # 获取历史K线的数据工具，首次使用时创建
+        self._data_tool = None
+        self.templates = get_report_templates()
+        self.company_report = SectionedReport(
+            self.templates, "company_report.txt", COMPANY_REPORT_SECTIONS, get_section_cache(),
+            related_templates=("company_recommendation.txt",)
+        )
+        self.writer = get_report_writer()
+        self.render_pool = get_render_pool()
+        self.batch_config = get_config_section("reports", "batch")
+        # 内容寻址的报告缓存，reports.cache.enabled 为 false 时关闭
+        cache_enabled = get_config_section("reports", "cache").get("enabled", True)
+        self.report_cache = get_report_cache() if cache_enabled else None
         
         # 预定义的公司列表
         self.companies = {
@@ -45,73 +109,31 @@ class CompanyReportGenerator:
         
     async def list_tools(self, request: ListToolsRequest) -> ListToolsResult:
         """列出可用的公司财报生成工具"""
-        tools = [
-            Tool(
-                name="list_companies",
-                description="列出可用的公司列表",
-                inputSchema={
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            ),
-            Tool(
-                name="generate_company_report",
-                description="生成指定公司的财报",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "symbol": {
-                            "type": "string",
-                            "description": "公司股票代码，如NVDA、AAPL等"
-                        },
-                        "report_type": {
-                            "type": "string",
-                            "description": "报告类型：basic, comprehensive, financial_analysis",
-                            "default": "comprehensive"
-                        },
-                        "period": {
-                            "type": "string",
-                            "description": "报告期间：quarterly, annual, latest",
-                            "default": "latest"
-                        }
-                    },
-                    "required": ["symbol"]
-                }
-            ),
-            Tool(
-                name="interactive_report_generation",
-                description="交互式财报生成，支持选择公司",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "auto_select": {
-                            "type": "boolean",
-                            "description": "是否自动选择公司（用于演示）",
-                            "default": False
-                        }
-                    },
-                    "required": []
-                }
-            )
-        ]
+        return ListToolsResult(tools=self.get_tools())
         
-        return ListToolsResult(tools=tools)
+    def get_tools(self) -> List[Tool]:
+        """获取公司财报生成工具定义"""
+        return list(COMPANY_REPORT_TOOLS)
+        
+    def get_tool_handlers(self) -> Dict[str, Callable[[Dict[str, Any]], Awaitable[CallToolResult]]]:
+        """获取工具名到处理函数的映射"""
+        return {
+            "list_companies": lambda arguments: self._list_companies(),
+            "generate_company_report": self._generate_company_report,
+            "generate_batch_reports": self._generate_batch_reports,
+            "interactive_report_generation": self._interactive_report_generation
+        }
         
     async def call_tool(self, request: CallToolRequest) -> CallToolResult:
         """调用公司财报生成工具"""
         tool_name = request.params.name
-        arguments = request.params.arguments
+        arguments = request.params.arguments or {}
         
         try:
-            if tool_name == "list_companies":
-                return await self._list_companies()
-            elif tool_name == "generate_company_report":
-                return await self._generate_company_report(arguments)
-            elif tool_name == "interactive_report_generation":
-                return await self._interactive_report_generation(arguments)
-            else:
+            handler = self.get_tool_handlers().get(tool_name)
+            if handler is None:
                 raise ValueError(f"未知的工具: {tool_name}")
+            return await handler(arguments)
                 
         except Exception as e:
             self.logger.error(f"工具调用失败: {e}")
@@ -151,33 +173,239 @@ class CompanyReportGenerator:
         symbol = arguments.get("symbol", "").upper()
         report_type = arguments.get("report_type", "comprehensive")
         period = arguments.get("period", "latest")
+        formats = resolve_formats(arguments.get("formats"))
         
         if symbol not in self.companies:
             available_symbols = ", ".join(self.companies.keys())
             raise ValueError(f"不支持的公司代码: {symbol}。可用代码: {available_symbols}")
             
         company_info = self.companies[symbol]
+        technical_data = await self._get_technical_data(symbol)
         
-        # 生成财报内容
-        report_content = self._create_company_report(symbol, company_info, report_type, period)
-        
-        # 保存到文件
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"company_report_{symbol}_{timestamp}.txt"
         filepath = self.output_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(report_content)
+        # 输入（参数、数据快照、模板）未变化时复用已生成的报告
+        digest = self._report_digest(symbol, report_type, period, technical_data)
+        cached = await self._reuse_cached_report(digest, filepath, arguments.get("bypass_cache", False))
+        if cached is not None:
+            report_content, report_file = cached
+            documents = await self._company_documents(symbol, digest, filepath, report_content, formats, reuse=True)
+            return CallToolResult(
+                content=[
+                    TextContent(
+                        type="text",
+                        text=f"公司财报已生成（输入未变化，复用缓存的报告）:\n\n{report_content}\n\n"
+                             f"报告文件: {report_file}{self._format_documents(documents)}"
+                    )
+                ]
+            )
+            
+        # 生成财报内容
+        report_content = self._create_company_report(symbol, company_info, report_type, period, technical_data)
+        
+        # 保存到文件，落盘后加入报告缓存
+        written = await self.writer.write(filepath, report_content)
+        if self.report_cache is not None:
+            self.report_cache.store(digest, filepath, written)
+        documents = await self._company_documents(symbol, digest, filepath, report_content, formats)
             
         return CallToolResult(
             content=[
                 TextContent(
                     type="text",
-                    text=f"公司财报已生成:\n\n{report_content}\n\n报告文件已保存到: {filepath}"
+                    text=f"公司财报已生成:\n\n{report_content}\n\n"
+                         f"报告文件已保存到: {filepath}{self._format_documents(documents)}"
                 )
             ]
         )
         
+    async def _generate_batch_reports(self, arguments: Dict[str, Any]) -> CallToolResult:
+        """批量生成财报
+
+        数据获取、渲染、写文件三个阶段由有界队列连接：获取和写文件各有 concurrency 个
+        工作协程（文件由报告写入器的后台线程落盘），渲染为纯CPU计算，由一个协程串行完成。
+        PDF和图表在写文件阶段提交给渲染进程池，多个公司的图表在多个进程中并行绘制。
+        某个公司失败不影响其他公司，结果清单记录每个公司各阶段耗时和错误。
+        """
+        symbols = self._resolve_batch_symbols(arguments)
+        report_type = arguments.get("report_type", "comprehensive")
+        period = arguments.get("period", "latest")
+        bypass_cache = arguments.get("bypass_cache", False)
+        formats = resolve_formats(arguments.get("formats"))
+        concurrency = int(arguments.get("concurrency") or self.batch_config.get("concurrency", DEFAULT_BATCH_CONCURRENCY))
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于0")
+            
+        batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        entries = {symbol: {"symbol": symbol, "status": "pending", "timings": {}} for symbol in symbols}
+        pending = iter(symbols)
+        fetched: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        rendered: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        started = time.perf_counter()
+        
+        def fail(entry: Dict[str, Any], stage: str, error: Exception):
+            entry["status"] = "failed"
+            entry["error"] = f"{stage}: {error}"
+            self.logger.warning(f"批量财报 {entry['symbol']} {stage}阶段失败: {error}")
+            
+        async def fetch_worker():
+            # 所有获取协程共享同一个代码迭代器
+            for symbol in pending:
+                entry = entries[symbol]
+                stage_started = time.perf_counter()
+                if symbol not in self.companies:
+                    fail(entry, "fetch", ValueError("不支持的公司代码"))
+                    continue
+                technical_data = await self._get_technical_data(symbol)
+                entry["timings"]["fetch"] = round(time.perf_counter() - stage_started, 4)
+                entry["technical_data"] = bool(technical_data)
+                await fetched.put((symbol, technical_data))
+                
+        async def render_worker():
+            while (item := await fetched.get()) is not None:
+                symbol, technical_data = item
+                entry = entries[symbol]
+                stage_started = time.perf_counter()
+                try:
+                    digest = self._report_digest(symbol, report_type, period, technical_data)
+                    filepath = self.output_dir / f"company_report_{symbol}_{batch_id}.txt"
+                    cached = await self._reuse_cached_report(digest, filepath, bypass_cache)
+                    if cached is None:
+                        content = self._create_company_report(
+                            symbol, self.companies[symbol], report_type, period, technical_data
+                        )
+                except Exception as e:
+                    fail(entry, "render", e)
+                    continue
+                entry["timings"]["render"] = round(time.perf_counter() - stage_started, 4)
+                if cached is not None:
+                    # 命中缓存的报告已链接到位，只在需要PDF/图表时进入写文件阶段
+                    content, report_file = cached
+                    entry.update(cached=True, bytes=len(content.encode("utf-8")), file=str(report_file))
+                    if not formats:
+                        entry["status"] = "ok"
+                        continue
+                await rendered.put((symbol, digest, filepath, content, cached is not None))
+                
+        async def write_worker():
+            while (item := await rendered.get()) is not None:
+                symbol, digest, filepath, content, cached = item
+                entry = entries[symbol]
+                stage_started = time.perf_counter()
+                if not cached:
+                    try:
+                        # 经后写队列落盘，等待提交完成以便在清单中记录写入失败
+                        written = await self.writer.write(filepath, content)
+                        if self.report_cache is not None:
+                            self.report_cache.store(digest, filepath, written)
+                        await asyncio.wrap_future(written)
+                    except Exception as e:
+                        fail(entry, "write", e)
+                        continue
+                    entry["timings"]["write"] = round(time.perf_counter() - stage_started, 4)
+                    entry.update(cached=False, bytes=len(content.encode("utf-8")), file=str(filepath))
+                if formats:
+                    stage_started = time.perf_counter()
+                    try:
+                        documents = await self._company_documents(
+                            symbol, digest, filepath, content, formats, reuse=cached
+                        )
+                        await asyncio.gather(*(asyncio.wrap_future(future) for _, future in documents))
+                    except Exception as e:
+                        fail(entry, "documents", e)
+                        continue
+                    entry["timings"]["documents"] = round(time.perf_counter() - stage_started, 4)
+                    entry["documents"] = [str(path) for path, _ in documents]
+                entry["status"] = "ok"
+                
+        async def run_stage(workers: List[Any], downstream: Optional[asyncio.Queue], downstream_workers: int):
+            # 本阶段全部结束（包括异常退出）后向下游每个工作协程发送结束标记
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                if downstream is not None:
+                    for _ in range(downstream_workers):
+                        await downstream.put(None)
+                    
+        await asyncio.gather(
+            run_stage([fetch_worker() for _ in range(concurrency)], fetched, 1),
+            run_stage([render_worker()], rendered, concurrency),
+            run_stage([write_worker() for _ in range(concurrency)], None, 0)
+        )
+        
+        for entry in entries.values():
+            entry["timings"]["total"] = round(sum(entry["timings"].values()), 4)
+        succeeded = sum(entry["status"] == "ok" for entry in entries.values())
+        manifest = {
+            "batch_id": batch_id,
+            "report_type": report_type,
+            "period": period,
+            "concurrency": concurrency,
+            "formats": formats,
+            "total": len(symbols),
+            "succeeded": succeeded,
+            "failed": len(symbols) - succeeded,
+            "cache_hits": sum(bool(entry.get("cached")) for entry in entries.values()),
+            "elapsed_seconds": round(time.perf_counter() - started, 4),
+            "reports": list(entries.values())
+        }
+        manifest_path = self.output_dir / f"batch_manifest_{batch_id}.json"
+        manifest_text = json.dumps(manifest, indent=2, ensure_ascii=False)
+        await self.writer.write(manifest_path, manifest_text)
+        
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=(
+                        f"批量财报生成完成: 成功 {succeeded} / {len(symbols)}，"
+                        f"耗时 {manifest['elapsed_seconds']} 秒\n"
+                        f"清单文件: {manifest_path}\n\n{manifest_text}"
+                    )
+                )
+            ]
+        )
+        
+    def _report_digest(self, symbol: str, report_type: str, period: str,
+                       technical_data: Optional[Dict[str, float]]) -> str:
+        """公司财报的内容地址：报告参数、财务数据快照和所用模板"""
+        return canonical_digest({
+            "report": "company_report",
+            "symbol": symbol,
+            "report_type": report_type,
+            "period": period,
+            "data": {**self._get_mock_financial_data(symbol), **(technical_data or {})},
+            "templates": self.templates.fingerprint("company_report.txt", "company_recommendation.txt")
+        })
+        
+    async def _reuse_cached_report(self, digest: str, filepath: Path, bypass_cache: bool = False):
+        """查找内容相同的已生成报告，命中时返回 (正文, 报告文件路径)"""
+        if self.report_cache is None:
+            return None
+        if bypass_cache:
+            self.report_cache.record_bypass()
+            return None
+        return await asyncio.to_thread(self.report_cache.reuse, digest, filepath)
+        
+    def _resolve_batch_symbols(self, arguments: Dict[str, Any]) -> List[str]:
+        """批量生成的公司代码：symbols 优先（去重并保持顺序），否则按行业筛选"""
+        symbols = arguments.get("symbols")
+        if symbols:
+            return list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        sector = arguments.get("sector")
+        if not sector:
+            raise ValueError("symbols 和 sector 至少需要提供一个")
+        matched = [
+            symbol for symbol, info in self.companies.items()
+            if info["sector"].lower() == sector.lower()
+        ]
+        if not matched:
+            sectors = ", ".join(sorted({info["sector"] for info in self.companies.values()}))
+            raise ValueError(f"没有属于行业 {sector} 的公司。可用行业: {sectors}")
+        return matched
+        
     async def _interactive_report_generation(self, arguments: Dict[str, Any]) -> CallToolResult:
         """交互式财报生成"""
         auto_select = arguments.get("auto_select", False)
@@ -186,14 +414,16 @@ class CompanyReportGenerator:
             # 自动选择NVIDIA作为示例
             symbol = "NVDA"
             company_info = self.companies[symbol]
-            report_content = self._create_company_report(symbol, company_info, "comprehensive", "latest")
+            technical_data = await self._get_technical_data(symbol)
+            report_content = self._create_company_report(
+                symbol, company_info, "comprehensive", "latest", technical_data
+            )
             
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"interactive_report_{symbol}_{timestamp}.txt"
             filepath = self.output_dir / filename
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(report_content)
+            await self.writer.write(filepath, report_content)
                 
             return CallToolResult(
                 content=[
@@ -238,69 +468,132 @@ class CompanyReportGenerator:
                 ]
             )
             
-    def _create_company_report(self, symbol: str, company_info: Dict[str, str], 
-                              report_type: str, period: str) -> str:
-        """创建公司财报内容"""
-        company_name = company_info["name"]
-        sector = company_info["sector"]
-        industry = company_info["industry"]
+    async def _load_price_history(self, symbol: str) -> Optional[PriceSeries]:
+        """获取近一年日K线，失败或没有数据时返回None"""
+        if self._data_tool is None:
+            from .financial_data import FinancialDataTool
+            self._data_tool = FinancialDataTool()
+            
+        try:
+            series = await self._data_tool.load_price_series(symbol, period="1y", interval="1d")
+        except Exception as e:
+            self.logger.warning(f"获取 {symbol} 历史价格失败: {e}")
+            return None
+        return series if len(series) > 0 else None
         
-        # 模拟财务数据（实际应用中可以从API获取）
-        financial_data = self._get_mock_financial_data(symbol)
+    async def _get_technical_data(self, symbol: str) -> Dict[str, float]:
+        """由近一年日K线计算技术指标的最新值，获取数据失败时返回空字典（使用默认数据）"""
+        series = await self._load_price_history(symbol)
+        if series is None:
+            return {}
+            
+        columns = compute_indicators(
+            series.close,
+            indicators=["sma", "rsi", "macd", "bollinger"],
+            params={"sma": {"windows": [50, 200]}}
+        )
+        return {
+            TECHNICAL_FIELDS[name]: round(float(value[0]), 2)
+            for name, value in latest_values(columns).items()
+            if name in TECHNICAL_FIELDS and not np.isnan(value[0])
+        }
         
-        report = f"""
-{company_name} ({symbol}) 财务报告
-{'=' * 60}
-
-基本信息:
-- 公司名称: {company_name}
-- 股票代码: {symbol}
-- 行业分类: {sector} - {industry}
-- 报告类型: {report_type}
-- 报告期间: {period}
-- 生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-财务数据摘要:
-- 当前股价: ${financial_data['current_price']}
-- 市值: ${financial_data['market_cap']}
-- 营业收入: ${financial_data['revenue']}
-- 净利润: ${financial_data['net_income']}
-- 总资产: ${financial_data['total_assets']}
-- 总负债: ${financial_data['total_liabilities']}
-
-财务比率分析:
-- 资产负债率: {financial_data['debt_ratio']:.2%}
-- 净利润率: {financial_data['profit_margin']:.2%}
-- 资产收益率: {financial_data['roa']:.2%}
-- 股本收益率: {financial_data['roe']:.2%}
-- 市盈率: {financial_data['pe_ratio']:.2f}
-- 市净率: {financial_data['pb_ratio']:.2f}
-
-业务分析:
-{self._get_business_analysis(symbol)}
-
-风险因素:
-{self._get_risk_factors(symbol)}
-
-投资建议:
-{self._get_investment_recommendation(symbol, financial_data)}
-
-技术分析:
-- 52周最高: ${financial_data['52w_high']}
-- 52周最低: ${financial_data['52w_low']}
-- 50日均线: ${financial_data['ma_50']}
-- 200日均线: ${financial_data['ma_200']}
-- 相对强弱指数(RSI): {financial_data['rsi']:.2f}
-
-市场表现:
-- 年初至今收益率: {financial_data['ytd_return']:.2%}
-- 过去一年收益率: {financial_data['1y_return']:.2%}
-- 过去三年收益率: {financial_data['3y_return']:.2%}
-
-{'=' * 60}
-        """
+    async def _company_documents(self, symbol: str, digest: str, filepath: Path, content: str,
+                                 formats: List[str], reuse: bool = False) -> List[Tuple[Path, Future]]:
+        """财报的PDF和图表：reuse 为真时（文本报告命中缓存）先复用缓存中的文件，
+        缺少时才在渲染进程池中生成，新生成的文件落盘后加入报告缓存"""
+        if not formats:
+            return []
+        document_digest = canonical_digest({"report": digest, "charts": chart_config()})
+        if reuse and self.report_cache is not None:
+            documents = await asyncio.to_thread(self._reuse_documents, document_digest, filepath, formats)
+            if documents is not None:
+                return documents
+        documents = await self._render_company_documents(symbol, filepath, content, formats)
+        if self.report_cache is not None:
+            for path, written in documents:
+                self.report_cache.store(document_digest, path, written, suffix=path.name[len(filepath.stem):])
+        return documents
         
-        return report
+    def _reuse_documents(self, document_digest: str, filepath: Path,
+                         formats: List[str]) -> Optional[List[Tuple[Path, Future]]]:
+        """把缓存中的PDF/图表链接为本次报告的文件，缺少任一必需文件时返回None"""
+        # 文件后缀 -> 是否必需（没有历史价格时不生成股价走势图）
+        suffixes = {}
+        if "pdf" in formats:
+            suffixes[".pdf"] = True
+        if "png" in formats:
+            suffixes.update({"_price.png": False, "_ratios.png": True})
+        documents = []
+        for suffix, required in suffixes.items():
+            path = self.report_cache.reuse_file(document_digest, filepath.with_name(filepath.stem + suffix), suffix)
+            if path is None:
+                if required:
+                    return None
+                continue
+            done: Future = Future()
+            done.set_result(path)
+            documents.append((path, done))
+        return documents
+        
+    async def _render_company_documents(self, symbol: str, filepath: Path, content: str,
+                                        formats: List[str]) -> List[Tuple[Path, Future]]:
+        """在渲染进程池中生成财报的PDF和图表（股价走势、财务比率）"""
+        if not formats:
+            return []
+        data = self._get_mock_financial_data(symbol)
+        charts: List[Dict[str, Any]] = []
+        series = await self._load_price_history(symbol)
+        if series is not None:
+            charts.append({"kind": "price", "title": f"{symbol} 近一年股价走势",
+                           "close": series.close, "dates": series.index})
+        charts.append({
+            "kind": "ratios",
+            "title": f"{symbol} 财务比率",
+            "ratios": {
+                "资产负债率": data["debt_ratio"],
+                "净利润率": data["profit_margin"],
+                "资产收益率": data["roa"],
+                "股本收益率": data["roe"]
+            }
+        })
+        title = f"{self.companies[symbol]['name']} ({symbol}) 财务报告"
+        return await render_documents(self.render_pool, self.writer, filepath, title, content, charts, formats)
+        
+    @staticmethod
+    def _format_documents(documents: List[Tuple[Path, Future]]) -> str:
+        """附加文件列表（PDF、图表）的说明文本"""
+        if not documents:
+            return ""
+        return "\n附加文件:\n" + "\n".join(f"- {path}" for path, _ in documents)
+        
+    def _create_company_report(self, symbol: str, company_info: Dict[str, str], 
+                              report_type: str, period: str,
+                              technical_data: Optional[Dict[str, float]] = None) -> str:
+        """创建公司财报内容，只重新生成依赖数据发生变化的分段"""
+        # 模拟财务数据（实际应用中可以从API获取），技术指标优先使用历史K线计算的结果
+        financial_data = self._get_mock_financial_data(symbol)
+        financial_data.update(technical_data or {})
+        
+        content, rendered = self.company_report.render(
+            {
+                "symbol": symbol,
+                "company": company_info,
+                "report_type": report_type,
+                "period": period,
+                "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                "data": financial_data
+            },
+            producers={
+                "business": lambda: {"business_analysis": self._get_business_analysis(symbol)},
+                "risks": lambda: {"risk_factors": self._get_risk_factors(symbol)},
+                "recommendation": lambda: {
+                    "recommendation": self._get_investment_recommendation(symbol, financial_data)
+                }
+            }
+        )
+        self.logger.debug(f"{symbol} 财报重新生成的分段: {', '.join(rendered)}")
+        return content
         
     def _get_mock_financial_data(self, symbol: str) -> Dict[str, Any]:
         """获取模拟财务数据"""
@@ -461,14 +754,4 @@ Apple是全球领先的消费电子和软件服务公司。
             recommendation = "谨慎"
             reason = "估值较高，风险较大，建议谨慎投资"
             
-        return f"""
-投资建议: {recommendation}
-
-理由: {reason}
-
-风险提示:
-- 本报告仅供参考，不构成投资建议
-- 投资有风险，入市需谨慎
-- 请根据自身情况做出投资决策
-- 建议咨询专业投资顾问
-        """
+        return self.templates.render("company_recommendation.txt", recommendation=recommendation, reason=reason)
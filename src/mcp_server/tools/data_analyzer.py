@@ -4,9 +4,12 @@
 提供财务数据分析的MCP工具。
 """
 
+import asyncio
 import json
 import logging
-from typing import Any, Dict, List
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
 
 import numpy as np
 from mcp.types import (
@@ -18,79 +21,100 @@ from mcp.types import (
     Tool,
 )
 
+try:
+    from ...data.models import PortfolioData, PriceSeries
+    from ...data.serialization import dumps_compact
+except ImportError:
+    # src 目录在 sys.path 上、mcp_server 作为顶层包导入时
+    from data.models import PortfolioData, PriceSeries
+    from data.serialization import dumps_compact
+
+from ..analytics import (
+    DEFAULT_BLOCK_MEMORY_MB,
+    DEFAULT_CONFIDENCE_LEVEL,
+    DEFAULT_CONFIDENCE_LEVELS,
+    DEFAULT_DTYPE,
+    DEFAULT_RESAMPLES,
+    DEFAULT_WINDOWS,
+    PERIODS_PER_YEAR,
+    VAR_METHODS,
+    StreamingStatsStore,
+    align_on_dates,
+    batch_metrics,
+    bootstrap_risk_metrics,
+    drop_missing,
+    ensure_contiguous,
+    historical_var,
+    max_drawdown,
+    nan_mean,
+    nan_std,
+    normalize_weights,
+    optimize_portfolio,
+    pad_series,
+    parametric_var,
+    plan_blocks,
+    resolve_dtype,
+    risk_attribution,
+    rolling_metrics,
+    simple_returns,
+    simple_returns_matrix,
+    simulate_block,
+    simulation_inputs,
+    to_array,
+    valid_count,
+    var_from_samples,
+)
+from ..config import get_config_section
+from ..process_pool import ComputePool, get_compute_pool
+from ..series_store import SeriesStore, get_series_store
+from ..tool_specs import DATA_ANALYZER_TOOLS
+
+# 蒙特卡洛模拟默认参数
+DEFAULT_MC_PATHS = 100000
+DEFAULT_MC_MAX_PATHS = 10000000
+
 
 class DataAnalyzerTool:
     """数据分析工具"""
     
-    def __init__(self):
+    def __init__(self, series_store: Optional[SeriesStore] = None,
+                 compute_pool: Optional[ComputePool] = None):
         self.logger = logging.getLogger(__name__)
+        # get_stock_price 登记的服务端价格序列，按 series_id / symbol 读取
+        self.series_store = series_store or get_series_store()
+        # 蒙特卡洛模拟等CPU密集计算在子进程中执行
+        self.compute_pool = compute_pool or get_compute_pool()
+        monte_carlo_config = get_config_section("analysis", "monte_carlo")
+        self.mc_block_bytes = int(float(monte_carlo_config.get("block_memory_mb", DEFAULT_BLOCK_MEMORY_MB)) * 1024 * 1024)
+        self.mc_max_paths = int(monte_carlo_config.get("max_paths", DEFAULT_MC_MAX_PATHS))
+        self.bootstrap_config = get_config_section("analysis", "bootstrap")
+        # 单序列和批量指标的默认计算精度
+        self.dtype = resolve_dtype(get_config_section("analysis", "numerics").get("dtype", DEFAULT_DTYPE)).name
+        # 实时序列的增量统计状态，按序列ID保存
+        self.stream_stats = StreamingStatsStore()
         
     async def list_tools(self, request: ListToolsRequest) -> ListToolsResult:
         """列出可用的数据分析工具"""
-        tools = [
-            Tool(
-                name="calculate_returns",
-                description="计算投资收益率",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "prices": {
-                            "type": "array",
-                            "items": {"type": "number"},
-                            "description": "价格序列"
-                        },
-                        "period": {
-                            "type": "string",
-                            "description": "计算周期：daily, weekly, monthly",
-                            "default": "daily"
-                        }
-                    },
-                    "required": ["prices"]
-                }
-            ),
-            Tool(
-                name="calculate_volatility",
-                description="计算波动率",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "returns": {
-                            "type": "array",
-                            "items": {"type": "number"},
-                            "description": "收益率序列"
-                        },
-                        "period": {
-                            "type": "string",
-                            "description": "年化周期：daily, weekly, monthly",
-                            "default": "daily"
-                        }
-                    },
-                    "required": ["returns"]
-                }
-            ),
-            Tool(
-                name="calculate_sharpe_ratio",
-                description="计算夏普比率",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "returns": {
-                            "type": "array",
-                            "items": {"type": "number"},
-                            "description": "收益率序列"
-                        },
-                        "risk_free_rate": {
-                            "type": "number",
-                            "description": "无风险利率",
-                            "default": 0.02
-                        }
-                    },
-                    "required": ["returns"]
-                }
-            )
-        ]
+        return ListToolsResult(tools=self.get_tools())
+        
+    def get_tools(self) -> List[Tool]:
+        """获取数据分析工具定义"""
+        return list(DATA_ANALYZER_TOOLS)
         
-        return ListToolsResult(tools=tools)
+    def get_tool_handlers(self) -> Dict[str, Callable[[Dict[str, Any]], Awaitable[CallToolResult]]]:
+        """获取工具名到处理函数的映射"""
+        return {
+            "calculate_returns": self._calculate_returns,
+            "calculate_volatility": self._calculate_volatility,
+            "calculate_sharpe_ratio": self._calculate_sharpe_ratio,
+            "calculate_batch_metrics": self._calculate_batch_metrics,
+            "calculate_rolling_metrics": self._calculate_rolling_metrics,
+            "calculate_risk_attribution": self._calculate_risk_attribution,
+            "optimize_portfolio": self._optimize_portfolio,
+            "calculate_var": self._calculate_var,
+            "update_series_stats": self._update_series_stats,
+            "get_series_stats": self._get_series_stats
+        }
         
     async def call_tool(self, request: CallToolRequest) -> CallToolResult:
         """调用数据分析工具"""
@@ -99,14 +123,10 @@ class DataAnalyzerTool:
             name = request.params.name
             arguments = request.params.arguments or {}
             
-            if name == "calculate_returns":
-                return await self._calculate_returns(arguments)
-            elif name == "calculate_volatility":
-                return await self._calculate_volatility(arguments)
-            elif name == "calculate_sharpe_ratio":
-                return await self._calculate_sharpe_ratio(arguments)
-            else:
+            handler = self.get_tool_handlers().get(name)
+            if handler is None:
                 raise ValueError(f"未知的工具: {name}")
+            return await handler(arguments)
                 
         except Exception as e:
             self.logger.error(f"数据分析失败: {e}")
@@ -121,91 +141,588 @@ class DataAnalyzerTool:
             
     async def _calculate_returns(self, arguments: Dict[str, Any]) -> CallToolResult:
         """计算投资收益率"""
-        prices = arguments.get("prices", [])
+        prices = self.series_store.resolve(arguments)
+        if prices is None:
+            prices = arguments.get("prices", [])
+        result = self.analyze_returns(prices, arguments.get("period", "daily"), arguments.get("dtype"))
+        
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=f"收益率分析结果:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                )
+            ]
+        )
+        
+    async def _calculate_volatility(self, arguments: Dict[str, Any]) -> CallToolResult:
+        """计算波动率"""
+        returns = self.series_store.resolve(arguments)
+        if returns is None:
+            returns = arguments.get("returns", [])
         period = arguments.get("period", "daily")
+        result = self.analyze_volatility(returns, period, arguments.get("dtype"))
+        if arguments.get("confidence_interval"):
+            periods = PERIODS_PER_YEAR.get(period, 252)
+            interval = self._bootstrap_interval(returns, arguments, periods_per_year=periods)
+            result["confidence_interval"] = self._format_interval(
+                interval, "volatility", {"volatility_pct": 100, "annualized_volatility_pct": 100 * np.sqrt(periods)}
+            )
         
-        if len(prices) < 2:
-            raise ValueError("价格序列至少需要2个数据点")
-            
-        # 计算收益率
-        prices_array = np.array(prices)
-        returns = np.diff(prices_array) / prices_array[:-1]
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=f"波动率分析结果:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                )
+            ]
+        )
         
-        # 计算统计指标
-        total_return = (prices_array[-1] / prices_array[0] - 1) * 100
-        avg_return = np.mean(returns) * 100
-        max_return = np.max(returns) * 100
-        min_return = np.min(returns) * 100
+    async def _calculate_sharpe_ratio(self, arguments: Dict[str, Any]) -> CallToolResult:
+        """计算夏普比率"""
+        returns = self.series_store.resolve(arguments)
+        if returns is None:
+            returns = arguments.get("returns", [])
+        risk_free_rate = arguments.get("risk_free_rate", 0.02)
+        result = self.analyze_sharpe_ratio(returns, risk_free_rate, arguments.get("dtype"))
+        if arguments.get("confidence_interval"):
+            interval = self._bootstrap_interval(returns, arguments, risk_free_rate=risk_free_rate)
+            result["confidence_interval"] = self._format_interval(
+                interval, "sharpe_ratio", {"sharpe_ratio": 1, "annualized_sharpe_ratio": np.sqrt(252)}, digits=3
+            )
         
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=f"夏普比率分析结果:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                )
+            ]
+        )
+        
+    async def _calculate_batch_metrics(self, arguments: Dict[str, Any]) -> CallToolResult:
+        """批量计算收益率、波动率和夏普比率"""
+        symbols, rows, series_type, _ = self._resolve_series_batch(arguments)
+        period = arguments.get("period", "daily")
+        
+        metrics = batch_metrics(
+            pad_series(rows, dtype=arguments.get("dtype") or self.dtype),
+            series_type=series_type,
+            period=period,
+            risk_free_rate=arguments.get("risk_free_rate", 0.02)
+        )
+        
+        table = {"symbol": symbols}
+        for name, values in metrics.items():
+            table[name] = values if name == "data_points" else np.round(values, 4)
+            
         result = {
+            "series_type": series_type,
             "period": period,
-            "total_return_pct": round(total_return, 2),
-            "avg_return_pct": round(avg_return, 2),
-            "max_return_pct": round(max_return, 2),
-            "min_return_pct": round(min_return, 2),
-            "return_count": len(returns)
+            "count": len(symbols),
+            "table": table
         }
         
         return CallToolResult(
             content=[
                 TextContent(
                     type="text",
-                    text=f"收益率分析结果:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                    text=f"批量指标分析结果:\n{dumps_compact(result).decode('utf-8')}"
                 )
             ]
         )
         
-    async def _calculate_volatility(self, arguments: Dict[str, Any]) -> CallToolResult:
-        """计算波动率"""
-        returns = arguments.get("returns", [])
+    async def _calculate_rolling_metrics(self, arguments: Dict[str, Any]) -> CallToolResult:
+        """计算滚动窗口风险指标"""
+        symbols, rows, series_type, indexes = self._resolve_series_batch(arguments)
+        windows = arguments.get("windows") or list(DEFAULT_WINDOWS)
         period = arguments.get("period", "daily")
+        tail = arguments.get("tail")
         
-        if len(returns) < 2:
-            raise ValueError("收益率序列至少需要2个数据点")
+        _, matrix = self._aligned_matrix(rows, indexes, arguments.get("dtype") or self.dtype)
+        if series_type == "prices":
+            matrix = simple_returns_matrix(matrix)
+        elif series_type != "returns":
+            raise ValueError(f"不支持的序列类型: {series_type}")
             
-        returns_array = np.array(returns)
+        rolling = rolling_metrics(
+            matrix,
+            windows=windows,
+            period=period,
+            risk_free_rate=arguments.get("risk_free_rate", 0.02)
+        )
         
-        # 计算波动率
-        volatility = np.std(returns_array)
+        start = 0 if not tail else max(matrix.shape[1] - int(tail), 0)
+        metrics = {
+            str(window): {
+                "mean_return_pct": np.round(values["mean_return"][:, start:] * 100, 4),
+                "annualized_volatility_pct": np.round(values["volatility"][:, start:] * 100, 4),
+                "annualized_sharpe_ratio": np.round(values["sharpe"][:, start:], 4)
+            }
+            for window, values in rolling.items()
+        }
         
-        # 年化波动率
-        period_multipliers = {
-            "daily": np.sqrt(252),
-            "weekly": np.sqrt(52),
-            "monthly": np.sqrt(12)
+        result = {
+            "symbols": symbols,
+            "period": period,
+            "windows": [int(window) for window in windows],
+            "length": matrix.shape[1],
+            "start_offset": start,
+            "metrics": metrics
         }
         
-        annualized_volatility = volatility * period_multipliers.get(period, np.sqrt(252))
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=f"滚动指标分析结果:\n{dumps_compact(result).decode('utf-8')}"
+                )
+            ]
+        )
+        
+    async def _calculate_risk_attribution(self, arguments: Dict[str, Any]) -> CallToolResult:
+        """批量计算最大回撤以及相对基准的贝塔、阿尔法和信息比率"""
+        symbols, rows, series_type, indexes = self._resolve_series_batch(arguments)
+        benchmark_index = None
+        if arguments.get("benchmark_id"):
+            stored = self.series_store.get(arguments["benchmark_id"])
+            benchmark, benchmark_index = stored.close, stored.index
+            if series_type != "prices":
+                raise ValueError("使用 benchmark_id 时资产序列也必须是价格序列")
+        else:
+            benchmark = arguments.get("benchmark")
+        if benchmark is None or len(benchmark) == 0:
+            raise ValueError("benchmark 不能为空")
+        period = arguments.get("period", "daily")
+        
+        # 资产和基准一起对齐，最后一行为基准
+        if indexes is not None and benchmark_index is not None:
+            indexes = list(indexes) + [benchmark_index]
+        else:
+            indexes = None
+        dates, matrix = self._aligned_matrix(list(rows) + [benchmark], indexes,
+                                            arguments.get("dtype") or self.dtype)
+        drawdown = max_drawdown(matrix[:-1], series_type)
+        # 回撤位置换算为各序列自身的下标
+        drawdown_dates = {}
+        for key in ("peak_index", "trough_index"):
+            positions = drawdown[key]
+            if dates is None:
+                offsets = matrix.shape[1] - np.array([len(row) for row in rows])
+                drawdown[key] = np.where(positions >= 0, positions - offsets, -1)
+            else:
+                found = positions >= 0
+                points = dates[np.where(found, positions, 0)]
+                drawdown[key] = np.array([
+                    int(np.searchsorted(index, point)) if ok else -1
+                    for index, point, ok in zip(indexes, points, found)
+                ])
+                drawdown_dates[key] = [
+                    str(np.datetime_as_string(point, unit="D")) if ok else None
+                    for point, ok in zip(points, found)
+                ]
+        if series_type == "prices":
+            matrix = simple_returns_matrix(matrix)
+                
+        attribution = risk_attribution(
+            matrix[:-1],
+            matrix[-1],
+            period=period,
+            risk_free_rate=arguments.get("risk_free_rate", 0.02)
+        )
+        
+        table = {
+            "symbol": symbols,
+            "data_points": attribution["data_points"],
+            "max_drawdown_pct": np.round(drawdown["max_drawdown"] * 100, 4),
+            "drawdown_peak_index": drawdown["peak_index"],
+            "drawdown_trough_index": drawdown["trough_index"],
+            "beta": np.round(attribution["beta"], 4),
+            "alpha_pct": np.round(attribution["alpha"] * 100, 4),
+            "annualized_alpha_pct": np.round(attribution["annualized_alpha"] * 100, 4),
+            "r_squared": np.round(attribution["r_squared"], 4),
+            "annualized_tracking_error_pct": np.round(attribution["annualized_tracking_error"] * 100, 4),
+            "information_ratio": np.round(attribution["information_ratio"], 4),
+            "annualized_information_ratio": np.round(attribution["annualized_information_ratio"], 4)
+        }
+        if drawdown_dates:
+            table["drawdown_peak_date"] = drawdown_dates["peak_index"]
+            table["drawdown_trough_date"] = drawdown_dates["trough_index"]
         
         result = {
+            "series_type": series_type,
             "period": period,
-            "volatility": round(volatility * 100, 2),
-            "annualized_volatility_pct": round(annualized_volatility * 100, 2),
-            "data_points": len(returns)
+            "count": len(symbols),
+            "table": table
         }
         
         return CallToolResult(
             content=[
                 TextContent(
                     type="text",
-                    text=f"波动率分析结果:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                    text=f"风险归因分析结果:\n{dumps_compact(result).decode('utf-8')}"
                 )
             ]
         )
         
-    async def _calculate_sharpe_ratio(self, arguments: Dict[str, Any]) -> CallToolResult:
-        """计算夏普比率"""
-        returns = arguments.get("returns", [])
-        risk_free_rate = arguments.get("risk_free_rate", 0.02)
+    async def _optimize_portfolio(self, arguments: Dict[str, Any]) -> CallToolResult:
+        """协方差估计与均值-方差组合优化"""
+        symbols, rows, series_type, indexes = self._resolve_series_batch(arguments)
+        objective = arguments.get("objective", "max_sharpe")
+        method = arguments.get("covariance", "ledoit_wolf")
+        total_value = float(arguments.get("total_value", 100000))
+        
+        _, matrix = self._aligned_matrix(rows, indexes, arguments.get("dtype") or self.dtype)
+        if series_type == "prices":
+            matrix = simple_returns_matrix(matrix)
+        elif series_type != "returns":
+            raise ValueError(f"不支持的序列类型: {series_type}")
+            
+        optimized = optimize_portfolio(
+            matrix,
+            objective=objective,
+            period=arguments.get("period", "daily"),
+            risk_free_rate=arguments.get("risk_free_rate", 0.02),
+            method=method,
+            shrinkage=arguments.get("shrinkage"),
+            long_only=arguments.get("long_only", True),
+            frontier_points=int(arguments.get("frontier_points", 0) or 0)
+        )
+        
+        now = datetime.now()
+        portfolio = PortfolioData(
+            name=arguments.get("name", "优化组合"),
+            symbols=list(symbols),
+            weights=np.round(optimized["weights"], 6).tolist(),
+            total_value=total_value,
+            created_date=now,
+            last_updated=now
+        )
+        
+        result = {
+            "objective": objective,
+            "covariance": method,
+            "shrinkage": round(optimized["shrinkage"], 4),
+            "data_points": optimized["data_points"],
+            "expected_return_pct": round(optimized["expected_return"] * 100, 4),
+            "volatility_pct": round(optimized["volatility"] * 100, 4),
+            "sharpe_ratio": round(optimized["sharpe_ratio"], 4),
+            "portfolio": portfolio.to_dict()
+        }
+        if "frontier" in optimized:
+            frontier = optimized["frontier"]
+            result["frontier"] = {
+                "expected_return_pct": np.round(frontier["expected_return"] * 100, 4),
+                "volatility_pct": np.round(frontier["volatility"] * 100, 4),
+                "weights": np.round(frontier["weights"], 6)
+            }
+            
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=f"组合优化结果:\n{dumps_compact(result).decode('utf-8')}"
+                )
+            ]
+        )
+        
+    async def _calculate_var(self, arguments: Dict[str, Any]) -> CallToolResult:
+        """计算组合的 VaR / CVaR"""
+        symbols, rows, series_type, indexes = self._resolve_series_batch(arguments)
+        methods = arguments.get("methods") or list(VAR_METHODS)
+        levels = arguments.get("confidence_levels") or list(DEFAULT_CONFIDENCE_LEVELS)
+        horizon = int(arguments.get("horizon", 1))
+        portfolio_value = arguments.get("portfolio_value")
+        
+        unknown = [method for method in methods if method not in VAR_METHODS]
+        if unknown:
+            raise ValueError(f"不支持的VaR计算方法: {', '.join(unknown)}")
+            
+        _, matrix = self._aligned_matrix(rows, indexes, arguments.get("dtype") or self.dtype)
+        if series_type == "prices":
+            matrix = simple_returns_matrix(matrix)
+        elif series_type != "returns":
+            raise ValueError(f"不支持的序列类型: {series_type}")
+        # 只使用所有资产都有数据的时间点
+        matrix = matrix[:, ~np.isnan(matrix).any(axis=0)]
+        weights = normalize_weights(arguments.get("weights"), len(symbols))
+        returns = weights @ matrix
         
-        if len(returns) < 2:
-            raise ValueError("收益率序列至少需要2个数据点")
+        estimates = {}
+        metadata: Dict[str, Any] = {}
+        if "historical" in methods:
+            estimates["historical"] = historical_var(returns, levels, horizon)
+        if "parametric" in methods:
+            estimates["parametric"] = parametric_var(returns, levels, horizon)
+        if "monte_carlo" in methods:
+            estimates["monte_carlo"], metadata = await self._monte_carlo_var(
+                matrix, weights, levels, horizon,
+                int(arguments.get("paths", DEFAULT_MC_PATHS)), arguments.get("seed")
+            )
+            
+        for values in estimates.values():
+            for level, estimate in values.items():
+                var, cvar = estimate.pop("var"), estimate.pop("cvar")
+                estimate["var_pct"] = round(var * 100, 4)
+                estimate["cvar_pct"] = round(cvar * 100, 4)
+                if portfolio_value is not None:
+                    estimate["var_amount"] = round(var * float(portfolio_value), 2)
+                    estimate["cvar_amount"] = round(cvar * float(portfolio_value), 2)
+                    
+        result = {
+            "symbols": symbols,
+            "weights": np.round(weights, 6).tolist(),
+            "horizon": horizon,
+            "data_points": len(returns),
+            "estimates": estimates
+        }
+        if metadata:
+            result["monte_carlo_metadata"] = metadata
             
-        returns_array = np.array(returns)
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=f"风险价值分析结果:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                )
+            ]
+        )
+        
+    async def _monte_carlo_var(self, returns: np.ndarray, weights: np.ndarray, levels: List[float],
+                               horizon: int, paths: int, seed: Optional[int]):
+        """分块并行的蒙特卡洛 VaR，返回 (估计结果, 元数据)"""
+        if paths > self.mc_max_paths:
+            raise ValueError(f"模拟路径数不能超过 {self.mc_max_paths}")
+        mean, factor = simulation_inputs(returns)
+        workers = self.compute_pool.max_workers
+        sizes = plan_blocks(paths, len(mean), horizon, self.mc_block_bytes, min_blocks=workers)
+        # 每个块使用由同一种子派生的独立随机流，结果与块的执行位置无关
+        seed_sequence = np.random.SeedSequence(seed)
+        block_seeds = seed_sequence.spawn(len(sizes))
+        
+        # 子进程启动单独计时，不计入模拟速度
+        started = time.perf_counter()
+        await self.compute_pool.start()
+        startup = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        blocks = await asyncio.gather(*(
+            self.compute_pool.run(simulate_block, mean, factor, weights, horizon, size, block_seed)
+            for size, block_seed in zip(sizes, block_seeds)
+        ))
+        elapsed = time.perf_counter() - started
         
-        # 计算平均收益率和波动率
-        avg_return = np.mean(returns_array)
-        volatility = np.std(returns_array)
+        metadata = {
+            "paths": paths,
+            "blocks": len(sizes),
+            "paths_per_block": sizes[0],
+            "workers": min(workers, len(sizes)),
+            "seed": seed_sequence.entropy,
+            "startup_seconds": round(startup, 4),
+            "elapsed_seconds": round(elapsed, 4),
+            "paths_per_second": round(paths / elapsed) if elapsed > 0 else None
+        }
+        return var_from_samples(np.concatenate(blocks), levels), metadata
+        
+    async def _update_series_stats(self, arguments: Dict[str, Any]) -> CallToolResult:
+        """追加数据到增量统计状态"""
+        series_id = arguments.get("series_id")
+        if not series_id:
+            raise ValueError("series_id 不能为空")
+            
+        state = self.stream_stats.update(
+            series_id,
+            arguments.get("values", []),
+            series_type=arguments.get("series_type"),
+            reset=arguments.get("reset", False)
+        )
+        result = {"series_id": series_id}
+        result.update(state.snapshot(arguments.get("period", "daily"), arguments.get("risk_free_rate", 0.02)))
+        
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=f"增量统计更新结果:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                )
+            ]
+        )
+        
+    async def _get_series_stats(self, arguments: Dict[str, Any]) -> CallToolResult:
+        """读取增量统计状态"""
+        series_id = arguments.get("series_id")
+        if not series_id:
+            result = {"series_ids": self.stream_stats.series_ids()}
+        else:
+            state = self.stream_stats.get(series_id)
+            result = {"series_id": series_id}
+            result.update(state.snapshot(arguments.get("period", "daily"), arguments.get("risk_free_rate", 0.02)))
+            if arguments.get("remove", False):
+                self.stream_stats.remove(series_id)
+                
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=f"增量统计结果:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                )
+            ]
+        )
+        
+    def _bootstrap_interval(self, returns: Union[Sequence[float], PriceSeries], arguments: Dict[str, Any],
+                            risk_free_rate: float = 0.02, periods_per_year: int = 252) -> Dict[str, Any]:
+        """按工具参数计算块自助法置信区间，未指定的参数使用 analysis.bootstrap 配置"""
+        returns_array = drop_missing(self._returns_array(returns, arguments.get("dtype")))
+        time_budget = arguments.get("time_budget_seconds", self.bootstrap_config.get("time_budget_seconds"))
+        return bootstrap_risk_metrics(
+            returns_array,
+            resamples=int(arguments.get("resamples", self.bootstrap_config.get("resamples", DEFAULT_RESAMPLES))),
+            block_size=arguments.get("block_size"),
+            confidence_level=float(arguments.get("confidence_level", DEFAULT_CONFIDENCE_LEVEL)),
+            risk_free_rate=risk_free_rate,
+            periods_per_year=periods_per_year,
+            time_budget=float(time_budget) if time_budget else None,
+            seed=arguments.get("seed")
+        )
+        
+    @staticmethod
+    def _format_interval(interval: Dict[str, Any], metric: str, scales: Dict[str, float],
+                         digits: int = 2) -> Dict[str, Any]:
+        """把置信区间按输出字段的单位换算（如百分比、年化）并取整"""
+        bounds = interval.pop(metric)
+        interval.pop("volatility" if metric == "sharpe_ratio" else "sharpe_ratio")
+        interval["elapsed_seconds"] = round(interval["elapsed_seconds"], 4)
+        for field, scale in scales.items():
+            interval[field] = None if bounds is None else {
+                key: round(value * scale, digits) for key, value in bounds.items()
+            }
+        return interval
+        
+    def _resolve_series_batch(self, arguments: Dict[str, Any]):
+        """解析批量序列参数，返回 (名称列表, 序列列表, 序列类型, 各序列的日期或None)
+
+        提供 series_ids 时从服务端读取各序列的收盘价和日期，序列类型固定为 prices；
+        直接传入的 series 没有日期。
+        """
+        series_ids = arguments.get("series_ids")
+        if series_ids:
+            stored = [self.series_store.get(series_id) for series_id in series_ids]
+            names = [series.symbol or series_id for series, series_id in zip(stored, series_ids)]
+            return names, [series.close for series in stored], "prices", [series.index for series in stored]
+        symbols, rows = self._parse_series_batch(arguments.get("series"), arguments.get("symbols"))
+        return symbols, rows, arguments.get("series_type", "prices"), None
+        
+    @staticmethod
+    def _aligned_matrix(rows: Sequence[Sequence[Optional[float]]], indexes: Optional[Sequence[np.ndarray]] = None,
+                        dtype: Optional[str] = None):
+        """多条序列 -> 按时间对齐的 (n, T) 矩阵，返回 (共同日期或None, 矩阵)
+
+        带日期的序列按日期取所有序列都有值的交易日（不同市场的节假日、停牌日不同）；
+        没有日期时只能假定各序列的最后一个值是同一时间点，按末尾对齐，缺失处为NaN。
+        dtype 为矩阵的存储精度（float32 / float64）。
+        """
+        if indexes is not None:
+            dates, matrix = align_on_dates(indexes, rows, dtype=dtype)
+            if matrix.shape[1] < 2:
+                raise ValueError("各序列共同的交易日不足2个")
+            return dates, matrix
+        return None, pad_series(rows, align="end", dtype=dtype)
+        
+    @staticmethod
+    def _parse_series_batch(series: Any, symbols: Optional[List[str]] = None):
+        """解析批量序列参数，返回 (名称列表, 序列列表)"""
+        if isinstance(series, dict):
+            return list(series.keys()), list(series.values())
+        if isinstance(series, list) and series:
+            if not all(isinstance(row, list) for row in series):
+                raise ValueError("series 为数组时必须是二维数组")
+            names = symbols or [str(i) for i in range(len(series))]
+            if len(names) != len(series):
+                raise ValueError("symbols 数量与序列数量不一致")
+            return list(names), series
+        raise ValueError("series 不能为空")
+        
+    def analyze_returns(self, prices: Union[Sequence[Optional[float]], PriceSeries],
+                        period: str = "daily", dtype: Optional[str] = None) -> Dict[str, Any]:
+        """计算收益率统计
+
+        Args:
+            prices: 价格序列（可含 null），或直接传入 PriceSeries（使用收盘价）
+            period: 计算周期
+            dtype: 计算精度 float32 / float64，默认读取配置
+        """
+        prices_array = self._prices_array(prices, dtype)
+        valid_prices = drop_missing(prices_array)
+        
+        if len(valid_prices) < 2:
+            raise ValueError("价格序列至少需要2个有效数据点")
+            
+        # 计算收益率（跳过缺失价格）
+        returns = simple_returns(valid_prices)
+        
+        # 计算统计指标
+        total_return = (float(valid_prices[-1]) / float(valid_prices[0]) - 1) * 100
+        avg_return = nan_mean(returns) * 100
+        max_return = float(returns.max()) * 100
+        min_return = float(returns.min()) * 100
+        
+        result = {
+            "period": period,
+            "total_return_pct": round(total_return, 2),
+            "avg_return_pct": round(avg_return, 2),
+            "max_return_pct": round(max_return, 2),
+            "min_return_pct": round(min_return, 2),
+            "return_count": len(returns)
+        }
+        return self._with_missing(result, prices_array)
+        
+    def analyze_volatility(self, returns: Union[Sequence[Optional[float]], PriceSeries],
+                           period: str = "daily", dtype: Optional[str] = None) -> Dict[str, Any]:
+        """计算波动率
+
+        Args:
+            returns: 收益率序列（可含 null），或 PriceSeries（由收盘价计算收益率）
+            period: 年化周期
+            dtype: 计算精度 float32 / float64，默认读取配置
+        """
+        returns_array = self._returns_array(returns, dtype)
+        count = valid_count(returns_array)
+        
+        if count < 2:
+            raise ValueError("收益率序列至少需要2个有效数据点")
+            
+        # 计算波动率（忽略缺失值）
+        volatility = nan_std(returns_array)
+        
+        # 年化波动率
+        annualized_volatility = volatility * np.sqrt(PERIODS_PER_YEAR.get(period, 252))
+        
+        result = {
+            "period": period,
+            "volatility": round(volatility * 100, 2),
+            "annualized_volatility_pct": round(annualized_volatility * 100, 2),
+            "data_points": count
+        }
+        return self._with_missing(result, returns_array)
+        
+    def analyze_sharpe_ratio(self, returns: Union[Sequence[Optional[float]], PriceSeries],
+                             risk_free_rate: float = 0.02, dtype: Optional[str] = None) -> Dict[str, Any]:
+        """计算夏普比率
+
+        Args:
+            returns: 收益率序列（可含 null），或 PriceSeries（由收盘价计算收益率）
+            risk_free_rate: 年化无风险利率
+            dtype: 计算精度 float32 / float64，默认读取配置
+        """
+        returns_array = self._returns_array(returns, dtype)
+        count = valid_count(returns_array)
+        
+        if count < 2:
+            raise ValueError("收益率序列至少需要2个有效数据点")
+            
+        # 计算平均收益率和波动率（忽略缺失值）
+        avg_return = nan_mean(returns_array)
+        volatility = nan_std(returns_array)
         
         if volatility == 0:
             raise ValueError("波动率不能为零")
@@ -222,14 +739,28 @@ class DataAnalyzerTool:
             "risk_free_rate_pct": round(risk_free_rate * 100, 2),
             "sharpe_ratio": round(sharpe_ratio, 3),
             "annualized_sharpe_ratio": round(annualized_sharpe, 3),
-            "data_points": len(returns)
+            "data_points": count
         }
+        return self._with_missing(result, returns_array)
         
-        return CallToolResult(
-            content=[
-                TextContent(
-                    type="text",
-                    text=f"夏普比率分析结果:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
-                )
-            ]
-        ) 
\ No newline at end of file
+    def _prices_array(self, prices: Union[Sequence[Optional[float]], PriceSeries],
+                      dtype: Optional[str] = None) -> np.ndarray:
+        """价格参数 -> 指定精度的C连续数组，缺失值为NaN"""
+        if isinstance(prices, PriceSeries):
+            return ensure_contiguous(prices.close, dtype or self.dtype)
+        return to_array(prices, dtype or self.dtype)
+        
+    def _returns_array(self, returns: Union[Sequence[Optional[float]], PriceSeries],
+                       dtype: Optional[str] = None) -> np.ndarray:
+        """收益率参数 -> 指定精度的C连续数组，PriceSeries 由收盘价计算（跳过缺失价格）"""
+        if isinstance(returns, PriceSeries):
+            return simple_returns(self._prices_array(returns, dtype))
+        return to_array(returns, dtype or self.dtype)
+        
+    @staticmethod
+    def _with_missing(result: Dict[str, Any], array: np.ndarray) -> Dict[str, Any]:
+        """输入含缺失值时在结果中注明被忽略的个数"""
+        missing = len(array) - valid_count(array)
+        if missing:
+            result["missing_points"] = missing
+        return result
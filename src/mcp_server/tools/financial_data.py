@@ -7,8 +7,9 @@
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from mcp.types import (
@@ -20,82 +21,69 @@ from mcp.types import (
     Tool,
 )
 
+try:
+    from ...data.models import PriceSeries
+    from ...data.serialization import dumps_compact
+except ImportError:
+    # src 目录在 sys.path 上、mcp_server 作为顶层包导入时
+    from data.models import PriceSeries
+    from data.serialization import dumps_compact
+
+from ..analytics import DEFAULT_DTYPE, compute_indicators, latest_values, pad_series
+from ..executor import DataFetchExecutor, get_data_executor
+from ..memory_cache import AsyncTTLCache, get_info_cache
+from ..price_store import PriceStore, get_price_store
+from ..report_cache import get_report_cache
+from ..report_sections import get_section_cache
+from ..series_store import SeriesStore, get_series_store
+from ..single_flight import SingleFlight, get_single_flight
+from ..tool_specs import FINANCIAL_DATA_TOOLS
+
+# 批量获取市场数据时的默认分批大小
+DEFAULT_CHUNK_SIZE = 50
+
+# 支持的财务报表类型（对应yf.Ticker的属性名）
+STATEMENT_TYPES = ("financials", "balance_sheet", "cashflow")
+
 
 class FinancialDataTool:
     """财务数据获取工具"""
     
-    def __init__(self):
+    def __init__(self, executor: Optional[DataFetchExecutor] = None,
+                 price_store: Optional[PriceStore] = None,
+                 info_cache: Optional[AsyncTTLCache] = None,
+                 series_store: Optional[SeriesStore] = None,
+                 single_flight: Optional[SingleFlight] = None):
         self.logger = logging.getLogger(__name__)
+        # yfinance调用是同步阻塞的，统一交给有界线程池执行
+        self.executor = executor or get_data_executor()
+        # 历史价格的本地磁盘缓存，cache.enabled 为 false 时为 None
+        self.price_store = price_store or get_price_store()
+        # 公司信息和财务报表的进程内缓存
+        self.info_cache = info_cache or get_info_cache()
+        # get_stock_price 获取的完整序列登记在服务端，分析工具按句柄读取
+        self.series_store = series_store or get_series_store()
+        # 合并并发的相同上游请求，键为 (工具, 股票代码, 周期, 间隔)；进程内共享，
+        # 报告工具各自创建的数据工具与本工具的相同请求也会合并
+        self.single_flight = single_flight or get_single_flight()
         
     async def list_tools(self, request: ListToolsRequest) -> ListToolsResult:
         """列出可用的财务数据工具"""
-        tools = [
-            Tool(
-                name="get_stock_price",
-                description="获取股票实时价格和历史价格数据",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "symbol": {
-                            "type": "string",
-                            "description": "股票代码，如AAPL、GOOGL"
-                        },
-                        "period": {
-                            "type": "string",
-                            "description": "时间周期：1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max",
-                            "default": "1mo"
-                        },
-                        "interval": {
-                            "type": "string", 
-                            "description": "数据间隔：1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo",
-                            "default": "1d"
-                        }
-                    },
-                    "required": ["symbol"]
-                }
-            ),
-            Tool(
-                name="get_financial_info",
-                description="获取公司财务信息",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "symbol": {
-                            "type": "string",
-                            "description": "股票代码"
-                        },
-                        "info_type": {
-                            "type": "string",
-                            "description": "信息类型：info, financials, balance_sheet, cashflow",
-                            "default": "info"
-                        }
-                    },
-                    "required": ["symbol"]
-                }
-            ),
-            Tool(
-                name="get_market_data",
-                description="获取市场数据",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "symbols": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "股票代码列表"
-                        },
-                        "data_type": {
-                            "type": "string",
-                            "description": "数据类型：price, volume, market_cap",
-                            "default": "price"
-                        }
-                    },
-                    "required": ["symbols"]
-                }
-            )
-        ]
+        return ListToolsResult(tools=self.get_tools())
+        
+    def get_tools(self) -> List[Tool]:
+        """获取财务数据工具定义"""
+        return list(FINANCIAL_DATA_TOOLS)
         
-        return ListToolsResult(tools=tools)
+    def get_tool_handlers(self) -> Dict[str, Callable[[Dict[str, Any]], Awaitable[CallToolResult]]]:
+        """获取工具名到处理函数的映射"""
+        return {
+            "get_stock_price": self._get_stock_price,
+            "get_financial_info": self._get_financial_info,
+            "get_market_data": self._get_market_data,
+            "get_technical_indicators": self._get_technical_indicators,
+            "get_cache_stats": self._get_cache_stats
+        }
         
     async def call_tool(self, request: CallToolRequest) -> CallToolResult:
         """调用财务数据工具"""
@@ -104,14 +92,10 @@ class FinancialDataTool:
             name = request.params.name
             arguments = request.params.arguments or {}
             
-            if name == "get_stock_price":
-                return await self._get_stock_price(arguments)
-            elif name == "get_financial_info":
-                return await self._get_financial_info(arguments)
-            elif name == "get_market_data":
-                return await self._get_market_data(arguments)
-            else:
+            handler = self.get_tool_handlers().get(name)
+            if handler is None:
                 raise ValueError(f"未知的工具: {name}")
+            return await handler(arguments)
                 
         except Exception as e:
             self.logger.error(f"工具调用失败: {e}")
@@ -133,11 +117,10 @@ class FinancialDataTool:
         if not symbol:
             raise ValueError("股票代码不能为空")
             
-        # 使用yfinance获取数据
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period=period, interval=interval)
+        # 使用yfinance获取数据（优先读取本地缓存）
+        series = await self.load_price_series(symbol, period, interval)
         
-        if hist.empty:
+        if len(series) == 0:
             return CallToolResult(
                 content=[
                     TextContent(
@@ -149,16 +132,17 @@ class FinancialDataTool:
             
         # 格式化数据
         data_summary = {
+            "series_id": self.series_store.put(series),
             "symbol": symbol,
             "period": period,
             "interval": interval,
-            "data_points": len(hist),
-            "latest_price": float(hist['Close'].iloc[-1]),
-            "price_change": float(hist['Close'].iloc[-1] - hist['Close'].iloc[0]),
-            "price_change_pct": float((hist['Close'].iloc[-1] / hist['Close'].iloc[0] - 1) * 100),
-            "high": float(hist['High'].max()),
-            "low": float(hist['Low'].min()),
-            "volume": int(hist['Volume'].sum())
+            "data_points": len(series),
+            "latest_price": float(series.close[-1]),
+            "price_change": float(series.close[-1] - series.close[0]),
+            "price_change_pct": float((series.close[-1] / series.close[0] - 1) * 100),
+            "high": float(np.nanmax(series.high)),
+            "low": float(np.nanmin(series.low)),
+            "volume": int(np.nansum(series.volume))
         }
         
         return CallToolResult(
@@ -178,11 +162,9 @@ class FinancialDataTool:
         if not symbol:
             raise ValueError("股票代码不能为空")
             
-        ticker = yf.Ticker(symbol)
-        
         try:
             if info_type == "info":
-                info = ticker.info
+                info = await self._get_info(symbol)
                 # 提取关键信息
                 key_info = {
                     "公司名称": info.get("longName", "N/A"),
@@ -203,6 +185,21 @@ class FinancialDataTool:
                         )
                     ]
                 )
+            elif info_type in STATEMENT_TYPES:
+                statement = await self._get_statement(symbol, info_type)
+                if statement is None or statement.empty:
+                    text = f"未找到股票 {symbol} 的 {info_type} 数据"
+                else:
+                    text = f"{info_type}:\n{json.dumps(self._statement_to_dict(statement), indent=2, ensure_ascii=False)}"
+                    
+                return CallToolResult(
+                    content=[
+                        TextContent(
+                            type="text",
+                            text=text
+                        )
+                    ]
+                )
             else:
                 return CallToolResult(
                     content=[
@@ -231,13 +228,23 @@ class FinancialDataTool:
         if not symbols:
             raise ValueError("股票代码列表不能为空")
             
+        if data_type in ("price", "volume") and arguments.get("batch", True):
+            chunk_size = int(arguments.get("chunk_size", DEFAULT_CHUNK_SIZE))
+            return await self._get_market_data_batched(symbols, data_type, chunk_size)
+            
         results = []
         
-        for symbol in symbols:
+        # 各股票的info请求并发执行
+        infos = await asyncio.gather(
+            *(self._get_info(symbol) for symbol in symbols),
+            return_exceptions=True
+        )
+        
+        for symbol, info in zip(symbols, infos):
             try:
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
-                
+                if isinstance(info, Exception):
+                    raise info
+                    
                 if data_type == "price":
                     current_price = info.get("currentPrice", "N/A")
                     results.append({
@@ -270,4 +277,241 @@ class FinancialDataTool:
                     text=f"市场数据:\n{json.dumps(results, indent=2, ensure_ascii=False)}"
                 )
             ]
-        ) 
\ No newline at end of file
+        )
+        
+    async def _get_market_data_batched(self, symbols: List[str], data_type: str,
+                                       chunk_size: int) -> CallToolResult:
+        """批量获取价格/成交量数据
+
+        按 chunk_size 分批调用 yf.download 一次性下载多只股票，各批并发执行，
+        结果以列式结构返回，获取失败的股票单独列在 errors 中。
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须大于0")
+            
+        chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+        chunk_results = await asyncio.gather(
+            *(self._download_chunk_shared(chunk) for chunk in chunks)
+        )
+        
+        value_key = "current_price" if data_type == "price" else "volume"
+        columns: Dict[str, List[Any]] = {"symbol": [], value_key: []}
+        errors = []
+        
+        for chunk_result in chunk_results:
+            for symbol, row in chunk_result.items():
+                if "error" in row:
+                    errors.append({"symbol": symbol, "error": row["error"]})
+                else:
+                    columns["symbol"].append(symbol)
+                    columns[value_key].append(row[value_key])
+                    
+        result = {
+            "data_type": data_type,
+            "count": len(columns["symbol"]),
+            "columns": columns,
+            "errors": errors
+        }
+        
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=f"市场数据:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                )
+            ]
+        )
+        
+    async def load_price_series(self, symbol: str, period: str = "1mo", interval: str = "1d") -> PriceSeries:
+        """获取历史价格序列（优先读取本地缓存，合并相同的并发请求）"""
+        return await self.single_flight.do(
+            ("price_series", symbol.upper(), period, interval),
+            lambda: self.executor.run(self._load_series, symbol, period, interval)
+        )
+        
+    def _load_series(self, symbol: str, period: str, interval: str) -> PriceSeries:
+        """获取历史价格并转换为列式序列（阻塞调用，在执行器线程中运行）"""
+        return PriceSeries.from_dataframe(symbol, self._load_history(symbol, period, interval))
+        
+    def _load_history(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        """获取历史价格（阻塞调用，在执行器线程中运行）
+
+        启用缓存时由价格缓存决定是否请求上游以及请求的起始时间。
+        """
+        if self.price_store is None:
+            return self._fetch_history(symbol, period=period, interval=interval)
+            
+        def fetch(**kwargs) -> pd.DataFrame:
+            return self._fetch_history(symbol, interval=interval, **kwargs)
+            
+        return self.price_store.get_history(symbol, period, interval, fetch)
+        
+    @staticmethod
+    def _fetch_history(symbol: str, interval: str, period: Optional[str] = None,
+                       start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """从yfinance获取历史价格"""
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            return ticker.history(start=start, interval=interval)
+        return ticker.history(period=period, interval=interval)
+        
+    async def _get_technical_indicators(self, arguments: Dict[str, Any]) -> CallToolResult:
+        """批量计算技术指标"""
+        symbols = arguments.get("symbols", [])
+        period = arguments.get("period", "1y")
+        interval = arguments.get("interval", "1d")
+        tail = int(arguments.get("tail", 0) or 0)
+        
+        if not symbols:
+            raise ValueError("股票代码列表不能为空")
+            
+        loaded = await asyncio.gather(
+            *(self.load_price_series(symbol, period, interval) for symbol in symbols),
+            return_exceptions=True
+        )
+        
+        names, closes, last_dates, errors = [], [], [], []
+        for symbol, series in zip(symbols, loaded):
+            if isinstance(series, Exception):
+                errors.append({"symbol": symbol, "error": str(series)})
+            elif len(series) == 0:
+                errors.append({"symbol": symbol, "error": "无数据"})
+            else:
+                names.append(symbol)
+                closes.append(series.close)
+                last_dates.append(str(np.datetime_as_string(series.index[-1], unit="D")))
+                
+        result: Dict[str, Any] = {"period": period, "interval": interval, "count": len(names)}
+        if names:
+            # 各股票的最新K线对齐到最后一列；EMA 类指标逐期递推，保持 float64 精度
+            close = pad_series(closes, align="end", dtype=DEFAULT_DTYPE)
+            columns = compute_indicators(close, arguments.get("indicators"), arguments.get("params"))
+            
+            latest = {"symbol": names, "date": last_dates, "close": close[:, -1]}
+            for name, values in latest_values(columns).items():
+                latest[name] = np.round(values, 4)
+            result["latest"] = latest
+            
+            if tail > 0:
+                result["tail"] = {name: np.round(values[:, -tail:], 4) for name, values in columns.items()}
+        if errors:
+            result["errors"] = errors
+            
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=f"技术指标:\n{dumps_compact(result).decode('utf-8')}"
+                )
+            ]
+        )
+        
+    async def _get_cache_stats(self, arguments: Dict[str, Any]) -> CallToolResult:
+        """获取数据缓存统计"""
+        stats = {
+            "info_cache": self.info_cache.stats(),
+            "series_store": self.series_store.stats(),
+            "single_flight": self.single_flight.stats(),
+            "report_cache": get_report_cache().stats(),
+            "report_sections": get_section_cache().stats()
+        }
+        
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=f"缓存统计:\n{json.dumps(stats, indent=2, ensure_ascii=False)}"
+                )
+            ]
+        )
+        
+    async def _get_info(self, symbol: str) -> Dict[str, Any]:
+        """获取公司信息（带缓存）"""
+        return await self.info_cache.get_or_load(
+            ("info", symbol.upper()),
+            lambda: self.single_flight.do(
+                ("get_financial_info", symbol.upper(), "info", None),
+                lambda: self.executor.run(self._fetch_info, symbol)
+            )
+        )
+        
+    async def _get_statement(self, symbol: str, statement_type: str) -> pd.DataFrame:
+        """获取财务报表（带缓存）"""
+        return await self.info_cache.get_or_load(
+            (statement_type, symbol.upper()),
+            lambda: self.single_flight.do(
+                ("get_financial_info", symbol.upper(), statement_type, None),
+                lambda: self.executor.run(self._fetch_statement, symbol, statement_type)
+            )
+        )
+        
+    @staticmethod
+    def _fetch_info(symbol: str) -> Dict[str, Any]:
+        """获取公司信息（阻塞调用，在执行器线程中运行）"""
+        return yf.Ticker(symbol).info
+        
+    @staticmethod
+    def _fetch_statement(symbol: str, statement_type: str) -> pd.DataFrame:
+        """获取财务报表（阻塞调用，在执行器线程中运行）"""
+        return getattr(yf.Ticker(symbol), statement_type)
+        
+    @staticmethod
+    def _statement_to_dict(statement: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """财务报表 -> {报告期: {科目: 数值}}"""
+        result = {}
+        for column in statement.columns:
+            period = column.strftime("%Y-%m-%d") if hasattr(column, "strftime") else str(column)
+            result[period] = {
+                str(item): (None if pd.isna(value) else float(value))
+                for item, value in statement[column].items()
+            }
+        return result
+        
+    async def _download_chunk_shared(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """下载一批股票数据，相同批次的并发请求合并为一次"""
+        return await self.single_flight.do(
+            ("get_market_data", tuple(symbol.upper() for symbol in symbols), "5d", "1d"),
+            lambda: self.executor.run(self._download_chunk, symbols)
+        )
+        
+    def _download_chunk(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """下载一批股票的最新收盘价和成交量"""
+        try:
+            data = yf.download(
+                symbols,
+                period="5d",
+                interval="1d",
+                group_by="column",
+                auto_adjust=False,
+                threads=False,
+                progress=False
+            )
+        except Exception as e:
+            return {symbol: {"error": str(e)} for symbol in symbols}
+            
+        closes = self._price_column(data, "Close", symbols)
+        volumes = self._price_column(data, "Volume", symbols)
+        
+        rows = {}
+        for symbol in symbols:
+            key = symbol.upper()
+            close = closes[key].dropna() if key in closes else pd.Series(dtype=float)
+            if close.empty:
+                rows[symbol] = {"error": f"未找到股票 {symbol} 的数据"}
+                continue
+            volume = volumes[key].loc[close.index[-1]] if key in volumes else None
+            rows[symbol] = {
+                "current_price": float(close.iloc[-1]),
+                "volume": int(volume) if volume is not None and pd.notna(volume) else None
+            }
+        return rows
+        
+    @staticmethod
+    def _price_column(data: pd.DataFrame, field: str, symbols: List[str]) -> pd.DataFrame:
+        """从 yf.download 结果中取出某个字段，统一为以股票代码为列的DataFrame"""
+        if data.empty or field not in data.columns.get_level_values(0):
+            return pd.DataFrame()
+        frame = data[field]
+        if isinstance(frame, pd.Series):
+            frame = frame.to_frame(symbols[0].upper())
+        return frame
@@ -7,7 +7,7 @@ OCR工具
 import logging
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 # 简化的PDF处理，不依赖外部库
 import os
@@ -20,6 +20,8 @@ from mcp.types import (
     Tool,
 )
 
+from ..tool_specs import OCR_TOOLS
+
 
 class OCRTools:
     """OCR工具类"""
@@ -29,40 +31,28 @@ class OCRTools:
         
     async def list_tools(self, request: ListToolsRequest) -> ListToolsResult:
         """列出可用的OCR工具"""
-        tools = [
-            Tool(
-                name="ocr_to_text",
-                description="从PDF文件中提取文本内容（支持OCR）",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "file_path": {
-                            "type": "string",
-                            "description": "PDF文件路径"
-                        },
-                        "use_ocr": {
-                            "type": "boolean",
-                            "description": "是否使用OCR提取文本",
-                            "default": True
-                        }
-                    },
-                    "required": ["file_path"]
-                }
-            )
-        ]
+        return ListToolsResult(tools=self.get_tools())
+        
+    def get_tools(self) -> List[Tool]:
+        """获取OCR工具定义"""
+        return list(OCR_TOOLS)
         
-        return ListToolsResult(tools=tools)
+    def get_tool_handlers(self) -> Dict[str, Callable[[Dict[str, Any]], Awaitable[CallToolResult]]]:
+        """获取工具名到处理函数的映射"""
+        return {
+            "ocr_to_text": self._ocr_to_text
+        }
         
     async def call_tool(self, request: CallToolRequest) -> CallToolResult:
         """调用OCR工具"""
         tool_name = request.params.name
-        arguments = request.params.arguments
+        arguments = request.params.arguments or {}
         
         try:
-            if tool_name == "ocr_to_text":
-                return await self._ocr_to_text(arguments)
-            else:
+            handler = self.get_tool_handlers().get(tool_name)
+            if handler is None:
                 raise ValueError(f"未知的工具: {tool_name}")
+            return await handler(arguments)
                 
         except Exception as e:
             self.logger.error(f"工具调用失败: {e}")
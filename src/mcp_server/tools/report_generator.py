@@ -4,12 +4,14 @@
 提供生成财务报告的MCP工具。
 """
 
+import asyncio
 import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 from mcp.types import (
     CallToolRequest,
     CallToolResult,
@@ -19,6 +21,51 @@ from mcp.types import (
     Tool,
 )
 
+try:
+    from ...data.models import PortfolioData, PriceSeries
+except ImportError:
+    # src 目录在 sys.path 上、mcp_server 作为顶层包导入时
+    from data.models import PortfolioData, PriceSeries
+
+from ..analytics import (
+    align_on_dates,
+    compute_indicators,
+    latest_values,
+    optimize_portfolio,
+    simple_returns_matrix,
+)
+from ..process_pool import get_render_pool
+from ..rendering import render_documents, resolve_formats
+from ..report_templates import get_report_templates
+from ..report_writer import get_report_writer
+from ..tool_specs import REPORT_GENERATOR_TOOLS
+
+# 股票报告列出的技术指标：列名 -> 名称
+STOCK_INDICATOR_LABELS = {
+    "sma_50": "50日均线",
+    "sma_200": "200日均线",
+    "rsi_14": "RSI(14)",
+    "macd": "MACD",
+    "macd_signal": "MACD信号线"
+}
+
+
+def technical_recommendation(price: float, latest: Dict[str, float]) -> Tuple[str, str]:
+    """由最新价格和技术指标给出 (投资建议, 理由)：RSI 超买超卖优先，其次看均线排列"""
+    rsi = latest.get("rsi_14")
+    if rsi is not None and rsi >= 70:
+        return "谨慎", f"RSI为{rsi:.1f}，处于超买区间，短期回调风险较大"
+    if rsi is not None and rsi <= 30:
+        return "买入", f"RSI为{rsi:.1f}，处于超卖区间，存在反弹机会"
+    short, long = latest.get("sma_50"), latest.get("sma_200")
+    if short is None or long is None:
+        return "持有", "历史数据不足200个交易日，无法判断长期趋势"
+    if price > short > long:
+        return "买入", "股价位于50日和200日均线之上，均线呈多头排列"
+    if price < short < long:
+        return "卖出", "股价位于50日和200日均线之下，均线呈空头排列"
+    return "持有", "股价与均线交织，趋势不明朗"
+
 
 class ReportGeneratorTool:
     """报告生成工具"""
@@ -27,47 +74,26 @@ class ReportGeneratorTool:
         self.logger = logging.getLogger(__name__)
         self.output_dir = Path("output")
         self.output_dir.mkdir(exist_ok=True)
+        # 获取历史K线的数据工具，首次使用时创建
+        self._data_tool = None
+        self.templates = get_report_templates()
+        self.writer = get_report_writer()
+        self.render_pool = get_render_pool()
         
     async def list_tools(self, request: ListToolsRequest) -> ListToolsResult:
         """列出可用的报告生成工具"""
-        tools = [
-            Tool(
-                name="generate_stock_report",
-                description="生成股票分析报告",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "symbol": {
-                            "type": "string",
-                            "description": "股票代码"
-                        },
-                        "report_type": {
-                            "type": "string",
-                            "description": "报告类型：basic, detailed",
-                            "default": "basic"
-                        }
-                    },
-                    "required": ["symbol"]
-                }
-            ),
-            Tool(
-                name="generate_portfolio_report",
-                description="生成投资组合报告",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "symbols": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "股票代码列表"
-                        }
-                    },
-                    "required": ["symbols"]
-                }
-            )
-        ]
+        return ListToolsResult(tools=self.get_tools())
+        
+    def get_tools(self) -> List[Tool]:
+        """获取报告生成工具定义"""
+        return list(REPORT_GENERATOR_TOOLS)
         
-        return ListToolsResult(tools=tools)
+    def get_tool_handlers(self) -> Dict[str, Callable[[Dict[str, Any]], Awaitable[CallToolResult]]]:
+        """获取工具名到处理函数的映射"""
+        return {
+            "generate_stock_report": self._generate_stock_report,
+            "generate_portfolio_report": self._generate_portfolio_report
+        }
         
     async def call_tool(self, request: CallToolRequest) -> CallToolResult:
         """调用报告生成工具"""
@@ -76,12 +102,10 @@ class ReportGeneratorTool:
             name = request.params.name
             arguments = request.params.arguments or {}
             
-            if name == "generate_stock_report":
-                return await self._generate_stock_report(arguments)
-            elif name == "generate_portfolio_report":
-                return await self._generate_portfolio_report(arguments)
-            else:
+            handler = self.get_tool_handlers().get(name)
+            if handler is None:
                 raise ValueError(f"未知的工具: {name}")
+            return await handler(arguments)
                 
         except Exception as e:
             self.logger.error(f"报告生成失败: {e}")
@@ -102,41 +126,44 @@ class ReportGeneratorTool:
         if not symbol:
             raise ValueError("股票代码不能为空")
             
-        # 生成示例报告数据
+        # 由近一年日K线计算价格变动和技术指标
+        series = await self._load_price_history(symbol)
+        if series is None or len(series) < 2:
+            raise ValueError(f"无法获取 {symbol} 的历史价格")
+        close = series.close
+        current_price, previous_price = float(close[-1]), float(close[-2])
+        latest = {
+            name: float(value[0])
+            for name, value in latest_values(compute_indicators(
+                close, indicators=["sma", "rsi", "macd"], params={"sma": {"windows": [50, 200]}}
+            )).items()
+            if not np.isnan(value[0])
+        }
+        recommendation, reason = technical_recommendation(current_price, latest)
+        
         report_data = {
             "symbol": symbol,
             "report_type": report_type,
             "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "current_price": 150.25,
-            "price_change": 2.50,
-            "price_change_pct": 1.69,
-            "recommendation": "持有"
+            "as_of": str(series.index[-1].astype("datetime64[D]")),
+            "current_price": round(current_price, 2),
+            "price_change": round(current_price - previous_price, 2),
+            "price_change_pct": round((current_price / previous_price - 1) * 100, 2),
+            "indicators": {
+                label: round(latest[name], 2) for name, label in STOCK_INDICATOR_LABELS.items() if name in latest
+            },
+            "recommendation": recommendation,
+            "reason": reason
         }
         
         # 生成报告内容
-        report_content = f"""
-股票分析报告
-====================
-
-股票代码: {report_data['symbol']}
-报告类型: {report_data['report_type']}
-生成时间: {report_data['generated_at']}
-
-价格信息:
-- 当前价格: ${report_data['current_price']}
-- 价格变动: ${report_data['price_change']} ({report_data['price_change_pct']}%)
-
-投资建议: {report_data['recommendation']}
-
-====================
-        """
+        report_content = self.templates.render("stock_report.txt", **report_data)
         
         # 保存报告文件
         filename = f"stock_report_{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         report_path = self.output_dir / filename
         
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(report_content)
+        await self.writer.write(report_path, report_content)
             
         return CallToolResult(
             content=[
@@ -150,48 +177,133 @@ class ReportGeneratorTool:
     async def _generate_portfolio_report(self, arguments: Dict[str, Any]) -> CallToolResult:
         """生成投资组合报告"""
         symbols = arguments.get("symbols", [])
+        objective = arguments.get("objective", "max_sharpe")
+        total_value = float(arguments.get("total_value", 100000))
+        formats = resolve_formats(arguments.get("formats"))
         
         if not symbols:
             raise ValueError("股票代码列表不能为空")
             
-        # 生成投资组合数据
-        portfolio_data = {
-            "symbols": symbols,
-            "total_value": 100000,
-            "daily_return": 0.85,
-            "total_return": 12.5
-        }
+        # 由历史价格优化权重并计算组合表现
+        portfolio, performance, skipped, growth = await self._build_portfolio(
+            symbols, objective, arguments.get("period", "1y"), total_value
+        )
+        portfolio_data = portfolio.to_dict()
         
         # 生成报告内容
-        report_content = f"""
-投资组合报告
-====================
-
-生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-投资组合:
-{chr(10).join([f"- {symbol}" for symbol in portfolio_data['symbols']])}
-
-绩效摘要:
-- 总价值: ${portfolio_data['total_value']}
-- 日收益率: {portfolio_data['daily_return']}%
-- 总收益率: {portfolio_data['total_return']}%
-
-====================
-        """
+        report_content = self.templates.render(
+            "portfolio_report.txt",
+            generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            objective=objective,
+            holdings=[
+                {"symbol": symbol, "weight": weight, "value": weight * portfolio.total_value}
+                for symbol, weight in zip(portfolio.symbols, portfolio.weights)
+            ],
+            skipped=skipped,
+            total_value=portfolio_data['total_value'],
+            performance=performance
+        )
         
         # 保存报告文件
         filename = f"portfolio_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         report_path = self.output_dir / filename
         
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(report_content)
+        await self.writer.write(report_path, report_content)
+        
+        # PDF和图表（权重、净值曲线）在渲染进程池中生成
+        documents = await render_documents(
+            self.render_pool, self.writer, report_path, "投资组合报告", report_content,
+            [
+                {"kind": "weights", "title": "组合权重", "symbols": portfolio.symbols, "weights": portfolio.weights},
+                {"kind": "growth", "title": "组合净值（期初为1）", "growth": growth}
+            ],
+            formats
+        )
+        files = "".join(f"\n- {path}" for path, _ in documents)
             
         return CallToolResult(
             content=[
                 TextContent(
                     type="text",
                     text=f"投资组合报告已生成:\n\n{report_content}\n\n报告文件已保存到: {report_path}"
+                         + (f"\n附加文件:{files}" if files else "")
                 )
             ]
-        ) 
\ No newline at end of file
+        )
+        
+    def _get_data_tool(self):
+        """获取历史K线的数据工具，首次使用时创建"""
+        if self._data_tool is None:
+            from .financial_data import FinancialDataTool
+            self._data_tool = FinancialDataTool()
+        return self._data_tool
+        
+    async def _load_price_history(self, symbol: str) -> Optional[PriceSeries]:
+        """获取近一年日K线，失败或没有数据时返回None"""
+        try:
+            series = await self._get_data_tool().load_price_series(symbol, period="1y", interval="1d")
+        except Exception as e:
+            self.logger.warning(f"获取 {symbol} 历史价格失败: {e}")
+            return None
+        return series if len(series) > 0 else None
+        
+    async def _build_portfolio(self, symbols: List[str], objective: str, period: str,
+                               total_value: float):
+        """获取历史价格、优化组合权重并计算按该权重持有期间的表现
+
+        Returns:
+            (PortfolioData, 绩效字典, 无数据的股票代码列表, 组合净值序列)
+        """
+        loaded = await asyncio.gather(
+            *(self._get_data_tool().load_price_series(symbol, period=period, interval="1d") for symbol in symbols),
+            return_exceptions=True
+        )
+        names, histories, skipped = [], [], []
+        for symbol, series in zip(symbols, loaded):
+            if isinstance(series, Exception) or len(series) < 2:
+                skipped.append(symbol)
+            else:
+                names.append(symbol)
+                histories.append(series)
+        if not names:
+            raise ValueError("无法获取任何股票的历史价格")
+            
+        # 按日期对齐，只使用所有股票都有价格的交易日（各市场的节假日、停牌日不同）
+        _, prices = align_on_dates([series.index for series in histories],
+                                   [series.close for series in histories])
+        # 多只股票时组合优化至少需要2个收益率
+        minimum = 2 if len(names) == 1 else 3
+        if prices.shape[1] < minimum:
+            raise ValueError(f"{', '.join(names)} 共同的交易日不足{minimum}个，无法计算组合表现")
+        if len(names) == 1:
+            weights = np.ones(1)
+            optimized = None
+        else:
+            returns = simple_returns_matrix(prices)
+            try:
+                optimized = optimize_portfolio(returns, objective=objective)
+            except ValueError as e:
+                # 所有股票预期超额收益为负时不存在最大夏普组合，退回最小方差组合
+                self.logger.warning(f"组合优化失败，改用最小方差组合: {e}")
+                optimized = optimize_portfolio(returns, objective="min_variance")
+            weights = optimized["weights"]
+            
+        # 期初按权重买入并持有
+        growth = weights @ (prices / prices[:, :1])
+        now = datetime.now()
+        portfolio = PortfolioData(
+            name="优化组合",
+            symbols=names,
+            weights=np.round(weights, 6).tolist(),
+            total_value=total_value,
+            created_date=now,
+            last_updated=now
+        )
+        performance = {
+            "daily_return": float(growth[-1] / growth[-2] - 1) * 100 if len(growth) > 1 else 0.0,
+            "total_return": float(growth[-1] - 1) * 100,
+            "expected_return": optimized["expected_return"] * 100 if optimized else float("nan"),
+            "volatility": optimized["volatility"] * 100 if optimized else float("nan"),
+            "sharpe_ratio": optimized["sharpe_ratio"] if optimized else float("nan")
+        }
+        return portfolio, performance, skipped, growth
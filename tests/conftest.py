@@ -0,0 +1,25 @@
+"""
+测试公共配置：把 src 目录加入 sys.path，与 benchmarks 下的脚本一致，
+以 mcp_server、data 作为顶层包导入
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(42)
+
+
+@pytest.fixture
+def make_prices(rng):
+    """生成指定长度的随机游走价格"""
+    def make(length):
+        return 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, length)))
+    return make
@@ -0,0 +1,81 @@
+"""AI报告：逐段降级与本地模型并发限制"""
+
+import asyncio
+
+import pytest
+
+from mcp_server.report_sections import get_section_cache
+from mcp_server.tools.ai_enhanced_report_generator import MOCK_AI_SECTIONS, AIEnhancedReportGenerator
+
+
+class FakeOllama:
+    """记录同时进行的请求数，提示中含 failing 列出的标题时失败"""
+
+    model = "fake"
+
+    def __init__(self, failing=()):
+        self.failing = failing
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def health_check(self):
+        return True
+
+    async def generate(self, prompt, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if any(title in prompt for title in self.failing):
+                raise RuntimeError("模型超时")
+            return "OLLAMA"
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    get_section_cache().clear()
+    tool = AIEnhancedReportGenerator(use_ollama=False, ollama_concurrency=2)
+    yield tool
+    get_section_cache().clear()
+
+
+def create(generator, symbol="AAPL"):
+    return asyncio.run(generator._create_ai_report(
+        symbol, generator.companies[symbol], generator._get_mock_financial_data(symbol), "professional"
+    ))
+
+
+def test_failed_section_falls_back_alone(generator):
+    generator.ollama_client = FakeOllama(failing=("「风险评估」",))
+
+    report = create(generator)
+
+    assert report.count("OLLAMA") == 4
+    assert MOCK_AI_SECTIONS["risks"] in report
+
+
+def test_fallback_section_is_retried_next_time(generator):
+    generator.ollama_client = FakeOllama(failing=("「风险评估」",))
+    create(generator)
+
+    generator.ollama_client.failing = ()
+    generator.ollama_client.calls = 0
+    report = create(generator)
+
+    # 只有上次降级的分段重新调用模型
+    assert generator.ollama_client.calls == 1
+    assert report.count("OLLAMA") == 5
+
+
+def test_ollama_calls_are_limited(generator):
+    generator.ollama_client = FakeOllama()
+
+    create(generator)
+
+    assert generator.ollama_client.calls == 5
+    assert generator.ollama_client.peak == 2
@@ -0,0 +1,82 @@
+"""批量指标与逐条序列的 NumPy 计算结果一致"""
+
+import math
+
+import numpy as np
+import pytest
+
+from mcp_server.analytics.batch import align_on_dates, batch_metrics, pad_series
+
+
+def test_batch_metrics_match_per_series_numpy(make_prices):
+    series = [make_prices(length) for length in (30, 252, 5, 100)]
+    matrix = pad_series([list(prices) for prices in series])
+
+    metrics = batch_metrics(matrix, series_type="prices", period="daily", risk_free_rate=0.02)
+
+    for row, prices in enumerate(series):
+        returns = prices[1:] / prices[:-1] - 1
+        volatility = np.std(returns)
+        sharpe = (returns.mean() - 0.02 / 252) / volatility
+        assert metrics["data_points"][row] == len(returns)
+        assert metrics["total_return_pct"][row] == pytest.approx((prices[-1] / prices[0] - 1) * 100)
+        assert metrics["avg_return_pct"][row] == pytest.approx(returns.mean() * 100)
+        assert metrics["volatility_pct"][row] == pytest.approx(volatility * 100)
+        assert metrics["annualized_volatility_pct"][row] == pytest.approx(volatility * math.sqrt(252) * 100)
+        assert metrics["sharpe_ratio"][row] == pytest.approx(sharpe)
+        assert metrics["max_return_pct"][row] == pytest.approx(returns.max() * 100)
+        assert metrics["min_return_pct"][row] == pytest.approx(returns.min() * 100)
+
+
+def test_batch_metrics_end_alignment_and_insufficient_data(make_prices):
+    prices = make_prices(20)
+    matrix = pad_series([list(prices), [100.0]], align="end")
+
+    metrics = batch_metrics(matrix, series_type="prices")
+
+    assert np.isnan(matrix[1, :-1]).all()
+    assert metrics["volatility_pct"][0] == pytest.approx(np.std(prices[1:] / prices[:-1] - 1) * 100)
+    assert np.isnan(metrics["volatility_pct"][1])
+
+
+def test_batch_metrics_on_returns(rng):
+    returns = rng.normal(0.001, 0.01, 60)
+
+    metrics = batch_metrics(returns[None, :], series_type="returns", period="weekly")
+
+    assert metrics["total_return_pct"][0] == pytest.approx((np.prod(1 + returns) - 1) * 100)
+    assert metrics["annualized_volatility_pct"][0] == pytest.approx(np.std(returns) * math.sqrt(52) * 100)
+
+
+def test_batch_metrics_bridge_price_gaps(make_prices):
+    prices = make_prices(60)
+    gapped = prices.copy()
+    gapped[[10, 11, 30]] = np.nan
+
+    metrics = batch_metrics(np.stack([prices, gapped]))
+
+    # 缺失3个价格，收益率少3个；停牌前后的两个价格之间计一期
+    assert metrics["data_points"].tolist() == [59, 56]
+    valid = gapped[~np.isnan(gapped)]
+    returns = valid[1:] / valid[:-1] - 1
+    assert metrics["avg_return_pct"][1] == pytest.approx(returns.mean() * 100)
+    assert metrics["total_return_pct"][1] == pytest.approx(metrics["total_return_pct"][0])
+
+
+def test_align_on_dates_keeps_only_common_valid_dates():
+    dates = np.array(["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07", "2025-01-08"],
+                     dtype="datetime64[ns]")
+    # 第二条序列 01-03 休市，01-08 的价格缺失，另有一个第一条序列没有的交易日
+    other = np.array(["2025-01-02", "2025-01-04", "2025-01-06", "2025-01-07", "2025-01-08"],
+                     dtype="datetime64[ns]")
+
+    common, matrix = align_on_dates([dates, other], [[1.0, 2.0, 3.0, 4.0, 5.0], [10, 11, 12, 13, None]])
+
+    np.testing.assert_array_equal(common, np.array(["2025-01-02", "2025-01-06", "2025-01-07"],
+                                                   dtype="datetime64[ns]"))
+    np.testing.assert_array_equal(matrix, [[1.0, 3.0, 4.0], [10.0, 12.0, 13.0]])
+
+
+def test_align_on_dates_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        align_on_dates([np.arange(3).astype("datetime64[D]")], [[1.0, 2.0]])
@@ -0,0 +1,61 @@
+"""块自助法置信区间：可复现性、分批和时间预算"""
+
+import time
+
+import numpy as np
+import pytest
+
+from mcp_server.analytics.bootstrap import block_starts, bootstrap_risk_metrics, expand_indices
+
+
+def test_indices_wrap_around_and_cover_length():
+    indices = expand_indices(np.array([[8, 2, 5]]), 10, 4)
+
+    assert indices.tolist() == [[8, 9, 0, 1, 2, 3, 4, 5, 5, 6]]
+
+
+def test_batched_draws_match_single_draw():
+    whole = block_starts(100, 5, 30, np.random.default_rng(1))
+    rng = np.random.default_rng(1)
+    parts = np.vstack([block_starts(100, 5, size, rng) for size in (7, 1, 22)])
+
+    np.testing.assert_array_equal(whole, parts)
+
+
+def test_time_budget_does_not_change_completed_results(rng):
+    returns = rng.normal(0.0005, 0.01, 500)
+
+    plain = bootstrap_risk_metrics(returns, resamples=500, seed=3)
+    budgeted = bootstrap_risk_metrics(returns, resamples=500, seed=3, time_budget=60)
+
+    assert not budgeted["truncated"]
+    assert budgeted["volatility"] == plain["volatility"]
+    assert budgeted["sharpe_ratio"] == plain["sharpe_ratio"]
+
+
+def test_time_budget_is_checked_within_large_batches(rng):
+    # 每个重抽样很短时，旧实现一批就有约两万次重抽样
+    returns = rng.normal(0.0005, 0.01, 50)
+    budget = 0.05
+
+    started = time.perf_counter()
+    result = bootstrap_risk_metrics(returns, resamples=10_000_000, seed=1, time_budget=budget)
+    elapsed = time.perf_counter() - started
+
+    assert result["truncated"]
+    assert 0 < result["resamples"] < 10_000_000
+    assert elapsed < budget + 0.5
+
+
+def test_interval_brackets_sample_statistics(rng):
+    returns = rng.normal(0.001, 0.02, 1000)
+
+    result = bootstrap_risk_metrics(returns, resamples=1000, block_size=1, seed=5)
+
+    assert result["volatility"]["lower"] < returns.std() < result["volatility"]["upper"]
+    assert result["resamples"] == 1000 and result["block_size"] == 1
+
+
+def test_invalid_block_size_is_rejected(rng):
+    with pytest.raises(ValueError, match="块长度"):
+        bootstrap_risk_metrics(rng.normal(size=10), block_size=11)
@@ -0,0 +1,86 @@
+"""数据分析工具的多序列路径：服务端序列按日期对齐"""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from data.models import PriceSeries
+from mcp_server.series_store import SeriesStore
+from mcp_server.tools.data_analyzer import DataAnalyzerTool
+
+
+def make_series(symbol, dates, close):
+    close = np.asarray(close, dtype=np.float64)
+    return PriceSeries(
+        symbol=symbol, index=np.array(dates, dtype="datetime64[ns]"),
+        open=close, high=close, low=close, close=close, volume=np.ones_like(close)
+    )
+
+
+@pytest.fixture
+def analyzer():
+    return DataAnalyzerTool(series_store=SeriesStore())
+
+
+def call(analyzer, name, arguments):
+    result = asyncio.run(analyzer.get_tool_handlers()[name](arguments))
+    return json.loads(result.content[0].text.split("\n", 1)[1])
+
+
+def test_series_ids_are_aligned_on_dates_not_positions(analyzer):
+    # 两个市场的休市日不同：按位置对齐会把不同日期的收益率配对
+    us = make_series("AAPL", ["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07"], [100, 110, 99, 99])
+    cn = make_series("600519.SS", ["2025-01-02", "2025-01-06", "2025-01-07", "2025-01-08"], [50, 55, 55, 60])
+    ids = [analyzer.series_store.put(us), analyzer.series_store.put(cn)]
+
+    result = call(analyzer, "calculate_var", {
+        "series_ids": ids, "methods": ["historical"], "weights": [1.0, 0.0]
+    })
+
+    # 共同交易日 01-02、01-06、01-07：AAPL 的收益率为 -1% 和 0（按位置对齐时为3个）
+    assert result["data_points"] == 2
+    # 两个样本的5%分位数按线性插值为 -0.95%
+    assert result["estimates"]["historical"]["0.95"]["var_pct"] == pytest.approx(0.95)
+
+
+def test_too_few_common_dates_is_rejected(analyzer):
+    first = make_series("A", ["2025-01-02", "2025-01-03"], [1.0, 2.0])
+    second = make_series("B", ["2025-01-06", "2025-01-07"], [1.0, 2.0])
+    ids = [analyzer.series_store.put(first), analyzer.series_store.put(second)]
+
+    with pytest.raises(ValueError):
+        call(analyzer, "optimize_portfolio", {"series_ids": ids})
+
+
+def test_drawdown_dates_with_benchmark_id(analyzer):
+    asset = make_series("A", ["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07", "2025-01-08"],
+                        [100, 120, 90, 95, 130])
+    benchmark = make_series("SPY", ["2025-01-03", "2025-01-06", "2025-01-07", "2025-01-08"],
+                            [10, 9.5, 9.8, 10.5])
+
+    result = call(analyzer, "calculate_risk_attribution", {
+        "series_ids": [analyzer.series_store.put(asset)],
+        "benchmark_id": analyzer.series_store.put(benchmark)
+    })
+
+    table = result["table"]
+    assert table["max_drawdown_pct"][0] == pytest.approx(-25.0)
+    assert table["drawdown_peak_date"] == ["2025-01-03"]
+    assert table["drawdown_trough_date"] == ["2025-01-06"]
+    # 下标相对于资产自身的序列
+    assert (table["drawdown_peak_index"][0], table["drawdown_trough_index"][0]) == (1, 2)
+
+
+def test_inline_price_gaps_are_bridged(analyzer, make_prices):
+    first, second = make_prices(40), make_prices(40)
+    gapped = first.tolist()
+    gapped[10] = None
+
+    result = call(analyzer, "optimize_portfolio", {
+        "series": [gapped, second.tolist()], "objective": "min_variance", "dtype": "float32"
+    })
+
+    # 停牌日两侧合并为一期收益率：只有停牌日当期缺失，而不是前后两期
+    assert result["data_points"] == 38
@@ -0,0 +1,60 @@
+"""技术指标：与 pandas 的逐序列计算对照"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mcp_server.analytics.indicators import bollinger, compute_indicators, ema, latest_values, rsi, sma
+
+
+@pytest.fixture
+def close(make_prices):
+    return make_prices(300)
+
+
+def test_sma_matches_rolling_mean(close):
+    np.testing.assert_allclose(sma(close, 20)[0], pd.Series(close).rolling(20).mean(), rtol=1e-10)
+
+
+def test_ema_matches_pandas(close):
+    expected = pd.Series(close).ewm(span=12, adjust=False, min_periods=12).mean()
+
+    np.testing.assert_allclose(ema(close, 12)[0], expected, rtol=1e-10)
+
+
+def test_rsi_matches_wilder_smoothing(close):
+    change = pd.Series(close).diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    loss = (-change).clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+
+    np.testing.assert_allclose(rsi(close, 14)[0], 100 - 100 / (1 + gain / loss), rtol=1e-10)
+
+
+def test_rsi_without_losses_is_100():
+    assert rsi(np.arange(1.0, 31.0), 14)[0, -1] == 100.0
+
+
+def test_bollinger_uses_population_std(close):
+    bands = bollinger(close, 20, 2.0)
+    rolling = pd.Series(close).rolling(20)
+
+    np.testing.assert_allclose(bands["upper"][0], rolling.mean() + 2 * rolling.std(ddof=0), rtol=1e-9)
+
+
+def test_batch_rows_match_single_series_with_padding(make_prices):
+    short, long = make_prices(150), make_prices(250)
+    matrix = np.full((2, 250), np.nan)
+    matrix[0, 100:] = short
+    matrix[1] = long
+
+    batch = latest_values(compute_indicators(matrix))
+
+    for row, series in enumerate((short, long)):
+        single = latest_values(compute_indicators(series))
+        for name, value in single.items():
+            np.testing.assert_allclose(batch[name][row], value[0], rtol=1e-9, err_msg=name)
+
+
+def test_unknown_indicator_is_rejected(close):
+    with pytest.raises(ValueError, match="不支持的技术指标"):
+        compute_indicators(close, ["vwap"])
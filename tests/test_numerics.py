@@ -0,0 +1,40 @@
+"""数值输入层：精度转换和跳过缺失价格的收益率"""
+
+import numpy as np
+import pytest
+
+from mcp_server.analytics.numerics import resolve_dtype, simple_returns, simple_returns_matrix, to_array
+
+
+def test_matrix_returns_bridge_gaps_like_simple_returns(make_prices):
+    prices = np.stack([make_prices(50) for _ in range(3)])
+    prices[0, [5, 6, 20]] = np.nan
+    prices[1, :4] = np.nan
+    prices[2, -1] = np.nan
+
+    returns = simple_returns_matrix(prices)
+
+    assert returns.shape == (3, 49)
+    for row in range(3):
+        np.testing.assert_allclose(returns[row][~np.isnan(returns[row])], simple_returns(prices[row]))
+    # 停牌后复牌的收益率相对停牌前最后一个价格计算，记在复牌那一列
+    assert returns[0, 6] == pytest.approx(prices[0, 7] / prices[0, 4] - 1)
+    assert np.isnan(returns[0, 4:6]).all()
+
+
+def test_matrix_returns_keep_precision(make_prices):
+    prices = np.stack([make_prices(20), make_prices(20)]).astype(np.float32)
+
+    assert simple_returns_matrix(prices).dtype == np.float32
+
+
+def test_to_array_converts_null_and_inf():
+    array = to_array([1.0, None, float("inf"), 2.0], "float32")
+
+    assert array.dtype == np.float32
+    assert np.isnan(array[1:3]).all()
+
+
+def test_unknown_dtype_is_rejected():
+    with pytest.raises(ValueError, match="不支持的数值精度"):
+        resolve_dtype("float16")
@@ -0,0 +1,75 @@
+"""组合优化：协方差收缩、最小方差/最大夏普权重与有效前沿"""
+
+import numpy as np
+import pytest
+
+from mcp_server.analytics.portfolio import (
+    covariance, efficient_frontier, max_sharpe_weights, min_variance_weights, optimize_portfolio
+)
+
+
+@pytest.fixture
+def moments(rng):
+    returns = rng.normal(0.0005, 0.02, (6, 500)) + rng.normal(0, 0.0005, (6, 1))
+    return returns.mean(axis=1) * 252, covariance(returns)["covariance"] * 252
+
+
+def test_long_only_frontier_has_distinct_evenly_spaced_points(moments):
+    mean, cov = moments
+
+    frontier = efficient_frontier(mean, cov, points=20)
+
+    assert len(np.unique(np.round(frontier["weights"], 8), axis=0)) == 20
+    expected = np.sort(frontier["expected_return"])
+    np.testing.assert_allclose(np.diff(expected), np.diff(expected)[0], rtol=1e-3)
+    assert expected[0] == pytest.approx(min_variance_weights(cov) @ mean)
+    assert expected[-1] == pytest.approx(mean.max())
+    assert np.all(np.diff(frontier["volatility"]) > 0)
+    assert np.all(frontier["weights"] >= 0)
+    np.testing.assert_allclose(frontier["weights"].sum(axis=1), 1.0)
+
+
+def test_frontier_collapses_when_all_means_equal(moments):
+    _, cov = moments
+
+    frontier = efficient_frontier(np.full(cov.shape[0], 0.1), cov, points=20)
+
+    assert frontier["weights"].shape == (1, cov.shape[0])
+
+
+def test_unconstrained_min_variance_matches_closed_form(moments):
+    _, cov = moments
+    inverse = np.linalg.inv(cov)
+
+    weights = min_variance_weights(cov, long_only=False)
+
+    np.testing.assert_allclose(weights, inverse.sum(axis=1) / inverse.sum(), rtol=1e-10)
+
+
+def test_max_sharpe_beats_random_portfolios(moments, rng):
+    mean, cov = moments
+    rate = float(mean.min())
+
+    def sharpe(w):
+        return (w @ mean - rate) / np.sqrt(w @ cov @ w)
+
+    best = sharpe(max_sharpe_weights(mean, cov, rate))
+
+    assert all(sharpe(w) <= best + 1e-9 for w in rng.dirichlet(np.ones(len(mean)), 2000))
+
+
+def test_ledoit_wolf_shrinkage_is_a_proportion(rng):
+    estimate = covariance(rng.normal(0, 0.02, (8, 40)))
+
+    assert 0.0 <= estimate["shrinkage"] <= 1.0
+    np.testing.assert_allclose(estimate["covariance"], estimate["covariance"].T)
+
+
+def test_optimize_portfolio_skips_incomplete_periods(rng):
+    returns = rng.normal(0.0005, 0.02, (3, 100))
+    returns[1, :10] = np.nan
+
+    result = optimize_portfolio(returns, objective="min_variance", frontier_points=5)
+
+    assert result["data_points"] == 90
+    assert len(result["frontier"]["volatility"]) == 5
@@ -0,0 +1,106 @@
+"""PriceStore 列式K线缓存的增量追加和零复制读取"""
+
+import mmap
+
+import numpy as np
+import pandas as pd
+
+from data.models import PriceSeries
+from mcp_server.price_store import PriceStore
+
+
+def make_bars(start: str, close):
+    index = pd.date_range(start, periods=len(close), freq="D", tz="UTC")
+    close = np.asarray(close, dtype=np.float64)
+    return pd.DataFrame(
+        {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000.0},
+        index=index
+    )
+
+
+class Fetcher:
+    """按调用顺序返回预设数据的上游请求函数，记录每次调用的参数"""
+
+    def __init__(self, *frames):
+        self.frames = list(frames)
+        self.calls = []
+
+    def __call__(self, period=None, start=None):
+        self.calls.append({"period": period, "start": start})
+        return self.frames.pop(0)
+
+
+def test_append_replaces_last_bar_and_adds_new_rows(tmp_path):
+    store = PriceStore(str(tmp_path))
+    fetch = Fetcher(
+        make_bars("2025-01-01", [10.0, 11.0, 12.0, 13.0, 14.0]),
+        # 上次最后一根K线未收盘，增量数据从它开始
+        make_bars("2025-01-05", [14.5, 15.0, 16.0])
+    )
+    store.get_history("TEST", "max", "1d", fetch)
+    store.ttl = -1
+
+    frame = store.get_history("TEST", "max", "1d", fetch)
+
+    assert fetch.calls[1]["start"] == pd.Timestamp("2025-01-05", tz="UTC")
+    assert frame.index.equals(pd.date_range("2025-01-01", periods=7, freq="D", tz="UTC"))
+    np.testing.assert_array_equal(frame["Close"].to_numpy(), [10.0, 11.0, 12.0, 13.0, 14.5, 15.0, 16.0])
+    np.testing.assert_array_equal(frame["High"].to_numpy(), [11.0, 12.0, 13.0, 14.0, 15.5, 16.0, 17.0])
+
+
+def test_append_does_not_modify_previously_returned_frames(tmp_path):
+    store = PriceStore(str(tmp_path))
+    fetch = Fetcher(
+        make_bars("2025-01-01", [10.0, 11.0, 12.0]),
+        make_bars("2025-01-03", [29.0, 30.0])
+    )
+    held = store.get_history("TEST", "max", "1d", fetch)
+    held_close = held["Close"].to_numpy()
+    store.ttl = -1
+
+    store.get_history("TEST", "max", "1d", fetch)
+
+    # 追加写入新文件后替换，旧的内存映射仍指向原文件内容
+    np.testing.assert_array_equal(held_close, [10.0, 11.0, 12.0])
+    assert len(held) == 3
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_fresh_cache_is_served_without_fetching(tmp_path):
+    store = PriceStore(str(tmp_path))
+    fetch = Fetcher(make_bars("2025-01-01", [10.0, 11.0]))
+    store.get_history("TEST", "max", "1d", fetch)
+
+    frame = store.get_history("TEST", "max", "1d", fetch)
+
+    assert len(fetch.calls) == 1
+    np.testing.assert_array_equal(frame["Close"].to_numpy(), [10.0, 11.0])
+
+
+def backed_by_file(array):
+    """数组是否（经由视图）引用内存映射的文件，而不是复制出的内存"""
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def test_cached_history_is_not_copied(tmp_path):
+    store = PriceStore(str(tmp_path))
+    now = pd.Timestamp.now(tz="UTC").normalize()
+    bars = make_bars(str((now - pd.Timedelta(days=99)).date()), np.arange(100.0) + 1)
+    fetch = Fetcher(bars)
+    store.get_history("TEST", "max", "1d", fetch)
+
+    for period in ("max", "1mo", "5d"):
+        frame = store.get_history("TEST", period, "1d", fetch)
+        series = PriceSeries.from_dataframe("TEST", frame)
+
+        for column in ("Open", "High", "Low", "Close", "Volume"):
+            assert backed_by_file(frame[column].to_numpy()), (period, column)
+        assert backed_by_file(series.close) and backed_by_file(series.volume)
+        assert series.close[-1] == 100.0
+
+    assert len(store.get_history("TEST", "5d", "1d", fetch)) == 5
+    assert len(fetch.calls) == 1
@@ -0,0 +1,107 @@
+"""ReportCache 内容寻址缓存的命中、跳过和财报工具的复用"""
+
+import asyncio
+import os
+from concurrent.futures import Future
+
+import pytest
+
+from mcp_server.report_cache import ReportCache, canonical_digest
+from mcp_server.report_writer import ReportWriter
+
+
+def test_canonical_digest_ignores_key_order():
+    assert canonical_digest({"symbol": "AAPL", "period": "latest"}) == \
+        canonical_digest({"period": "latest", "symbol": "AAPL"})
+    assert canonical_digest({"symbol": "AAPL"}) != canonical_digest({"symbol": "MSFT"})
+
+
+def test_store_then_reuse_links_cached_report(tmp_path):
+    cache = ReportCache(tmp_path / "cache")
+    digest = canonical_digest({"symbol": "AAPL"})
+    report = tmp_path / "report_1.txt"
+    report.write_text("报告正文", encoding="utf-8")
+
+    assert cache.reuse(digest, tmp_path / "report_0.txt") is None
+    cache.store(digest, report)
+    content, path = cache.reuse(digest, tmp_path / "report_2.txt")
+
+    assert content == "报告正文"
+    assert path == tmp_path / "report_2.txt"
+    assert os.path.samefile(path, report)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stored"], stats["links"]) == (1, 1, 1, 1)
+
+
+def test_store_waits_for_successful_write(tmp_path):
+    cache = ReportCache(tmp_path / "cache")
+    report = tmp_path / "report.txt"
+    report.write_text("报告正文", encoding="utf-8")
+    written, failed = Future(), Future()
+
+    cache.store("ok", report, written)
+    cache.store("failed", report, failed)
+    assert not cache.path_for("ok").exists()
+    written.set_result(report)
+    failed.set_exception(OSError("磁盘已满"))
+
+    assert cache.path_for("ok").exists()
+    assert not cache.path_for("failed").exists()
+
+
+def test_reuse_file_with_suffix(tmp_path):
+    cache = ReportCache(tmp_path / "cache")
+    pdf = tmp_path / "report_1.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+
+    cache.store("digest", pdf, suffix=".pdf")
+
+    assert cache.reuse_file("digest", tmp_path / "report_2.png", "_price.png") is None
+    reused = cache.reuse_file("digest", tmp_path / "report_2.pdf", ".pdf")
+    assert reused.read_bytes() == b"%PDF-1.4"
+
+
+def test_record_bypass_does_not_count_as_lookup(tmp_path):
+    cache = ReportCache(tmp_path / "cache")
+
+    cache.record_bypass()
+
+    stats = cache.stats()
+    assert (stats["bypassed"], stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 0, 0, 0.0)
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    """输出目录、报告缓存和写入器都在临时目录中的财报工具，不请求历史K线"""
+    monkeypatch.chdir(tmp_path)
+    from mcp_server.tools.company_report_generator import CompanyReportGenerator
+
+    generator = CompanyReportGenerator()
+    generator.report_cache = ReportCache(tmp_path / "cache")
+    generator.writer = ReportWriter(fsync=False)
+
+    async def no_technical_data(symbol):
+        return None
+
+    monkeypatch.setattr(generator, "_get_technical_data", no_technical_data)
+    yield generator
+    generator.writer.close()
+
+
+def test_company_report_hit_and_bypass(generator):
+    handler = generator.get_tool_handlers()["generate_company_report"]
+
+    async def generate(**arguments):
+        result = await handler({"symbol": "AAPL", **arguments})
+        generator.writer.flush(timeout=5)
+        return result.content[0].text
+
+    first = asyncio.run(generate())
+    second = asyncio.run(generate())
+    bypassed = asyncio.run(generate(bypass_cache=True))
+
+    assert "复用缓存的报告" not in first
+    assert "复用缓存的报告" in second
+    assert "复用缓存的报告" not in bypassed
+    stats = generator.report_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["bypassed"]) == (1, 1, 1)
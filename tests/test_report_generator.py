@@ -0,0 +1,116 @@
+"""报告生成工具：组合报告的历史价格对齐、股票报告的价格和技术指标"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from data.models import PriceSeries
+
+
+def make_series(symbol, dates, close):
+    close = np.asarray(close, dtype=np.float64)
+    return PriceSeries(
+        symbol=symbol, index=np.array(dates, dtype="datetime64[ns]"),
+        open=close, high=close, low=close, close=close, volume=np.ones_like(close)
+    )
+
+
+class FakeDataTool:
+    """按股票代码返回预设历史价格的数据工具"""
+
+    def __init__(self, histories):
+        self.histories = histories
+
+    async def load_price_series(self, symbol, period="1y", interval="1d"):
+        if symbol not in self.histories:
+            raise ValueError(f"无数据: {symbol}")
+        return self.histories[symbol]
+
+
+@pytest.fixture
+def tool(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from mcp_server.tools.report_generator import ReportGeneratorTool
+
+    return ReportGeneratorTool()
+
+
+def test_portfolio_uses_common_trading_dates(tool):
+    tool._data_tool = FakeDataTool({
+        "AAPL": make_series("AAPL", ["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07"], [100, 50, 110, 99]),
+        # 01-03 休市：按位置对齐会把 AAPL 01-03 的价格与它配对
+        "600519.SS": make_series("600519.SS", ["2025-01-02", "2025-01-06", "2025-01-07", "2025-01-08"],
+                                 [10, 11, 12, 13])
+    })
+
+    portfolio, performance, skipped, growth = asyncio.run(
+        tool._build_portfolio(["AAPL", "600519.SS", "MISSING"], "min_variance", "1y", 100000)
+    )
+
+    assert skipped == ["MISSING"]
+    assert len(growth) == 3
+    weights = np.array(portfolio.weights)
+    assert growth[1] == pytest.approx(weights @ [1.1, 1.1], rel=1e-5)
+    assert growth[2] == pytest.approx(weights @ [0.99, 1.2], rel=1e-5)
+
+
+def test_portfolio_without_common_dates_is_rejected(tool):
+    tool._data_tool = FakeDataTool({
+        "AAPL": make_series("AAPL", ["2025-01-02", "2025-01-03", "2025-01-06"], [100, 101, 102]),
+        "MSFT": make_series("MSFT", ["2025-01-03", "2025-01-06", "2025-01-07"], [200, 201, 202])
+    })
+
+    with pytest.raises(ValueError, match="共同的交易日不足3个"):
+        asyncio.run(tool._build_portfolio(["AAPL", "MSFT"], "max_sharpe", "1y", 100000))
+
+
+
+def daily_series(symbol, close):
+    close = np.asarray(close, dtype=np.float64)
+    dates = np.datetime64("2024-01-01") + np.arange(len(close))
+    return make_series(symbol, dates.astype(str).tolist(), close)
+
+
+def stock_report(tool, symbol):
+    result = asyncio.run(tool._generate_stock_report({"symbol": symbol}))
+    return result.content[0].text
+
+
+def test_stock_report_uses_latest_prices(tool):
+    tool._data_tool = FakeDataTool({"AAPL": daily_series("AAPL", np.linspace(100, 200, 250))})
+
+    text = stock_report(tool, "AAPL")
+
+    # 稳定上涨：最新价 200，前一日 199.6
+    assert "当前价格: $200.0" in text
+    assert "价格变动: $0.4 (0.2%)" in text
+    assert "50日均线" in text and "200日均线" in text
+    # 没有下跌，RSI 为100，超买
+    assert "投资建议: 谨慎" in text
+
+
+def test_stock_report_recommendation_follows_trend(tool):
+    # 长期下跌、短期震荡，RSI 不在超买超卖区间，均线空头排列
+    falling = np.linspace(200, 100, 250) + 4 * np.sin(np.arange(250))
+    tool._data_tool = FakeDataTool({"MSFT": daily_series("MSFT", falling)})
+
+    text = stock_report(tool, "MSFT")
+
+    assert "投资建议: 卖出" in text
+
+
+def test_stock_report_without_history_is_rejected(tool):
+    tool._data_tool = FakeDataTool({})
+
+    with pytest.raises(ValueError, match="无法获取 NONE 的历史价格"):
+        stock_report(tool, "NONE")
+
+
+def test_technical_recommendation_rules():
+    from mcp_server.tools.report_generator import technical_recommendation
+
+    assert technical_recommendation(10.0, {"rsi_14": 25.0})[0] == "买入"
+    assert technical_recommendation(10.0, {"rsi_14": 50.0})[0] == "持有"
+    assert technical_recommendation(12.0, {"rsi_14": 50.0, "sma_50": 11.0, "sma_200": 10.0})[0] == "买入"
+    assert technical_recommendation(9.0, {"rsi_14": 50.0, "sma_50": 10.0, "sma_200": 11.0})[0] == "卖出"
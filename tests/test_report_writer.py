@@ -0,0 +1,72 @@
+"""ReportWriter 原子提交"""
+
+import pytest
+
+from mcp_server.report_writer import ReportWriter
+
+
+@pytest.fixture
+def writer():
+    writer = ReportWriter(fsync=True)
+    yield writer
+    writer.close()
+
+
+def test_write_commits_complete_file_without_temp_files(writer, tmp_path):
+    path = tmp_path / "reports" / "report.txt"
+
+    future = writer.submit(path, "财务报告\n" * 1000)
+
+    assert future.result(timeout=5) == path
+    assert path.read_text(encoding="utf-8") == "财务报告\n" * 1000
+    assert [p.name for p in path.parent.iterdir()] == ["report.txt"]
+    assert writer.stats["written"] == 1
+
+
+def test_replacing_file_does_not_touch_open_readers(writer, tmp_path):
+    path = tmp_path / "report.txt"
+    path.write_text("旧报告", encoding="utf-8")
+
+    with open(path, encoding="utf-8") as reader:
+        writer.submit(path, "新报告").result(timeout=5)
+        # rename 替换目录项，已打开的旧文件内容不变
+        assert reader.read() == "旧报告"
+    assert path.read_text(encoding="utf-8") == "新报告"
+
+
+def test_pending_content_until_flushed(tmp_path):
+    writer = ReportWriter(fsync=False)
+    path = tmp_path / "report.txt"
+    try:
+        writer.submit(path, b"content")
+        assert writer.flush(timeout=5)
+        assert writer.pending_content(path) is None
+        assert path.read_bytes() == b"content"
+    finally:
+        writer.close()
+
+
+def test_failed_commit_keeps_existing_target_and_removes_temp(writer, tmp_path):
+    # 目标是非空目录，rename 失败
+    target = tmp_path / "report.txt"
+    target.mkdir()
+    (target / "keep").write_text("x")
+
+    future = writer.submit(target, "报告")
+
+    with pytest.raises(OSError):
+        future.result(timeout=5)
+    assert (target / "keep").read_text() == "x"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["report.txt"]
+    assert writer.stats["failed"] == 1
+    assert writer.pending_content(target) is None
+
+
+def test_closed_writer_rejects_new_files(tmp_path):
+    writer = ReportWriter(fsync=False)
+    writer.submit(tmp_path / "a.txt", "a")
+    writer.close()
+
+    assert (tmp_path / "a.txt").read_text() == "a"
+    with pytest.raises(RuntimeError):
+        writer.submit(tmp_path / "b.txt", "b")
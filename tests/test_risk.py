@@ -0,0 +1,87 @@
+"""最大回撤与相对基准的风险归因"""
+
+import numpy as np
+import pytest
+
+from mcp_server.analytics.risk import max_drawdown, risk_attribution, wealth_curves
+
+
+def test_first_period_loss_counts_in_drawdown():
+    result = max_drawdown(np.array([[-0.1, -0.1, 0.05]]), "returns")
+
+    assert result["max_drawdown"][0] == pytest.approx(-0.19)
+    assert (result["peak_index"][0], result["trough_index"][0]) == (0, 2)
+
+
+def test_returns_mode_matches_prices_mode(make_prices):
+    prices = np.stack([make_prices(120) for _ in range(4)])
+    returns = prices[:, 1:] / prices[:, :-1] - 1
+
+    from_prices = max_drawdown(prices, "prices")
+    from_returns = max_drawdown(returns, "returns")
+
+    np.testing.assert_allclose(from_returns["max_drawdown"], from_prices["max_drawdown"], rtol=1e-10)
+    np.testing.assert_array_equal(from_returns["peak_index"], from_prices["peak_index"])
+    np.testing.assert_array_equal(from_returns["trough_index"], from_prices["trough_index"])
+
+
+def test_drawdown_matches_running_peak_loop(make_prices):
+    prices = make_prices(300)
+
+    peak, worst = prices[0], 0.0
+    for price in prices:
+        peak = max(peak, price)
+        worst = min(worst, price / peak - 1)
+
+    assert max_drawdown(prices[None, :])["max_drawdown"][0] == pytest.approx(worst)
+
+
+def test_wealth_curve_starts_at_one_before_padding():
+    wealth = wealth_curves(np.array([[np.nan, 0.1, -0.5], [np.nan, np.nan, np.nan]]), "returns")
+
+    np.testing.assert_allclose(wealth[0], [np.nan, 1.0, 1.1, 0.55], equal_nan=True)
+    assert np.isnan(wealth[1]).all()
+    assert np.isnan(max_drawdown(np.full((1, 3), np.nan), "returns")["max_drawdown"][0])
+
+
+def test_rising_series_has_no_drawdown():
+    result = max_drawdown(np.array([[1.0, 2.0, 3.0]]))
+
+    assert result["max_drawdown"][0] == 0
+    assert result["peak_index"][0] == result["trough_index"][0]
+
+
+def test_risk_attribution_matches_least_squares(rng):
+    benchmark = rng.normal(0.0004, 0.01, 250)
+    returns = np.stack([
+        0.0002 + 1.3 * benchmark + rng.normal(0, 0.005, 250),
+        -0.0001 + 0.7 * benchmark + rng.normal(0, 0.008, 250)
+    ])
+    returns[1, 10] = np.nan
+
+    result = risk_attribution(returns, benchmark, period="daily", risk_free_rate=0.02)
+
+    rf = 0.02 / 252
+    for row in range(2):
+        valid = ~np.isnan(returns[row])
+        beta, alpha = np.polyfit(benchmark[valid] - rf, returns[row, valid] - rf, 1)
+        active = returns[row, valid] - benchmark[valid]
+        assert result["data_points"][row] == valid.sum()
+        assert result["beta"][row] == pytest.approx(beta)
+        assert result["alpha"][row] == pytest.approx(alpha, abs=1e-12)
+        assert result["r_squared"][row] == pytest.approx(
+            np.corrcoef(benchmark[valid], returns[row, valid])[0, 1] ** 2
+        )
+        assert result["information_ratio"][row] == pytest.approx(active.mean() / active.std())
+
+
+def test_constant_benchmark_has_no_beta():
+    result = risk_attribution(np.array([[0.01, 0.02, -0.01, 0.0]]), np.full(4, 0.001))
+
+    assert np.isnan(result["beta"][0])
+    assert np.isnan(result["r_squared"][0])
+
+
+def test_benchmark_length_must_match():
+    with pytest.raises(ValueError):
+        risk_attribution(np.zeros((1, 5)), np.zeros(4))
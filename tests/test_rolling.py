@@ -0,0 +1,38 @@
+"""滚动窗口指标与 pandas rolling 的结果一致"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mcp_server.analytics.rolling import rolling_metrics
+
+
+def test_rolling_metrics_match_pandas(rng):
+    # 较大的均值偏移检验前缀和相减的精度
+    returns = rng.normal(0.05, 0.01, (3, 400))
+    returns[1, 150] = np.nan
+
+    results = rolling_metrics(returns, windows=(20, 60), period="daily", risk_free_rate=0.02)
+
+    for window, columns in results.items():
+        for row in range(returns.shape[0]):
+            rolling = pd.Series(returns[row]).rolling(window)
+            mean = rolling.mean().to_numpy()
+            volatility = rolling.std(ddof=0).to_numpy() * math.sqrt(252)
+            sharpe = (mean - 0.02 / 252) / rolling.std(ddof=0).to_numpy() * math.sqrt(252)
+            np.testing.assert_allclose(columns["mean_return"][row], mean, rtol=1e-9, equal_nan=True)
+            np.testing.assert_allclose(columns["volatility"][row], volatility, rtol=1e-7, equal_nan=True)
+            np.testing.assert_allclose(columns["sharpe"][row], sharpe, rtol=1e-7, equal_nan=True)
+
+
+def test_rolling_window_longer_than_series_is_all_nan():
+    results = rolling_metrics(np.full((1, 10), 0.01), windows=(20,))
+
+    assert np.isnan(results[20]["volatility"]).all()
+
+
+def test_rolling_rejects_window_below_two():
+    with pytest.raises(ValueError):
+        rolling_metrics(np.zeros((1, 10)), windows=(1,))
@@ -0,0 +1,42 @@
+"""服务启动：报告和进程池模块按需导入"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+LAZY_MODULES = ("mcp_server.report_templates", "mcp_server.report_writer", "mcp_server.process_pool")
+
+
+def run_python(code, cwd):
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True,
+                            env={"PYTHONPATH": str(SRC)}, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.split()
+
+
+def test_server_startup_does_not_import_report_modules(tmp_path):
+    loaded = run_python(
+        "import sys\n"
+        "from mcp_server.server import FinancialMCPServer, shutdown_loaded_modules\n"
+        "FinancialMCPServer()\n"
+        "shutdown_loaded_modules()\n"
+        f"print(*[name for name in {LAZY_MODULES!r} if name in sys.modules])",
+        tmp_path
+    )
+
+    assert loaded == []
+
+
+def test_shutdown_closes_modules_that_were_used(tmp_path):
+    closed = run_python(
+        "from mcp_server.server import shutdown_loaded_modules\n"
+        "from mcp_server import process_pool\n"
+        "pool = process_pool.get_compute_pool()\n"
+        "shutdown_loaded_modules()\n"
+        "print(process_pool._compute_pool is None)",
+        tmp_path
+    )
+
+    assert closed == ["True"]
@@ -0,0 +1,87 @@
+"""SingleFlight 并发请求合并"""
+
+import asyncio
+
+import pytest
+
+from mcp_server.single_flight import SingleFlight, get_single_flight
+
+
+def test_concurrent_calls_with_same_key_share_one_execution():
+    flight = SingleFlight()
+    executions = []
+
+    async def fetch():
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        return {"price": 100.0}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("AAPL", fetch) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert len(executions) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"calls": 5, "executions": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_different_keys_execute_separately():
+    flight = SingleFlight()
+
+    async def fetch(symbol):
+        await asyncio.sleep(0.01)
+        return symbol
+
+    async def main():
+        return await asyncio.gather(flight.do("AAPL", lambda: fetch("AAPL")),
+                                    flight.do("MSFT", lambda: fetch("MSFT")))
+
+    assert asyncio.run(main()) == ["AAPL", "MSFT"]
+    assert flight.stats()["executions"] == 2
+
+
+def test_failure_is_shared_and_next_call_runs_again():
+    flight = SingleFlight()
+    attempts = []
+
+    async def fetch():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise ValueError("上游请求失败")
+        return "ok"
+
+    async def main():
+        results = await asyncio.gather(flight.do("AAPL", fetch), flight.do("AAPL", fetch),
+                                       return_exceptions=True)
+        return results, await flight.do("AAPL", fetch)
+
+    results, retried = asyncio.run(main())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert retried == "ok"
+    assert len(attempts) == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_task():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("AAPL", fetch))
+        second = asyncio.ensure_future(flight.do("AAPL", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_get_single_flight_is_process_wide():
+    assert get_single_flight() is get_single_flight()
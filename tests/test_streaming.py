@@ -0,0 +1,70 @@
+"""增量统计与完整重新计算的结果一致"""
+
+import math
+
+import numpy as np
+import pytest
+
+from mcp_server.analytics.streaming import StreamingStats, StreamingStatsStore
+
+
+def test_streaming_updates_match_full_recomputation(rng):
+    returns = rng.normal(0.0005, 0.02, 500)
+    stats = StreamingStats("returns")
+
+    for chunk in np.array_split(returns, [1, 7, 100, 350]):
+        stats.update(chunk)
+    snapshot = stats.snapshot(period="daily", risk_free_rate=0.02)
+
+    volatility = np.std(returns)
+    assert stats.count == 500
+    assert stats.mean == pytest.approx(returns.mean())
+    assert math.sqrt(stats.m2 / stats.count) == pytest.approx(volatility)
+    assert snapshot["total_return_pct"] == pytest.approx((np.prod(1 + returns) - 1) * 100, abs=1e-4)
+    assert snapshot["annualized_volatility_pct"] == pytest.approx(volatility * math.sqrt(252) * 100, abs=1e-4)
+    assert snapshot["sharpe_ratio"] == pytest.approx((returns.mean() - 0.02 / 252) / volatility, abs=1e-4)
+    assert snapshot["max_return_pct"] == pytest.approx(returns.max() * 100, abs=1e-4)
+
+
+def test_streaming_prices_continue_across_updates(make_prices):
+    prices = make_prices(50)
+    stats = StreamingStats("prices")
+
+    stats.update(prices[:20])
+    stats.update(np.concatenate([prices[20:30], [np.nan], prices[30:]]))
+
+    returns = prices[1:] / prices[:-1] - 1
+    assert stats.count == 49
+    assert stats.mean == pytest.approx(returns.mean())
+    assert math.sqrt(stats.m2 / stats.count) == pytest.approx(np.std(returns))
+    assert stats.snapshot()["last_price"] == prices[-1]
+
+
+def test_streaming_rejects_invalid_values():
+    with pytest.raises(ValueError):
+        StreamingStats("prices").update([10.0, 0.0])
+    with pytest.raises(ValueError):
+        StreamingStats("returns").update([-1.0])
+
+
+def test_store_keeps_series_type_when_omitted():
+    store = StreamingStatsStore()
+    store.update("AAPL", [100.0, 101.0], series_type="prices")
+
+    state = store.update("AAPL", [102.0])
+
+    assert state.series_type == "prices"
+    assert state.count == 2
+    with pytest.raises(ValueError):
+        store.update("AAPL", [0.01], series_type="returns")
+
+
+def test_store_evicts_least_recently_updated():
+    store = StreamingStatsStore(max_series=2)
+    store.update("A", [0.01])
+    store.update("B", [0.01])
+    store.update("A", [0.02])
+
+    store.update("C", [0.01])
+
+    assert store.series_ids() == ["A", "C"]
@@ -0,0 +1,97 @@
+"""VaR / CVaR：分块计划、可复现的蒙特卡洛模拟和元数据"""
+
+import asyncio
+import json
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+
+from mcp_server.analytics.var import (
+    historical_var, parametric_var, plan_blocks, simulate_block, simulation_inputs, var_from_samples
+)
+from mcp_server.series_store import SeriesStore
+from mcp_server.tools.data_analyzer import DataAnalyzerTool
+
+
+class InlinePool:
+    """在当前进程中执行任务的计算进程池替身，记录启动次数"""
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self.starts = 0
+
+    async def start(self):
+        self.starts += 1
+
+    async def run(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+def test_blocks_cover_every_path_and_respect_memory_cap():
+    per_path = 3 * 10 * 4 * 8
+    sizes = plan_blocks(100_003, 4, 10, max_block_bytes=per_path * 7_000)
+
+    assert sum(sizes) == 100_003
+    assert max(sizes) <= 7_000
+    assert max(sizes) - min(sizes) <= 1
+
+
+def test_blocks_are_split_across_workers_when_worthwhile():
+    assert len(plan_blocks(100_000, 2, 1, min_blocks=8)) == 8
+    # 路径太少时不为凑满进程数而切出过小的块
+    assert len(plan_blocks(3_000, 2, 1, min_blocks=8, min_block_paths=1000)) == 3
+    assert plan_blocks(10, 2, 1, min_blocks=8) == [10]
+
+
+def test_monte_carlo_is_reproducible_regardless_of_blocking(rng):
+    returns = rng.normal(0.0005, 0.01, (3, 250))
+    mean, factor = simulation_inputs(returns)
+    weights = np.full(3, 1 / 3)
+    seeds = np.random.SeedSequence(7).spawn(2)
+
+    first = simulate_block(mean, factor, weights, 5, 2_000, seeds[0])
+    again = simulate_block(mean, factor, weights, 5, 2_000, np.random.SeedSequence(7).spawn(2)[0])
+
+    np.testing.assert_array_equal(first, again)
+    assert not np.array_equal(first, simulate_block(mean, factor, weights, 5, 2_000, seeds[1]))
+
+
+def test_parametric_var_matches_normal_quantile(rng):
+    returns = rng.normal(0.001, 0.02, 5_000)
+    z = NormalDist().inv_cdf(0.05)
+
+    result = parametric_var(returns, [0.95])["0.95"]
+
+    assert result["var"] == pytest.approx(-(returns.mean() + z * returns.std(ddof=1)))
+    assert result["cvar"] > result["var"]
+
+
+def test_historical_var_tail_average():
+    samples = np.arange(-50, 50) / 100.0
+
+    result = var_from_samples(samples, [0.9])["0.9"]
+
+    assert result["var"] == pytest.approx(-np.quantile(samples, 0.1))
+    assert result["cvar"] == pytest.approx(-samples[:10].mean())
+    assert historical_var(samples, [0.9])["0.9"] == result
+
+
+def test_metadata_reports_workers_used_and_excludes_startup(rng):
+    pool = InlinePool(max_workers=4)
+    analyzer = DataAnalyzerTool(series_store=SeriesStore(), compute_pool=pool)
+    series = rng.normal(0.0005, 0.01, (2, 200)).tolist()
+
+    def run(paths):
+        result = asyncio.run(analyzer.get_tool_handlers()["calculate_var"]({
+            "series": series, "series_type": "returns", "methods": ["monte_carlo"],
+            "paths": paths, "seed": 11
+        }))
+        return json.loads(result.content[0].text.split("\n", 1)[1])["monte_carlo_metadata"]
+
+    many, few = run(40_000), run(1_500)
+
+    assert (many["blocks"], many["workers"]) == (4, 4)
+    assert (few["blocks"], few["workers"]) == (1, 1)
+    assert "startup_seconds" in many
+    assert pool.starts == 2